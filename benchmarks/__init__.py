@@ -0,0 +1 @@
+"""Benchmark suite of the coordinate transformation engine, run with `python -m benchmarks --help`"""
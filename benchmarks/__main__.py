@@ -0,0 +1,251 @@
+import argparse
+import json
+import sys
+from urllib.parse import urlencode
+
+from benchmarks.cases import CASES, CRS_PAIRS
+from benchmarks.loadtest import APP, MIXES, WORKLOAD_NAMES, ExecutionMode, run_loadtest
+from benchmarks.runner import (
+    DEFAULT_MIN_DURATION,
+    DEFAULT_REPEAT,
+    DEFAULT_SIZES,
+    DEFAULT_THRESHOLD,
+    FULL_SIZES,
+    compare_results,
+    load_results,
+    run_benchmarks,
+    write_results,
+)
+from benchmarks.startup import DEFAULT_REPEAT as DEFAULT_STARTUP_REPEAT
+from benchmarks.startup import run_startup_benchmark
+from benchmarks.synthetic import (
+    GEOMETRY_TYPES,
+    GEOMETRY_VERTICES,
+    POLYGON_HOLES,
+    SEED,
+    cityjson,
+    feature_collection,
+    query_params,
+)
+from coordinate_transformation_api.models import TransformationNotPossibleError
+
+
+def parse_sizes(value: str) -> list[int]:
+    return [int(x) for x in value.split(",")]
+
+
+def parse_env(value: str) -> tuple[str, str]:
+    key, _, val = value.partition("=")
+    return key, val
+
+
+def run(args: argparse.Namespace) -> int:
+    cases = [case for case in CASES if not args.case or case.name in args.case]
+    pairs = [pair for pair in CRS_PAIRS if not args.pair or pair.name in args.pair]
+    sizes = args.sizes or (FULL_SIZES if args.full else DEFAULT_SIZES)
+    results = run_benchmarks(cases, pairs, sizes, args.repeat)
+    write_results(args.output, results)
+    print(f"results written to {args.output}")
+    return 0
+
+
+def loadtest(args: argparse.Namespace) -> int:
+    modes = [ExecutionMode(workers, loop) for workers in args.workers for loop in args.loop]
+    results = run_loadtest(
+        args.app, modes, args.mix or ["mixed"], args.concurrency, args.duration, dict(args.env or [])
+    )
+    write_results(args.output, results)
+    print(f"results written to {args.output}")
+    return 0
+
+
+def generate(args: argparse.Namespace) -> int:
+    if args.kind == "cityjson":
+        data = cityjson(args.crs, args.buildings, seed=args.seed)
+    else:
+        geometry_types = tuple(args.geometry_type or GEOMETRY_TYPES)
+        data = feature_collection(args.crs, args.vertices, geometry_types, args.seed, args.heights, args.holes)
+    with open(args.output, "w") if args.output != "-" else sys.stdout as f:
+        json.dump(data, f)
+    print(f"query parameters: {urlencode(query_params(args.crs, epoch=args.epoch))}", file=sys.stderr)
+    return 0
+
+
+def memory(args: argparse.Namespace) -> int:
+    # imported here, the memory benchmark sends its requests to the app, which can only be imported with the NSGI CRSs
+    # available
+    from benchmarks.memory import (
+        DEFAULT_SIZES,
+        ENDPOINTS,
+        RequestFailedError,
+        check_budget,
+        format_memory_result,
+        load_budgets,
+        profile_endpoint,
+    )
+
+    unknown = set(args.endpoint or []) - ENDPOINTS.keys()
+    if unknown:
+        print(f"unknown endpoints: {', '.join(sorted(unknown))}, choose from {', '.join(ENDPOINTS)}")
+        return 2
+    budgets = load_budgets(args.budgets)
+    results = []
+    exceeded = []
+    for name in args.endpoint or ENDPOINTS.keys():
+        for n in args.sizes or DEFAULT_SIZES:
+            try:
+                result = profile_endpoint(ENDPOINTS[name], n)
+            except (TransformationNotPossibleError, RequestFailedError) as e:
+                print(f"{name}[n={n}] skipped: {e}")
+                continue
+            print(format_memory_result(result), flush=True)
+            results.append(result)
+            message = check_budget(result, budgets)
+            if message is not None:
+                exceeded.append(message)
+    write_results(args.output, results)
+    print(f"results written to {args.output}")
+    for message in exceeded:
+        print(message)
+    return 1 if exceeded else 0
+
+
+def startup(args: argparse.Namespace) -> int:
+    results = run_startup_benchmark(args.repeat, dict(args.env or []))
+    write_results(args.output, results)
+    print(f"results written to {args.output}")
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    regressions = compare_results(
+        load_results(args.baseline), load_results(args.results), args.threshold, args.min_duration
+    )
+    if regressions:
+        print(f"{len(regressions)} regression(s) of more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Benchmark suite of the coordinate transformation engine"
+    )
+    subparsers = parser.add_subparsers(required=True)
+
+    run_parser = subparsers.add_parser("run", help="run benchmarks and write results to JSON")
+    run_parser.add_argument("-o", "--output", default="benchmark-results.json", help="results file")
+    run_parser.add_argument(
+        "--case", action="append", choices=[case.name for case in CASES], help="case to run, default all"
+    )
+    run_parser.add_argument(
+        "--pair", action="append", choices=[pair.name for pair in CRS_PAIRS], help="CRS pair to run, default all"
+    )
+    run_parser.add_argument(
+        "--sizes", type=parse_sizes, help=f"comma separated numbers of vertices, default {DEFAULT_SIZES}"
+    )
+    run_parser.add_argument("--full", action="store_true", help=f"run with sizes {FULL_SIZES}")
+    run_parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="number of timed runs")
+    run_parser.set_defaults(func=run)
+
+    loadtest_parser = subparsers.add_parser(
+        "loadtest", help="run the app under uvicorn and measure throughput and latency of workload mixes"
+    )
+    loadtest_parser.add_argument("-o", "--output", default="loadtest-results.json", help="results file")
+    loadtest_parser.add_argument("--app", default=APP, help=f"ASGI app to run, default {APP}")
+    loadtest_parser.add_argument(
+        "--mix",
+        action="append",
+        choices=[*MIXES.keys(), *WORKLOAD_NAMES],
+        help="workload mix or single workload, default mixed",
+    )
+    loadtest_parser.add_argument(
+        "--concurrency", type=parse_sizes, default=[1, 8, 32], help="comma separated numbers of concurrent clients"
+    )
+    loadtest_parser.add_argument("--duration", type=float, default=30.0, help="seconds per mix and concurrency")
+    loadtest_parser.add_argument(
+        "--workers", type=parse_sizes, default=[1], help="comma separated numbers of uvicorn worker processes"
+    )
+    loadtest_parser.add_argument(
+        "--loop",
+        type=lambda value: value.split(","),
+        default=["uvloop"],
+        help="comma separated uvicorn event loop implementations (auto, asyncio, uvloop), default uvloop as in main",
+    )
+    loadtest_parser.add_argument(
+        "--env", type=parse_env, action="append", help="KEY=VALUE environment variable (app setting) of the app"
+    )
+    loadtest_parser.set_defaults(func=loadtest)
+
+    generate_parser = subparsers.add_parser("generate", help="generate a deterministic GeoJSON or CityJSON input")
+    generate_parser.add_argument("kind", choices=["feature-collection", "cityjson"])
+    generate_parser.add_argument("-o", "--output", default="-", help="output file, default stdout")
+    generate_parser.add_argument("--crs", default="EPSG:28992", help="CRS of the coordinates")
+    generate_parser.add_argument("--vertices", type=int, default=1000, help="number of vertices of a FeatureCollection")
+    generate_parser.add_argument(
+        "--geometry-type",
+        action="append",
+        choices=GEOMETRY_VERTICES.keys(),
+        help=f"geometry types of the features of a FeatureCollection, default {list(GEOMETRY_TYPES)}",
+    )
+    generate_parser.add_argument("--holes", type=int, default=POLYGON_HOLES, help="number of holes of Polygons")
+    generate_parser.add_argument(
+        "--heights",
+        action=argparse.BooleanOptionalAction,
+        help="positions with heights, default for 3D CRSs",
+    )
+    generate_parser.add_argument("--buildings", type=int, default=100, help="number of buildings of a CityJSON")
+    generate_parser.add_argument("--epoch", type=float, help="epoch to print with the query parameters")
+    generate_parser.add_argument("--seed", type=int, default=SEED)
+    generate_parser.set_defaults(func=generate)
+
+    memory_parser = subparsers.add_parser(
+        "memory", help="measure memory per pipeline stage of the endpoints and check against budgets"
+    )
+    memory_parser.add_argument("-o", "--output", default="memory-results.json", help="results file")
+    memory_parser.add_argument(
+        "--endpoint",
+        action="append",
+        help="endpoint to run: transform, transform-cityjson, densify or check-density, default all",
+    )
+    memory_parser.add_argument(
+        "--sizes", type=parse_sizes, help="comma separated numbers of vertices, default 1000,10000,100000"
+    )
+    memory_parser.add_argument("--budgets", help="budgets file, default benchmarks/memory_budgets.json")
+    memory_parser.set_defaults(func=memory)
+
+    startup_parser = subparsers.add_parser(
+        "startup", help="measure the import time of the app with and without the startup cache"
+    )
+    startup_parser.add_argument("-o", "--output", default="startup-results.json", help="results file")
+    startup_parser.add_argument(
+        "--repeat", type=int, default=DEFAULT_STARTUP_REPEAT, help="number of startups per mode"
+    )
+    startup_parser.add_argument(
+        "--env", type=parse_env, action="append", help="KEY=VALUE environment variable (app setting) of the app"
+    )
+    startup_parser.set_defaults(func=startup)
+
+    compare_parser = subparsers.add_parser("compare", help="compare results against a baseline")
+    compare_parser.add_argument("baseline", help="baseline results file")
+    compare_parser.add_argument("results", help="results file")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="relative increase of the median duration flagged as regression",
+    )
+    compare_parser.add_argument(
+        "--min-duration",
+        type=float,
+        default=DEFAULT_MIN_DURATION,
+        help="do not flag results faster than this duration in seconds",
+    )
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
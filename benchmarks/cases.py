@@ -0,0 +1,204 @@
+"""Benchmark cases and the CRS pairs they run against"""
+
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from geodense.geojson import CrsFeatureCollection
+
+from benchmarks.synthetic import CoordinateGenerator, buildings_for_vertices, cityjson, feature_collection
+from coordinate_transformation_api.cityjson.fast import CityjsonV113Fast
+from coordinate_transformation_api.cityjson.models import CityjsonV113
+from coordinate_transformation_api.constants import THREE_DIMENSIONAL
+from coordinate_transformation_api.crs_transform import get_transform_crs_fun
+from coordinate_transformation_api.settings import app_settings
+from coordinate_transformation_api.util import (
+    crs_transform,
+    densify_request_body,
+    density_check_request_body,
+    str_to_crs,
+)
+
+# shorter than the segments of about 100 m of the LineStrings of the generated FeatureCollections, so the density check
+# reports and densify adds vertices to these segments
+MAX_SEGMENT_LENGTH = 50.0
+
+
+@dataclass(frozen=True)
+class CrsPair:
+    name: str
+    source_crs: str
+    target_crs: str
+    epoch: float | None = None
+
+    @property
+    def three_dimensional(self: "CrsPair") -> bool:
+        return len(str_to_crs(self.source_crs).axis_info) == THREE_DIMENSIONAL
+
+
+CRS_PAIRS = [
+    CrsPair("rd", "EPSG:28992", "EPSG:4258"),
+    CrsPair("rd-nap", "EPSG:7415", "EPSG:7931"),
+    CrsPair("etrs89", "EPSG:4258", "EPSG:28992"),
+    CrsPair("bonaire-dpnet", "NSGI:Bonaire_DPnet", "NSGI:Bonaire2004_GEOGRAPHIC_2D"),
+    CrsPair("saba-dpnet", "NSGI:Saba_DPnet", "NSGI:Saba2020_GEOGRAPHIC_2D"),
+    CrsPair("st-eustatius-dpnet", "NSGI:St_Eustatius_DPnet", "NSGI:St_Eustatius2020_GEOGRAPHIC_2D"),
+    CrsPair("itrf-epoch", "EPSG:7912", "EPSG:7931", epoch=2023.5),
+]
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    """generate returns the input of n vertices in the source CRS of the pair. setup builds the models from the input
+    outside of the timed section and returns the function to time, it is called before every run since most functions
+    under benchmark mutate their input."""
+
+    name: str
+    description: str
+    generate: Callable[[CrsPair, int], Any]
+    setup: Callable[[CrsPair, Any], Callable[[], object]]
+    applies_to: Callable[[CrsPair], bool] = lambda _pair: True
+
+
+def generate_positions(pair: CrsPair, n: int) -> list[list[float]]:
+    return CoordinateGenerator(pair.source_crs).walk(n)
+
+
+def generate_feature_collection(pair: CrsPair, n: int) -> dict:
+    return feature_collection(pair.source_crs, n)
+
+
+def generate_cityjson(pair: CrsPair, n: int) -> dict:
+    return cityjson(pair.source_crs, buildings_for_vertices(n))
+
+
+def setup_transform_crs_fun(pair: CrsPair, positions: list[list[float]]) -> Callable[[], object]:
+    def run() -> object:
+        transform_fun = get_transform_crs_fun(
+            str_to_crs(pair.source_crs), str_to_crs(pair.target_crs), epoch=pair.epoch
+        )
+        return [transform_fun(position) for position in positions]
+
+    return run
+
+
+def setup_crs_transform(pair: CrsPair, data: dict) -> Callable[[], object]:
+    body = CrsFeatureCollection.model_validate(data)
+    return lambda: crs_transform(body, str_to_crs(pair.source_crs), str_to_crs(pair.target_crs), pair.epoch)
+
+
+def setup_density_check(engine: str) -> Callable[[CrsPair, dict], Callable[[], object]]:
+    def setup(pair: CrsPair, data: dict) -> Callable[[], object]:
+        body = CrsFeatureCollection.model_validate(data)
+
+        def density_check() -> object:
+            default_engine = app_settings.density_check_engine
+            app_settings.density_check_engine = engine  # type: ignore[assignment]
+            try:
+                return density_check_request_body(
+                    body, str_to_crs(pair.source_crs), None, MAX_SEGMENT_LENGTH, pair.epoch
+                )
+            finally:
+                app_settings.density_check_engine = default_engine
+
+        return density_check
+
+    return setup
+
+
+def setup_densify(engine: str) -> Callable[[CrsPair, dict], Callable[[], object]]:
+    def setup(pair: CrsPair, data: dict) -> Callable[[], object]:
+        body = CrsFeatureCollection.model_validate(data)
+
+        def densify() -> object:
+            default_engine = app_settings.densify_engine
+            app_settings.densify_engine = engine  # type: ignore[assignment]
+            try:
+                return densify_request_body(body, pair.source_crs, None, MAX_SEGMENT_LENGTH)
+            finally:
+                app_settings.densify_engine = default_engine
+
+        return densify
+
+    return setup
+
+
+def setup_cityjson_crs_transform(pair: CrsPair, data: dict) -> Callable[[], object]:
+    body = CityjsonV113.model_validate(data)
+    return lambda: body.crs_transform(str_to_crs(pair.source_crs), str_to_crs(pair.target_crs), pair.epoch)
+
+
+def setup_cityjson_validate(model: type[CityjsonV113]) -> Callable[[CrsPair, dict], Callable[[], object]]:
+    def setup(_pair: CrsPair, data: dict) -> Callable[[], object]:
+        body = json.dumps(data)
+        return lambda: model.model_validate_json(body)
+
+    return setup
+
+
+CASES = [
+    BenchmarkCase(
+        "transform_crs_fun",
+        "get_transform_crs_fun and a call per position, transform_crs or transform_compound_crs depending on the pair",
+        generate_positions,
+        setup_transform_crs_fun,
+    ),
+    BenchmarkCase(
+        "crs_transform",
+        "util.crs_transform of a FeatureCollection",
+        generate_feature_collection,
+        setup_crs_transform,
+    ),
+    BenchmarkCase(
+        "density_check",
+        "util.density_check_request_body of a FeatureCollection (DENSITY_CHECK_ENGINE=vectorized)",
+        generate_feature_collection,
+        setup_density_check("vectorized"),
+        # no transformation path from the time-dependent ITRF CRSs to the density check CRS
+        lambda pair: pair.epoch is None,
+    ),
+    BenchmarkCase(
+        "density_check_geodense",
+        "util.density_check_request_body of a FeatureCollection (DENSITY_CHECK_ENGINE=geodense)",
+        generate_feature_collection,
+        setup_density_check("geodense"),
+        lambda pair: pair.epoch is None,
+    ),
+    BenchmarkCase(
+        "densify",
+        "util.densify_request_body of a FeatureCollection (DENSIFY_ENGINE=vectorized)",
+        generate_feature_collection,
+        setup_densify("vectorized"),
+        # densify_request_body has no epoch parameter
+        lambda pair: pair.epoch is None,
+    ),
+    BenchmarkCase(
+        "densify_geodense",
+        "util.densify_request_body of a FeatureCollection (DENSIFY_ENGINE=geodense)",
+        generate_feature_collection,
+        setup_densify("geodense"),
+        lambda pair: pair.epoch is None,
+    ),
+    BenchmarkCase(
+        "cityjson_crs_transform",
+        "CityjsonV113.crs_transform of terraced houses, requires a 3D CRS pair",
+        generate_cityjson,
+        setup_cityjson_crs_transform,
+        lambda pair: pair.three_dimensional,
+    ),
+    BenchmarkCase(
+        "cityjson_validate",
+        "CityjsonV113.model_validate_json of terraced houses (CITYJSON_VALIDATION=full)",
+        generate_cityjson,
+        setup_cityjson_validate(CityjsonV113),
+        lambda pair: pair.three_dimensional,
+    ),
+    BenchmarkCase(
+        "cityjson_validate_fast",
+        "CityjsonV113Fast.model_validate_json of terraced houses (CITYJSON_VALIDATION=fast)",
+        generate_cityjson,
+        setup_cityjson_validate(CityjsonV113Fast),
+        lambda pair: pair.three_dimensional,
+    ),
+]
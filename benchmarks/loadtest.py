@@ -0,0 +1,265 @@
+"""Load test of the API: runs the app under uvicorn on localhost and replays workload mixes with an async client"""
+
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+
+from benchmarks.synthetic import buildings_for_vertices, cityjson, feature_collection, query_params
+
+APP = "coordinate_transformation_api.main:app"
+HOST = "127.0.0.1"
+STARTUP_TIMEOUT = 60.0
+REQUEST_TIMEOUT = 300.0
+FEATURE_COLLECTION_SIZE = 2_000_000  # bytes
+FEATURE_VERTICES = 10
+DENSIFY_VERTICES = 1000
+CITYJSON_VERTICES = 10_000
+SEED = 7415
+
+
+@dataclass(frozen=True)
+class Workload:
+    name: str
+    method: str
+    path: str
+    params: dict[str, str] = field(default_factory=dict)
+    content: bytes | None = None
+
+    async def request(self: "Workload", client: httpx.AsyncClient) -> httpx.Response:
+        headers = {"Content-Type": "application/json"} if self.content is not None else None
+        return await client.request(self.method, self.path, params=self.params, content=self.content, headers=headers)
+
+
+@dataclass(frozen=True)
+class ExecutionMode:
+    """uvicorn worker processes and event loop implementation. Route handlers are coroutines that run on the event
+    loop of the worker, so concurrency within a worker is bounded by a single thread."""
+
+    workers: int
+    loop: str
+
+    @property
+    def name(self: "ExecutionMode") -> str:
+        return f"workers={self.workers},loop={self.loop}"
+
+
+def dumps(data: dict) -> bytes:
+    return json.dumps(data).encode()
+
+
+def feature_collection_of_size(size: int) -> bytes:
+    """FeatureCollection in RD of about size bytes"""
+    sample = dumps(feature_collection("EPSG:28992", 1000))
+    return dumps(feature_collection("EPSG:28992", 1000 * size // len(sample)))
+
+
+def create_workloads() -> dict[str, Workload]:
+    rd_to_etrs89 = query_params("EPSG:28992", "EPSG:4258")
+    feature = feature_collection("EPSG:28992", FEATURE_VERTICES, geometry_types=("Polygon",))["features"][0]
+    lines = dumps(feature_collection("EPSG:28992", DENSIFY_VERTICES, geometry_types=("LineString",)))
+    workloads = [
+        Workload("get-point", "GET", "/transform", {"coordinates": "155000,463000", **rd_to_etrs89}),
+        Workload("feature", "POST", "/transform", rd_to_etrs89, dumps(feature)),
+        Workload(
+            "feature-collection-2mb",
+            "POST",
+            "/transform",
+            rd_to_etrs89,
+            feature_collection_of_size(FEATURE_COLLECTION_SIZE),
+        ),
+        Workload(
+            "cityjson",
+            "POST",
+            "/transform",
+            query_params("EPSG:7415", "EPSG:7931"),
+            dumps(cityjson("EPSG:7415", buildings_for_vertices(CITYJSON_VERTICES))),
+        ),
+        Workload("densify", "POST", "/densify", query_params("EPSG:28992"), lines),
+        Workload("check-density", "POST", "/check-density", query_params("EPSG:28992"), lines),
+    ]
+    return {workload.name: workload for workload in workloads}
+
+
+# workload mixes, by weight of the workloads in the mix. Every workload is also available as a mix of its own.
+MIXES: dict[str, dict[str, int]] = {
+    "mixed": {
+        "get-point": 50,
+        "feature": 30,
+        "check-density": 10,
+        "densify": 5,
+        "cityjson": 3,
+        "feature-collection-2mb": 2,
+    },
+    "light": {"get-point": 60, "feature": 40},
+    "heavy": {"feature-collection-2mb": 1, "cityjson": 1},
+}
+WORKLOAD_NAMES = ["get-point", "feature", "feature-collection-2mb", "cityjson", "densify", "check-density"]
+
+
+def mix_weights(mix: str) -> dict[str, int]:
+    return MIXES.get(mix, {mix: 1})
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return int(s.getsockname()[1])
+
+
+@contextmanager
+def serve(app: str, mode: ExecutionMode, env: dict[str, str]) -> Iterator[str]:
+    """Run app under uvicorn in a subprocess, yields base url"""
+    port = free_port()
+    process = subprocess.Popen(  # noqa: S603
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            app,
+            "--host",
+            HOST,
+            "--port",
+            str(port),
+            "--workers",
+            str(mode.workers),
+            "--loop",
+            mode.loop,
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        env={**os.environ, **env},
+    )
+    base_url = f"http://{HOST}:{port}"
+    try:
+        wait_for_startup(base_url, process)
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def wait_for_startup(base_url: str, process: subprocess.Popen) -> None:
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+        try:
+            httpx.get(f"{base_url}/", timeout=1.0)
+            return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise RuntimeError(f"uvicorn did not start within {STARTUP_TIMEOUT}s")
+
+
+@dataclass
+class Sample:
+    workload: str
+    latency: float
+    status: int | None  # None on connection errors and timeouts
+
+
+async def drive(
+    base_url: str,
+    workloads: dict[str, Workload],
+    weights: dict[str, int],
+    concurrency: int,
+    duration: float,
+) -> tuple[list[Sample], float]:
+    """Send requests from concurrency clients for duration seconds, returns samples and elapsed time"""
+    rng = random.Random(SEED)  # noqa: S311, not used for cryptographic purposes
+    names = list(weights.keys())
+    samples: list[Sample] = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=REQUEST_TIMEOUT, limits=limits) as client:
+        start = time.perf_counter()
+        deadline = start + duration
+
+        async def user() -> None:
+            while time.perf_counter() < deadline:
+                name = rng.choices(names, weights=list(weights.values()))[0]
+                request_start = time.perf_counter()
+                try:
+                    response = await workloads[name].request(client)
+                    status: int | None = response.status_code
+                except httpx.TransportError:
+                    status = None
+                samples.append(Sample(name, time.perf_counter() - request_start, status))
+
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        return samples, time.perf_counter() - start
+
+
+def percentiles(latencies: list[float]) -> dict[str, float | None]:
+    if len(latencies) < 2:  # noqa: PLR2004
+        latency = latencies[0] * 1000 if latencies else None
+        return {"p50_ms": latency, "p95_ms": latency, "p99_ms": latency}
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {"p50_ms": quantiles[49] * 1000, "p95_ms": quantiles[94] * 1000, "p99_ms": quantiles[98] * 1000}
+
+
+def summarize(samples: list[Sample], elapsed: float) -> dict[str, Any]:
+    ok = [sample for sample in samples if sample.status is not None and sample.status < 400]  # noqa: PLR2004
+    return {
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "throughput_rps": len(ok) / elapsed,
+        **percentiles([sample.latency for sample in ok]),
+    }
+
+
+def run_loadtest(  # noqa: PLR0913
+    app: str,
+    modes: list[ExecutionMode],
+    mixes: list[str],
+    concurrencies: list[int],
+    duration: float,
+    env: dict[str, str],
+) -> list[dict[str, Any]]:
+    workloads = create_workloads()
+    results = []
+    for mode in modes:
+        with serve(app, mode, env) as base_url:
+            for mix in mixes:
+                weights = mix_weights(mix)
+                for concurrency in concurrencies:
+                    samples, elapsed = asyncio.run(drive(base_url, workloads, weights, concurrency, duration))
+                    result = {
+                        "id": f"{mix}[{mode.name}][c={concurrency}]",
+                        "mix": mix,
+                        "workers": mode.workers,
+                        "loop": mode.loop,
+                        "concurrency": concurrency,
+                        "duration_s": elapsed,
+                        **summarize(samples, elapsed),
+                        "workloads": {
+                            name: summarize([sample for sample in samples if sample.workload == name], elapsed)
+                            for name in weights
+                        },
+                    }
+                    print(format_loadtest_result(result), flush=True)
+                    results.append(result)
+    return results
+
+
+def format_loadtest_result(result: dict[str, Any]) -> str:
+    def ms(value: float | None) -> str:
+        return f"{value:>9.1f}" if value is not None else f"{'-':>9}"
+
+    return (
+        f"{result['id']:<60} {result['throughput_rps']:>8.1f} req/s  p50 {ms(result['p50_ms'])}ms  "
+        f"p95 {ms(result['p95_ms'])}ms  p99 {ms(result['p99_ms'])}ms  errors {result['errors']}"
+    )
@@ -0,0 +1,221 @@
+"""Memory benchmark of the requests of the API endpoints
+
+The requests are sent to the app (coordinate_transformation_api.main.app) in process, so they run the route handlers
+and middleware of the app. The stages are the stages of the route handlers timed for the Server-Timing header (see
+coordinate_transformation_api.timing), preceded by the receive stage, in which the request body is encoded. Per stage
+the peak and retained traced allocations (tracemalloc, relative to the start of the request) and the RSS of the process
+at the end of the stage are recorded. Allocations between stages are counted in the next stage. Note tracing
+allocations itself increases RSS.
+"""
+
+import json
+import os
+import resource
+import tracemalloc
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from importlib import resources as impresources
+from typing import Any
+
+from fastapi.testclient import TestClient
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+import benchmarks
+from benchmarks.synthetic import buildings_for_vertices, cityjson, feature_collection, query_params
+from coordinate_transformation_api.timing import StageTimings, _stage_timings
+
+DEFAULT_SIZES = [1000, 10_000, 100_000]
+BUDGETS_FILE = "memory_budgets.json"
+
+
+class RequestFailedError(Exception):
+    """Request of the benchmark answered with an error response, problem is the problem details of the response"""
+
+    def __init__(self: "RequestFailedError", status_code: int, problem: dict[str, Any]) -> None:
+        self.status_code = status_code
+        self.problem = problem
+        super().__init__(f"{status_code} {problem.get('title')}: {problem.get('detail')}")
+
+
+def rss_bytes() -> int | None:
+    """Resident set size of the process, only available on Linux"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return None
+
+
+def max_rss_bytes() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # kilobytes on Linux
+
+
+class MemoryProfile(StageTimings):
+    """Traced allocations per stage of a request, requires tracemalloc to be tracing"""
+
+    def __init__(self: "MemoryProfile") -> None:
+        super().__init__()
+        self.baseline = tracemalloc.get_traced_memory()[0]
+        self.stages: dict[str, dict[str, int | None]] = {}
+        tracemalloc.reset_peak()
+
+    def record(self: "MemoryProfile", name: str) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        self.stages[name] = {
+            "peak_bytes": peak - self.baseline,
+            "retained_bytes": current - self.baseline,
+            "rss_bytes": rss_bytes(),
+        }
+        tracemalloc.reset_peak()
+
+    @contextmanager
+    def stage(self: "MemoryProfile", name: str) -> Generator[None, None, None]:
+        with super().stage(name):
+            yield
+        self.record(name)
+
+    def mark_parsed(self: "MemoryProfile") -> None:
+        super().mark_parsed()
+        self.record("parse")
+
+    @property
+    def peak_bytes(self: "MemoryProfile") -> int:
+        return max((int(stage["peak_bytes"] or 0) for stage in self.stages.values()), default=0)
+
+
+def profiled_app(profile: MemoryProfile) -> ASGIApp:
+    """app, with the stages of its requests recorded in profile"""
+
+    # imported on first use, importing the app loads the CRSs of the API, which requires the NSGI CRSs
+    from coordinate_transformation_api.main import app
+
+    async def _app(scope: Scope, receive: Receive, send: Send) -> None:
+        token = _stage_timings.set(profile)
+        try:
+            await app(scope, receive, send)
+        finally:
+            _stage_timings.reset(token)
+
+    return _app
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    name: str
+    source_crs: str
+    target_crs: str | None  # None for endpoints without target-crs parameter
+    generate: Callable[[str, int], dict]
+    path: str
+    content_type: str = "application/json"
+
+    def request(self: "Endpoint", profile: MemoryProfile, body_json: str) -> None:
+        with profile.stage("receive"):
+            content = body_json.encode()
+        with TestClient(profiled_app(profile)) as client:
+            response = client.post(
+                self.path,
+                content=content,
+                params=query_params(self.source_crs, self.target_crs),
+                headers={"content-type": self.content_type},
+            )
+        if response.status_code != 200:  # noqa: PLR2004
+            raise RequestFailedError(response.status_code, response.json())
+
+
+def generate_cityjson(crs: str, n: int) -> dict:
+    return cityjson(crs, buildings_for_vertices(n))
+
+
+def generate_dense(crs: str, n: int) -> dict:
+    # the positions of MultiPoints are random, so they fail the density check (POST /transform answers 400) and
+    # geodense densifies them as if they were LineStrings, the size of the output would depend on the distance between
+    # the random points instead of on n
+    return feature_collection(crs, n, geometry_types=("Polygon", "LineString", "GeometryCollection"))
+
+
+ENDPOINTS = {
+    endpoint.name: endpoint
+    for endpoint in [
+        Endpoint(
+            "transform",
+            "EPSG:28992",
+            "EPSG:4258",
+            generate_dense,
+            "/transform",
+        ),
+        Endpoint(
+            "transform-cityjson",
+            "EPSG:7415",
+            "EPSG:7931",
+            generate_cityjson,
+            "/transform",
+            content_type="application/city+json",
+        ),
+        Endpoint(
+            "densify",
+            "EPSG:28992",
+            "EPSG:28992",
+            generate_dense,
+            "/densify",
+        ),
+        Endpoint(
+            "check-density",
+            "EPSG:28992",
+            None,
+            feature_collection,
+            "/check-density",
+        ),
+    ]
+}
+
+
+def profile_endpoint(endpoint: Endpoint, n: int) -> dict[str, Any]:
+    """Memory profile of a request to endpoint with n vertices, raises RequestFailedError for an error response"""
+    body_json = json.dumps(endpoint.generate(endpoint.source_crs, n))
+    endpoint.request(MemoryProfile(), body_json)  # warm up caches
+    tracemalloc.start()
+    try:
+        profile = MemoryProfile()
+        endpoint.request(profile, body_json)
+    finally:
+        tracemalloc.stop()
+    return {
+        "id": f"{endpoint.name}[n={n}]",
+        "endpoint": endpoint.name,
+        "vertices": n,
+        "request_bytes": len(body_json),
+        "peak_bytes": profile.peak_bytes,
+        "peak_bytes_per_vertex": profile.peak_bytes / n,
+        "max_rss_bytes": max_rss_bytes(),
+        "stages": profile.stages,
+    }
+
+
+def load_budgets(path: str | None = None) -> dict[str, dict[str, float]]:
+    """Budgets of the peak traced allocations per vertex by endpoint, by default from benchmarks/memory_budgets.json"""
+    if path is None:
+        with impresources.files(benchmarks).joinpath(BUDGETS_FILE).open() as f:
+            return json.load(f)
+    with open(path) as f:
+        return json.load(f)
+
+
+def check_budget(result: dict[str, Any], budgets: dict[str, dict[str, float]]) -> str | None:
+    """Returns message if result exceeds the budget of the endpoint"""
+    budget = budgets.get(result["endpoint"], {}).get("peak_bytes_per_vertex")
+    if budget is not None and result["peak_bytes_per_vertex"] > budget:
+        return (
+            f"{result['id']}: peak traced allocations of {result['peak_bytes_per_vertex']:.0f} bytes per vertex exceed "
+            f"budget of {budget:.0f} bytes per vertex"
+        )
+    return None
+
+
+def format_memory_result(result: dict[str, Any]) -> str:
+    stages = "  ".join(f"{name} {stage['peak_bytes'] / 2**20:.1f}" for name, stage in result["stages"].items())
+    return (
+        f"{result['id']:<32} request {result['request_bytes'] / 2**20:>7.1f} MiB  "
+        f"peak {result['peak_bytes'] / 2**20:>8.1f} MiB ({result['peak_bytes_per_vertex']:.0f} B/vertex)  "
+        f"stage peaks (MiB): {stages}"
+    )
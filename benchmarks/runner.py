@@ -0,0 +1,152 @@
+"""Run benchmark cases and compare results against a baseline"""
+
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import UTC, datetime
+from typing import Any
+
+import pyproj
+from geodense.models import GeodenseError
+from pyproj.exceptions import CRSError, ProjError
+
+from benchmarks.cases import BenchmarkCase, CrsPair
+from coordinate_transformation_api.models import DensifyError, TransformationNotPossibleError
+from coordinate_transformation_api.util import str_to_crs
+
+DEFAULT_SIZES = [1, 100, 10_000]
+FULL_SIZES = [1, 100, 10_000, 100_000, 1_000_000]
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.1
+# timings below this duration are too noisy to flag as regression
+DEFAULT_MIN_DURATION = 0.001
+
+
+def result_id(case: str, pair: str, n: int) -> str:
+    return f"{case}[{pair}][n={n}]"
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(  # noqa: S603
+            ["git", "rev-parse", "HEAD"],  # noqa: S607
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata() -> dict[str, Any]:
+    return {
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pyproj": pyproj.__version__,
+        "proj": pyproj.proj_version_str,
+    }
+
+
+def time_case(case: BenchmarkCase, pair: CrsPair, n: int, repeat: int) -> list[float]:
+    """Duration in seconds of each run, the first run after a warm up run (transformer creation and caching)"""
+    data = case.generate(pair, n)
+    case.setup(pair, data)()
+    durations = []
+    for _ in range(repeat):
+        run = case.setup(pair, data)
+        start = time.perf_counter()
+        run()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def benchmark(case: BenchmarkCase, pair: CrsPair, n: int, repeat: int) -> dict[str, Any]:
+    try:
+        durations = time_case(case, pair, n, repeat)
+    except (CRSError, ProjError, DensifyError, GeodenseError, TransformationNotPossibleError) as e:
+        # for example density check of a single Point
+        return {"skipped": str(e)}
+    median = statistics.median(durations)
+    return {
+        "repeat": repeat,
+        "durations_s": durations,
+        "min_s": min(durations),
+        "median_s": median,
+        "vertices_per_s": n / median if median > 0 else None,
+    }
+
+
+def run_benchmarks(
+    cases: list[BenchmarkCase], pairs: list[CrsPair], sizes: list[int], repeat: int
+) -> list[dict[str, Any]]:
+    results = []
+    for pair in pairs:
+        skip_reason = None
+        try:
+            str_to_crs(pair.source_crs)
+            str_to_crs(pair.target_crs)
+        except CRSError as e:
+            # CRSs of the NSGI proj.db are not available in the proj.db shipped with pyproj
+            skip_reason = f"CRS not available: {e}"
+        for n in sizes:
+            for case in cases:
+                if skip_reason is None and not case.applies_to(pair):
+                    continue
+                result: dict[str, Any] = {
+                    "id": result_id(case.name, pair.name, n),
+                    "case": case.name,
+                    "pair": pair.name,
+                    "source_crs": pair.source_crs,
+                    "target_crs": pair.target_crs,
+                    "epoch": pair.epoch,
+                    "vertices": n,
+                }
+                result.update({"skipped": skip_reason} if skip_reason else benchmark(case, pair, n, repeat))
+                print(format_result(result), flush=True)
+                results.append(result)
+    return results
+
+
+def format_result(result: dict[str, Any]) -> str:
+    if "skipped" in result:
+        return f"{result['id']:<60} skipped: {result['skipped']}"
+    return f"{result['id']:<60} median {result['median_s']:>10.4f}s  min {result['min_s']:>10.4f}s"
+
+
+def write_results(path: str, results: list[dict[str, Any]]) -> None:
+    with open(path, "w") as f:
+        json.dump({"metadata": metadata(), "results": results}, f, indent=2)
+
+
+def load_results(path: str) -> dict[str, dict[str, Any]]:
+    with open(path) as f:
+        return {result["id"]: result for result in json.load(f)["results"] if "skipped" not in result}
+
+
+def compare_results(
+    baseline: dict[str, dict[str, Any]],
+    current: dict[str, dict[str, Any]],
+    threshold: float,
+    min_duration: float,
+) -> list[str]:
+    """Print comparison of the median durations, return ids of the regressed results"""
+    regressions = []
+    for id_ in sorted(baseline.keys() & current.keys()):
+        base_median = baseline[id_]["median_s"]
+        current_median = current[id_]["median_s"]
+        ratio = current_median / base_median if base_median > 0 else float("inf")
+        status = ""
+        if max(base_median, current_median) >= min_duration:
+            if ratio > 1 + threshold:
+                status = "REGRESSION"
+                regressions.append(id_)
+            elif ratio < 1 - threshold:
+                status = "improvement"
+        print(f"{id_:<60} {base_median:>10.4f}s -> {current_median:>10.4f}s  {ratio:>6.2f}x  {status}")
+    for id_ in sorted(baseline.keys() - current.keys()):
+        print(f"{id_:<60} missing from results")
+    return regressions
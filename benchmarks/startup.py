@@ -0,0 +1,56 @@
+"""Startup time of the app: the import of coordinate_transformation_api.main in new interpreters, with and without the
+startup cache, and the first use of the CityJSON models, which are built on first use"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any
+
+DEFAULT_REPEAT = 10
+STARTUP_CACHE_MODES = {"startup-cache": "true", "no-startup-cache": "false"}
+
+STARTUP_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import coordinate_transformation_api.main as main
+imported = time.perf_counter()
+main.cityjson_models()
+end = time.perf_counter()
+from coordinate_transformation_api.startup_cache import get_startup_cache
+print(json.dumps({"import": imported - start, "cityjson_models": end - imported, "cached": get_startup_cache() is not None}))
+"""
+
+
+def time_startup(env: dict[str, str]) -> dict[str, Any]:
+    """Durations in seconds of a single startup in a new interpreter"""
+    output = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", STARTUP_SCRIPT], env={**os.environ, **env}, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_startup_benchmark(repeat: int, env: dict[str, str]) -> list[dict[str, Any]]:
+    results = []
+    for name, startup_cache in STARTUP_CACHE_MODES.items():
+        runs = [time_startup({**env, "STARTUP_CACHE": startup_cache}) for _ in range(repeat)]
+        result = {
+            "id": f"startup[{name}]",
+            "cached": all(run["cached"] for run in runs),
+            "import": [run["import"] for run in runs],
+            "cityjson_models": [run["cityjson_models"] for run in runs],
+            "median_import": statistics.median(run["import"] for run in runs),
+            "median_cityjson_models": statistics.median(run["cityjson_models"] for run in runs),
+        }
+        print(format_startup_result(result), flush=True)
+        results.append(result)
+    return results
+
+
+def format_startup_result(result: dict[str, Any]) -> str:
+    cached = "" if result["cached"] or result["id"] != "startup[startup-cache]" else "  (no up to date startup cache)"
+    return (
+        f"{result['id']:<30} import {result['median_import'] * 1000:>8.1f}ms  "
+        f"first CityJSON use {result['median_cityjson_models'] * 1000:>8.1f}ms{cached}"
+    )
@@ -0,0 +1,260 @@
+"""Deterministic generator of large GeoJSON and CityJSON inputs
+
+Coordinates are generated in OGC:CRS84 within the area of use of the CRS (the European Netherlands, Bonaire, Saba or
+St. Eustatius) and transformed to the CRS, so benchmarks and scaling tests can run against inputs of 10^3 to 10^7
+vertices without shipping fixture files. The same arguments and seed always yield the same output.
+"""
+
+import math
+import random
+from typing import Any
+
+from pyproj import CRS, Transformer
+
+from coordinate_transformation_api.constants import HEIGHT_DIGITS_FOR_ROUNDING, THREE_DIMENSIONAL
+from coordinate_transformation_api.crs_transform import get_precision
+
+# (min lon, min lat, max lon, max lat) in OGC:CRS84, within the area of use of the CRSs of the area
+AREAS = {
+    "nl": (4.0, 51.3, 6.8, 53.2),
+    "bonaire": (-68.4, 12.05, -68.2, 12.3),
+    "saba": (-63.25, 17.62, -63.22, 17.64),
+    "st_eustatius": (-63.0, 17.47, -62.95, 17.51),
+}
+AREA_CRS_PREFIXES = {"NSGI:Bonaire": "bonaire", "NSGI:Saba": "saba", "NSGI:St_Eustatius": "st_eustatius"}
+SEED = 28992
+METRE_IN_DEGREES = 1e-5  # approximately, sufficient for placing generated geometries
+# distance between consecutive vertices of LineStrings, about 100 m so LineStrings pass the density check with the
+# default max-segment-length of 200 m
+STEP_DEGREES = 0.001
+MAX_HEIGHT = 50.0
+
+GEOMETRY_TYPES = ("Polygon", "LineString", "MultiPoint", "GeometryCollection")
+GEOMETRY_VERTICES = {"Point": 1, "Polygon": 256, "LineString": 1000, "MultiPoint": 100, "GeometryCollection": 64}
+POLYGON_HOLES = 2
+MAX_POLYGON_HOLES = 8  # more holes would overlap
+POLYGON_RADIUS_DEGREES = 0.002
+MIN_RING_VERTICES = 4
+
+ROW_BUILDINGS = 10
+BUILDING_WIDTH = 6.0
+BUILDING_DEPTH = 10.0
+MAX_GROUND_HEIGHT = 10.0
+MIN_BUILDING_HEIGHT = 3.0
+MAX_BUILDING_HEIGHT = 15.0
+CITYJSON_SCALE = 0.001
+
+
+def area_of_crs(crs: str) -> str:
+    for prefix, area in AREA_CRS_PREFIXES.items():
+        if crs.startswith(prefix):
+            return area
+    return "nl"
+
+
+def crs_urn(crs: str) -> str:
+    authority, code = crs.split(":")
+    return f"urn:ogc:def:crs:{authority}::{code}"
+
+
+def crs_uri(crs: str) -> str:
+    authority, code = crs.split(":")
+    return f"https://www.opengis.net/def/crs/{authority}/0/{code}"
+
+
+def query_params(source_crs: str, target_crs: str | None = None, epoch: float | None = None) -> dict[str, str]:
+    """Query parameters to send with a generated input, the epoch is a request parameter and not part of positions"""
+    params = {"source-crs": source_crs}
+    if target_crs is not None:
+        params["target-crs"] = target_crs
+    if epoch is not None:
+        params["epoch"] = str(epoch)
+    return params
+
+
+class CoordinateGenerator:
+    """Generates positions in crs, with heights by default for 3D CRSs"""
+
+    def __init__(self: "CoordinateGenerator", crs: str, seed: int = SEED, heights: bool | None = None) -> None:
+        self.crs = CRS.from_user_input(crs)
+        self.heights = len(self.crs.axis_info) == THREE_DIMENSIONAL if heights is None else heights
+        self.rng = random.Random(seed)  # noqa: S311, not used for cryptographic purposes
+        self.area = AREAS[area_of_crs(crs)]
+        self.precision = get_precision(self.crs)
+        self.metre = 1.0 if self.crs.axis_info[0].unit_name == "metre" else METRE_IN_DEGREES
+        self.transformer = Transformer.from_crs(
+            CRS.from_user_input("OGC:CRS84h" if self.heights else "OGC:CRS84"), self.crs, always_xy=True
+        )
+
+    def lon_lat(self: "CoordinateGenerator") -> tuple[float, float]:
+        min_x, min_y, max_x, max_y = self.area
+        return self.rng.uniform(min_x, max_x), self.rng.uniform(min_y, max_y)
+
+    def with_height(self: "CoordinateGenerator", lon: float, lat: float) -> tuple[float, ...]:
+        return (lon, lat, self.rng.uniform(0, MAX_HEIGHT)) if self.heights else (lon, lat)
+
+    def to_crs(self: "CoordinateGenerator", positions: list[tuple[float, ...]]) -> list[list[float]]:
+        """Transform OGC:CRS84(h) positions to crs, rounded to the precision the API outputs for crs"""
+        if not positions:
+            return []
+        columns = self.transformer.transform(*zip(*positions, strict=True))
+        digits = [self.precision, self.precision, HEIGHT_DIGITS_FOR_ROUNDING]
+        return [[round(val, digits[i]) for i, val in enumerate(position)] for position in zip(*columns, strict=True)]
+
+    def points(self: "CoordinateGenerator", n: int) -> list[list[float]]:
+        return self.to_crs([self.with_height(*self.lon_lat()) for _ in range(n)])
+
+    def walk(self: "CoordinateGenerator", n: int) -> list[list[float]]:
+        """n positions, consecutive positions are about STEP_DEGREES apart"""
+        min_x, min_y, max_x, max_y = self.area
+        x, y = self.lon_lat()
+        positions = []
+        for _ in range(n):
+            angle = self.rng.uniform(0, 2 * math.pi)
+            x = min(max(x + STEP_DEGREES * math.cos(angle), min_x), max_x)
+            y = min(max(y + STEP_DEGREES * math.sin(angle), min_y), max_y)
+            positions.append(self.with_height(x, y))
+        return self.to_crs(positions)
+
+    def ring(
+        self: "CoordinateGenerator", center: tuple[float, float], radius: float, n: int, clockwise: bool
+    ) -> list[list[float]]:
+        """Closed ring of n positions around center"""
+        positions = []
+        for i in range(n - 1):
+            angle = 2 * math.pi * i / (n - 1) * (-1 if clockwise else 1)
+            r = radius * self.rng.uniform(0.8, 1.0)
+            positions.append(self.with_height(center[0] + r * math.cos(angle), center[1] + r * math.sin(angle)))
+        return self.to_crs([*positions, positions[0]])
+
+    def polygon(self: "CoordinateGenerator", n: int, holes: int) -> list[list[list[float]]]:
+        """Polygon with n vertices in total, exterior ring counterclockwise and holes clockwise (RFC 7946)"""
+        holes = max(min(holes, n // MIN_RING_VERTICES - 1, MAX_POLYGON_HOLES), 0)
+        ring_vertices = n // (holes + 1)
+        center = self.lon_lat()
+        radius = POLYGON_RADIUS_DEGREES
+        rings = [self.ring(center, radius, ring_vertices + n % (holes + 1), clockwise=False)]
+        for i in range(holes):
+            angle = 2 * math.pi * i / holes
+            offset = radius / 2 if holes > 1 else 0
+            hole_center = (center[0] + offset * math.cos(angle), center[1] + offset * math.sin(angle))
+            rings.append(self.ring(hole_center, radius * 0.15, ring_vertices, clockwise=True))
+        return rings
+
+    def geometry(self: "CoordinateGenerator", geometry_type: str, n: int, holes: int = POLYGON_HOLES) -> dict:
+        """Geometry of geometry_type with exactly n vertices, a simpler geometry type is returned when n is too small for
+        geometry_type"""
+        if geometry_type == "GeometryCollection" and n >= 1 + MIN_RING_VERTICES + 2:
+            polygon_vertices = max(MIN_RING_VERTICES, (n - 1) // 2)
+            return {
+                "type": "GeometryCollection",
+                "geometries": [
+                    self.geometry("Point", 1),
+                    self.geometry("Polygon", polygon_vertices, holes=0),
+                    self.geometry("LineString", n - 1 - polygon_vertices),
+                ],
+            }
+        if geometry_type == "Polygon" and n >= MIN_RING_VERTICES:
+            return {"type": "Polygon", "coordinates": self.polygon(n, holes)}
+        if geometry_type == "MultiPoint":
+            return {"type": "MultiPoint", "coordinates": self.points(n)}
+        if n > 1:
+            return {"type": "LineString", "coordinates": self.walk(n)}
+        return {"type": "Point", "coordinates": self.points(1)[0]}
+
+
+def feature_collection(  # noqa: PLR0913
+    crs: str,
+    vertices: int,
+    geometry_types: tuple[str, ...] = GEOMETRY_TYPES,
+    seed: int = SEED,
+    heights: bool | None = None,
+    holes: int = POLYGON_HOLES,
+) -> dict[str, Any]:
+    """FeatureCollection in crs with exactly vertices vertices, features cycle through geometry_types, each with the
+    number of vertices in GEOMETRY_VERTICES (Polygons with holes, long LineStrings, MultiPoints and GeometryCollections
+    by default)"""
+    generator = CoordinateGenerator(crs, seed, heights)
+    features = []
+    remaining = vertices
+    while remaining > 0:
+        geometry_type = geometry_types[len(features) % len(geometry_types)]
+        n = min(GEOMETRY_VERTICES[geometry_type], remaining)
+        features.append(
+            {
+                "type": "Feature",
+                "id": str(len(features)),
+                "properties": {"name": f"{geometry_type.lower()}_{len(features)}"},
+                "geometry": generator.geometry(geometry_type, n, holes),
+            }
+        )
+        remaining -= n
+    return {
+        "type": "FeatureCollection",
+        "crs": {"type": "name", "properties": {"name": crs_urn(crs)}},
+        "features": features,
+    }
+
+
+def cityjson(crs: str, buildings: int, seed: int = SEED, row_buildings: int = ROW_BUILDINGS) -> dict[str, Any]:
+    """CityJSON in crs with buildings LoD 1.2 Solids, in rows of row_buildings terraced houses. Neighbouring houses share
+    the vertices of their party wall."""
+    generator = CoordinateGenerator(crs, seed, heights=False)
+    metre = generator.metre
+    vertices: list[list[float]] = []
+    city_objects = {}
+    for row_start in range(0, buildings, row_buildings):
+        row_length = min(row_buildings, buildings - row_start)
+        x0, y0 = generator.points(1)[0]
+        ground = generator.rng.uniform(0, MAX_GROUND_HEIGHT)
+        roof = ground + generator.rng.uniform(MIN_BUILDING_HEIGHT, MAX_BUILDING_HEIGHT)
+        first = len(vertices)
+        for j in range(row_length + 1):  # walls between and at the ends of the houses of the row
+            x = x0 + j * BUILDING_WIDTH * metre
+            for z in (ground, roof):
+                vertices.extend([[x, y0, z], [x, y0 + BUILDING_DEPTH * metre, z]])
+
+        def index(wall: int, back: int, top: int, first: int = first) -> int:
+            return first + 4 * wall + 2 * top + back
+
+        for k in range(row_length):
+            a, b, c, d = index(k, 0, 0), index(k + 1, 0, 0), index(k + 1, 1, 0), index(k, 1, 0)
+            a_, b_, c_, d_ = index(k, 0, 1), index(k + 1, 0, 1), index(k + 1, 1, 1), index(k, 1, 1)
+            surfaces = [[a, d, c, b], [a_, b_, c_, d_], [a, b, b_, a_], [b, c, c_, b_], [c, d, d_, c_], [d, a, a_, d_]]
+            city_objects[f"building_{row_start + k}"] = {
+                "type": "Building",
+                "geometry": [{"type": "Solid", "lod": "1.2", "boundaries": [[[surface] for surface in surfaces]]}],
+            }
+
+    scale = [CITYJSON_SCALE * metre, CITYJSON_SCALE * metre, CITYJSON_SCALE]
+    translate = [min(vertex[i] for vertex in vertices) for i in range(3)] if vertices else [0.0, 0.0, 0.0]
+    return {
+        "type": "CityJSON",
+        "version": "1.1",
+        "transform": {"scale": scale, "translate": translate},
+        "CityObjects": city_objects,
+        "vertices": [[round((vertex[i] - translate[i]) / scale[i]) for i in range(3)] for vertex in vertices],
+        "metadata": {"referenceSystem": crs_uri(crs)},
+    }
+
+
+def buildings_for_vertices(vertices: int, row_buildings: int = ROW_BUILDINGS) -> int:
+    """Number of buildings of a generated CityJSON with about vertices vertices"""
+    return max(1, round(vertices * row_buildings / (4 * (row_buildings + 1))))
+
+
+def count_vertices(geojson: dict) -> int:
+    """Number of positions in a GeoJSON object"""
+    if geojson["type"] == "FeatureCollection":
+        return sum(count_vertices(feature) for feature in geojson["features"])
+    if geojson["type"] == "Feature":
+        return count_vertices(geojson["geometry"]) if geojson["geometry"] is not None else 0
+    if geojson["type"] == "GeometryCollection":
+        return sum(count_vertices(geometry) for geometry in geojson["geometries"])
+
+    def count(coordinates: list) -> int:
+        if coordinates and isinstance(coordinates[0], list):
+            return sum(count(x) for x in coordinates)
+        return 1
+
+    return count(geojson["coordinates"])
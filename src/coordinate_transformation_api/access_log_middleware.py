@@ -46,6 +46,12 @@ class RequestMetadataFilter(logging.Filter):
         if response_time is not None:
             record.response_time = response_time  # type: ignore[attr-defined]
 
+        # Get stage timings and point/feature counts if available (SERVER_TIMING=true)
+        for name in ("server_timing", "point_count", "feature_count"):
+            value = getattr(_request_data, name, None)
+            if value is not None:
+                setattr(record, name, value)
+
         return True
 
 
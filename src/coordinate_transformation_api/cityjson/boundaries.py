@@ -0,0 +1,91 @@
+"""Flattened representation of the nested boundaries of CityJSON geometries
+
+The vertex indices of the boundaries of all geometries are stored in a single int array. Remapping vertex indices,
+finding the used vertices and calculating bboxes of groups of geometries are array operations on this array. The
+innermost lists of the boundaries are kept, so the nested boundaries are updated in place instead of rebuilt.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from itertools import accumulate, chain, pairwise
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from coordinate_transformation_api.cityjson.vertices import VertexArray
+
+
+def leaf_lists(boundaries: list[Any]) -> list[list[int]]:
+    """Innermost lists of vertex indices of boundaries, the lists with vertex indices are in order"""
+    leaves: list[list[int]] = []
+    level = [boundaries]
+    # boundaries of a geometry type have a fixed depth, so visiting level by level yields the non-empty leaves in order
+    while level:
+        next_level: list[list[Any]] = []
+        for item in level:
+            if item and isinstance(item[0], list):
+                next_level.extend(item)
+            else:
+                leaves.append(item)
+        level = next_level
+    return leaves
+
+
+@dataclass
+class FlatBoundaries:
+    """Vertex indices of the boundaries of geometries, the indices of geometry i are
+    indices[geometry_offsets[i]:geometry_offsets[i+1]]"""
+
+    indices: npt.NDArray[np.int64]
+    geometry_offsets: npt.NDArray[np.int64]
+    leaves: list[list[int]]
+
+    @classmethod
+    def from_nested(cls: type[FlatBoundaries], boundaries: Iterable[list[Any]]) -> FlatBoundaries:
+        leaves: list[list[int]] = []
+        geometry_offsets = [0]
+        for boundary in boundaries:
+            geometry_leaves = leaf_lists(boundary)
+            leaves.extend(geometry_leaves)
+            geometry_offsets.append(geometry_offsets[-1] + sum(len(leaf) for leaf in geometry_leaves))
+        return cls(
+            np.fromiter(chain.from_iterable(leaves), dtype=np.int64, count=geometry_offsets[-1]),
+            np.asarray(geometry_offsets, dtype=np.int64),
+            leaves,
+        )
+
+    def update_nested(self: FlatBoundaries) -> None:
+        """Write the indices back into the nested boundaries"""
+        indices = self.indices.tolist()
+        offsets = pairwise(accumulate(map(len, self.leaves), initial=0))
+        for leaf, (start, end) in zip(self.leaves, offsets, strict=True):
+            leaf[:] = indices[start:end]
+
+    def remap(self: FlatBoundaries, new_index: npt.NDArray[np.intp]) -> None:
+        """Replace vertex index i by new_index[i]"""
+        self.indices = new_index[self.indices].astype(np.int64, copy=False)
+
+    def used_vertices(self: FlatBoundaries) -> npt.NDArray[np.int64]:
+        """Indices of the vertices used by the boundaries, in order of first use"""
+        used, first = np.unique(self.indices, return_index=True)
+        return used[np.argsort(first)]
+
+    def bbox(
+        self: FlatBoundaries, vertices: VertexArray, group_offsets: npt.NDArray[np.int64]
+    ) -> tuple[npt.NDArray[Any], npt.NDArray[Any]]:
+        """Minimum and maximum coordinates of the vertices of groups of consecutive geometries, group i consists of
+        geometries group_offsets[i] up to group_offsets[i+1] and the groups cover all geometries. Groups without
+        vertices get the minimum 9e9 and maximum -9e9, as cjio does."""
+        starts = self.geometry_offsets[group_offsets]
+        counts = np.diff(starts)
+        mins = np.full((len(counts), 3), 9e9)
+        maxs = np.full((len(counts), 3), -9e9)
+        non_empty = counts > 0
+        if non_empty.any():
+            coordinates = vertices[self.indices]
+            mins[non_empty] = np.minimum(np.minimum.reduceat(coordinates, starts[:-1][non_empty], axis=0), 9e9)
+            maxs[non_empty] = np.maximum(np.maximum.reduceat(coordinates, starts[:-1][non_empty], axis=0), -9e9)
+        return mins, maxs
@@ -0,0 +1,128 @@
+# ruff: noqa: N815
+"""CityJSON models that only validate what the transformation uses (fast mode)
+
+Of the CityObjects only the type, the geometries and the geographicalExtent are validated. The CityObject type selects
+the allowed geometry types, and the geometry type selects the geometry model (discriminated union), instead of
+validating against each member of the CityObject union of the generated models. Attributes, semantics, materials,
+textures, appearance and other members are kept as raw JSON and pass through unchanged.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Annotated, Any, Literal, get_args
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+from coordinate_transformation_api.cityjson.models import (
+    CityjsonFeatureV113,
+    CityjsonV113,
+    CityObject,
+    ExtensionObject,
+)
+
+EXTENSION_TYPE_PATTERN = re.compile(r"(\+)([A-Z])\w+")
+
+
+def _model_classes(annotation: Any) -> list[type[BaseModel]]:  # noqa: ANN401
+    """Pydantic models in a (nested) type annotation"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return [annotation]
+    return [model for arg in get_args(annotation) for model in _model_classes(arg)]
+
+
+def _type_value(model: type[BaseModel]) -> str:
+    """Value of the single member enum of the type field of a generated model"""
+    return next(iter(model.model_fields["type"].annotation)).value  # type: ignore
+
+
+# allowed geometry types per CityObject type, taken from the generated models
+GEOMETRY_TYPES: dict[str, frozenset[str]] = {
+    _type_value(model): frozenset(_type_value(g) for g in _model_classes(model.model_fields["geometry"].annotation))
+    for model in _model_classes(CityObject)
+    if model is not ExtensionObject
+}
+
+
+class FastGeometry(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    lod: str | None = None
+
+
+class FastMultiPoint(FastGeometry):
+    type: Literal["MultiPoint"]
+    boundaries: list[int]
+
+
+class FastMultiLineString(FastGeometry):
+    type: Literal["MultiLineString"]
+    boundaries: list[list[int]]
+
+
+class FastMultiSurface(FastGeometry):
+    type: Literal["MultiSurface", "CompositeSurface"]
+    boundaries: list[list[list[int]]]
+
+
+class FastSolid(FastGeometry):
+    type: Literal["Solid"]
+    boundaries: list[list[list[list[int]]]]
+
+
+class FastMultiSolid(FastGeometry):
+    type: Literal["MultiSolid", "CompositeSolid"]
+    boundaries: list[list[list[list[list[int]]]]]
+
+
+class FastGeometryInstance(FastGeometry):
+    type: Literal["GeometryInstance"]
+    template: int
+    boundaries: list[int] = Field(..., max_length=1, min_length=1)
+    transformationMatrix: list[float] = Field(..., max_length=16, min_length=16)
+
+
+Geometry = Annotated[
+    FastMultiPoint | FastMultiLineString | FastMultiSurface | FastSolid | FastMultiSolid | FastGeometryInstance,
+    Field(discriminator="type"),
+]
+
+
+class FastCityObject(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    type: str
+    geometry: list[Geometry] | None = None
+    geographicalExtent: list[float] | None = Field(None, max_length=6, min_length=6)
+
+    @model_validator(mode="after")
+    def check_geometry_types(self: FastCityObject) -> FastCityObject:
+        allowed = GEOMETRY_TYPES.get(self.type)
+        if allowed is None:
+            if not EXTENSION_TYPE_PATTERN.search(self.type):
+                raise ValueError(f"unknown CityObject type: {self.type}")
+            return self  # geometries of extension CityObjects are not restricted
+        not_allowed = sorted({g.type for g in self.geometry or [] if g.type not in allowed})
+        if not_allowed:
+            raise ValueError(f"geometry type(s) {', '.join(not_allowed)} not allowed for CityObject type {self.type}")
+        return self
+
+
+class CityjsonV113Fast(CityjsonV113):
+    """CityjsonV113 with FastCityObject CityObjects, the transformation methods are inherited. Unlike CityjsonV113, the
+    geometries of extension CityObjects are kept and transformed, and geometry-templates is serialized by alias."""
+
+    model_config = ConfigDict(extra="allow", serialize_by_alias=True)
+
+    CityObjects: dict[str, FastCityObject]  # type: ignore[assignment]
+    appearance: dict[str, Any] | None = None  # type: ignore[assignment]
+    geometry_templates: dict[str, Any] | None = Field(None, alias="geometry-templates")  # type: ignore[assignment]
+
+
+class CityjsonFeatureV113Fast(CityjsonFeatureV113):
+    """CityjsonFeatureV113 with FastCityObject CityObjects"""
+
+    model_config = ConfigDict(extra="allow")
+
+    CityObjects: dict[str, FastCityObject]  # type: ignore[assignment]
+    appearance: dict[str, Any] | None = None  # type: ignore[assignment]
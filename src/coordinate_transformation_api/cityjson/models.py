@@ -7,13 +7,25 @@ from __future__ import annotations
 
 import math
 import re
+from collections.abc import Callable
 from datetime import date
 from enum import Enum
 from typing import Annotated, Any, Union, cast
 
+import numpy as np
+import numpy.typing as npt
 from pydantic import AnyUrl, BaseModel, ConfigDict, EmailStr, Field, StringConstraints
 from pyproj import CRS
 
+from coordinate_transformation_api.cityjson.boundaries import FlatBoundaries
+from coordinate_transformation_api.cityjson.vertices import (
+    VertexArray,
+    as_vertex_array,
+    dequantize,
+    quantize,
+    unique_vertices,
+    vertex_bbox,
+)
 from coordinate_transformation_api.constants import THREE_DIMENSIONAL
 from coordinate_transformation_api.crs_transform import (
     get_transform_crs_fun_city_json,
@@ -950,73 +962,52 @@ class CityjsonV113(BaseModel):
 
     def decompress(self: CityjsonV113) -> None:
         if self.transform is not None:
-            scale = self.transform.scale
-            translate = self.transform.translate
             # transform vertices to unquantized values: https://www.cityjson.org/specs/1.1.3/#transform-object
-            self.vertices = [
-                [
-                    (vi[0] * scale[0]) + translate[0],
-                    (vi[1] * scale[1]) + translate[1],
-                    (vi[2] * scale[2]) + translate[2],
-                ]
-                for vi in self.vertices
-            ]
+            vertices = as_vertex_array(self.vertices)
+            self.vertices = dequantize(vertices, self.transform.scale, self.transform.translate).tolist()
 
     def update_bbox(self: CityjsonV113) -> None:
         """
         Update the bbox (["metadata"]["geographicalExtent"]) of the CityJSON. Assumes vertices are not quantized.
 
         """
-        if len(self.vertices) == 0:
+        self._update_bbox(as_vertex_array(self.vertices))
+
+    def _update_bbox(self: CityjsonV113, vertices: VertexArray) -> None:
+        if len(vertices) == 0:
             if self.metadata is None:
                 raise ValueError("self.metadata is None")
             self.metadata.geographicalExtent = [0, 0, 0, 0, 0, 0]
             return
-        x, y, z = zip(*self.vertices, strict=False)
-        bbox = [min(x), min(y), min(z), max(x), max(y), max(z)]
+        bbox = vertex_bbox(vertices)
         if self.metadata:
             self.metadata.geographicalExtent = bbox
 
-    def remove_duplicate_vertices(self: CityjsonV113) -> int:  # noqa: C901
-        def update_geom_indices(a: CityJSONBoundary, newids: list[int]) -> None:
-            for i, each in enumerate(a):
-                if isinstance(each, list):
-                    update_geom_indices(each, newids)
-                else:
-                    a_list = cast(list[int], a)
-                    each_int = cast(int, each)
-                    a_list[i] = newids[each_int]
+    def _geometries(self: CityjsonV113) -> list[tuple[str, Any]]:
+        """CityObject id and geometry of the geometries of the CityObjects, extension objects are skipped"""
+        geometries: list[tuple[str, Any]] = []
+        for obj_id in self.CityObjects:
+            c_object = self._get_cityobject_without_extension(self.CityObjects[obj_id])
+            if c_object is not None and c_object.geometry is not None:
+                geometries.extend((obj_id, g) for g in c_object.geometry)
+        return geometries
 
+    def remove_duplicate_vertices(self: CityjsonV113) -> int:
         totalinput = len(self.vertices)
-        h: dict[str, int] = {}
-        newids: list[int] = [-1] * len(self.vertices)
-        newvertices: list[str] = []
-        for i, v in enumerate(self.vertices):
-            s = f"{v[0]} {v[1]} {v[2]}"
-            if s not in h:
-                newid = len(h)
-                newids[i] = newid
-                h[s] = newid
-                newvertices.append(s)
-            else:
-                newids[i] = h[s]
-        for theid in self.CityObjects:
-            c_object = self._get_cityobject_without_extension(self.CityObjects[theid])
-            if c_object is not None and c_object.geometry is not None:
-                for g in c_object.geometry:
-                    update_geom_indices(g.boundaries, newids)
-        newv2: list[list[float | int]] = []
-        for v2 in newvertices:
-            a: list[int] | list[float]
-            if hasattr(self, "transform") and self.transform is not None:
-                a = list(map(lambda x: int(x), v2.split()))
-            else:
-                a = list(map(lambda x: float(x), v2.split()))
-            _a = cast(list[float | int], a)
-            newv2.append(_a)
-        self.vertices = newv2
+        flat = FlatBoundaries.from_nested(g.boundaries for _, g in self._geometries())
+        vertices = self._remove_duplicate_vertices(as_vertex_array(self.vertices), flat)
+        flat.update_nested()
+        self.vertices = vertices.tolist()
         return totalinput - len(self.vertices)
 
+    def _remove_duplicate_vertices(self: CityjsonV113, vertices: VertexArray, flat: FlatBoundaries) -> VertexArray:
+        """Returns unique quantized vertices and remaps the vertex indices of flat"""
+        if len(vertices) > 0 and not np.issubdtype(vertices.dtype, np.integer):
+            raise ValueError("unable to remove duplicate vertices, vertices are not quantized")
+        unique, new_index = unique_vertices(vertices)
+        flat.remap(new_index)
+        return unique
+
     def _get_cityobject_without_extension(
         self: CityjsonV113,
         c_object: CityObject,
@@ -1029,67 +1020,22 @@ class CityjsonV113(BaseModel):
             c_object,
         )
 
-    def remove_orphan_vertices(self: CityjsonV113) -> int:  # noqa: C901
-        def visit_geom(
-            a: CityJSONBoundary,
-            old_new_index_map: dict[int, int],
-            new_vertex_indices: list[int],
-        ) -> None:
-            for _, each in enumerate(a):
-                if isinstance(each, list):
-                    visit_geom(each, old_new_index_map, new_vertex_indices)
-                elif isinstance(each, int) and each not in old_new_index_map:
-                    old_new_index_map[each] = len(new_vertex_indices)
-                    new_vertex_indices.append(each)
-
-        def update_face(
-            boundary: CityJSONBoundary,
-            old_new_index_map: dict[int, int],
-        ) -> None:
-            for i, each in enumerate(boundary):
-                if isinstance(each, list):
-                    update_face(each, old_new_index_map)
-                else:
-                    boundary_int = cast(list[int], boundary)
-                    each_int = cast(int, each)
-                    boundary_int[i] = old_new_index_map[each_int]
-
+    def remove_orphan_vertices(self: CityjsonV113) -> int:
         totalinput: int = len(self.vertices)
-        old_new_index_map: dict[int, int] = {}
-        new_vertex_indices: list[int] = []
-
-        for obj_id in self.CityObjects:
-            if isinstance(self.CityObjects[obj_id], ExtensionObject):
-                continue
-            # only process objects with geometries
-            c_object = cast(
-                CityObjectWithGeometry,
-                self.CityObjects[obj_id],
-            )
-            if c_object.geometry is not None:
-                for g in c_object.geometry:
-                    visit_geom(g.boundaries, old_new_index_map, new_vertex_indices)
-
-        # -- update the faces ids
-        for obj_id in self.CityObjects:
-            if isinstance(self.CityObjects[obj_id], ExtensionObject):
-                continue
-            # only process objects with geometries
-            c_object = cast(
-                CityObjectWithGeometry,
-                self.CityObjects[obj_id],
-            )
-            if c_object.geometry is not None:
-                for g in c_object.geometry:
-                    update_face(g.boundaries, old_new_index_map)
-
-        # -- replace the vertices, innit?
-        newv2: list[list[float | int]] = []
-        for v in new_vertex_indices:
-            newv2.append(self.vertices[v])
-        self.vertices = newv2
+        flat = FlatBoundaries.from_nested(g.boundaries for _, g in self._geometries())
+        vertices = self._remove_orphan_vertices(as_vertex_array(self.vertices), flat)
+        flat.update_nested()
+        self.vertices = vertices.tolist()
         return totalinput - len(self.vertices)
 
+    def _remove_orphan_vertices(self: CityjsonV113, vertices: VertexArray, flat: FlatBoundaries) -> VertexArray:
+        """Returns the vertices used by the boundaries, in order of first use, and remaps the vertex indices of flat"""
+        used = flat.used_vertices()
+        new_index = np.full(len(vertices), -1, dtype=np.intp)
+        new_index[used] = np.arange(len(used))
+        flat.remap(new_index)
+        return vertices[used]
+
     def compress(
         self: CityjsonV113,
         important_digits: int = 3,
@@ -1102,28 +1048,30 @@ class CityjsonV113(BaseModel):
         'translate=None', or can be
         set by providing the ``[x, y, z]`` translation properties to 'translate'.
         """
+        flat = FlatBoundaries.from_nested(g.boundaries for _, g in self._geometries())
+        vertices = self._compress(as_vertex_array(self.vertices), flat, important_digits, translate)
+        flat.update_nested()
+        self.vertices = vertices.tolist()
+
+    def _compress(
+        self: CityjsonV113,
+        vertices: VertexArray,
+        flat: FlatBoundaries,
+        important_digits: int,
+        translate: list[int | float] | None = None,
+    ) -> VertexArray:
         # assuming vertices need to be compressed - maybe add check if vertices are ints
 
         # -- find the minx/miny/minz or set from translate
-        vertices: list[list[float | int]] = self.vertices
-
         bbox: list[int | float] = []
         if translate:
             bbox = translate
         else:
             bbox = [9e9, 9e9, 9e9]
-            v: list[float]
-            for v in vertices:
-                for i in range(3):
-                    bbox[i] = min(v[i], bbox[i])
-        # -- convert vertices in self.j to int
-        n: list[int | float] = [0, 0, 0]
-        p = "%." + str(important_digits) + "f"
-        for v in vertices:
-            for i in range(3):
-                n[i] = v[i] - bbox[i]
-            for i in range(3):
-                v[i] = int((p % n[i]).replace(".", ""))
+            if len(vertices) > 0:
+                bbox = [min(v, b) for v, b in zip(vertices.min(axis=0).tolist(), bbox, strict=True)]
+        # -- convert vertices to int
+        quantized = quantize(vertices, bbox, important_digits)
         # -- put transform
         ss: str = "0."
         ss += "0" * (important_digits - 1)
@@ -1132,47 +1080,35 @@ class CityjsonV113(BaseModel):
         self.transform.scale = [ss_float, ss_float, ss_float]
         self.transform.translate = [bbox[0], bbox[1], bbox[2]]
         # -- clean the file
-        self.remove_duplicate_vertices()
-        self.remove_orphan_vertices()
+        unique = self._remove_duplicate_vertices(quantized, flat)
+        return self._remove_orphan_vertices(unique, flat)
+
+    def update_bbox_each_cityobjects(self: CityjsonV113, addifmissing: bool = False) -> None:
+        geometries = self._geometries()
+        flat = FlatBoundaries.from_nested(g.boundaries for _, g in geometries)
+        self._update_bbox_each_cityobjects(as_vertex_array(self.vertices), geometries, flat, addifmissing)
 
-    def update_bbox_each_cityobjects(  # noqa: C901, PLR0912
-        self: CityjsonV113, addifmissing: bool = False
+    def _update_bbox_each_cityobjects(
+        self: CityjsonV113,
+        vertices: VertexArray,
+        geometries: list[tuple[str, Any]],
+        flat: FlatBoundaries,
+        addifmissing: bool,
     ) -> None:
-        def recusionvisit(a: CityJSONBoundary, vs: list[int]) -> None:
-            for each in a:
-                if isinstance(each, list):
-                    recusionvisit(each, vs)
-                else:
-                    vs.append(each)
-
-        for co in self.CityObjects:
-            if addifmissing is True or hasattr(self.CityObjects[co], "geographicalExtent"):
-                vs: list[int] = []
-                bbox = [9e9, 9e9, 9e9, -9e9, -9e9, -9e9]
-                c_object = self._get_cityobject_without_extension(self.CityObjects[co])
-                if c_object is not None and c_object.geometry is not None:
-                    geometries = c_object.geometry
-
-                    if not isinstance(geometries, list):
-                        geometries = [geometries]
-                    for g in geometries:
-                        if g is not None:
-                            if hasattr(g, "boundaries") and g.boundaries is not None:
-                                recusionvisit(g.boundaries, vs)
-                        else:
-                            continue  # TODO: improve code to calculate bbox for all cityobjects, including parent objects with only child objects
-                        for each in vs:
-                            v = self.vertices[each]
-                            for i in range(3):
-                                bbox[i] = min(v[i], bbox[i])
-                            for i in range(3):
-                                bbox[i + 3] = max(v[i], bbox[i + 3])
-                        if hasattr(self, "transform") and self.transform is not None:
-                            for i in range(3):
-                                bbox[i] = (bbox[i] * self.transform.scale[i]) + self.transform.translate[i]
-                            for i in range(3):
-                                bbox[i + 3] = (bbox[i + 3] * self.transform.scale[i]) + self.transform.translate[i]
-                        self.CityObjects[co].geographicalExtent = bbox  # type: ignore
+        """Sets the geographicalExtent of CityObjects with geometries to the bbox of the vertices of all their
+        geometries. TODO: calculate bbox for all cityobjects, including parent objects with only child objects"""
+        # geometries of a CityObject are consecutive
+        group_offsets = [i for i in range(len(geometries)) if i == 0 or geometries[i][0] != geometries[i - 1][0]]
+        obj_ids = [geometries[i][0] for i in group_offsets]
+        mins, maxs = flat.bbox(vertices, np.asarray([*group_offsets, len(geometries)], dtype=np.int64))
+        if hasattr(self, "transform") and self.transform is not None:
+            scale = np.asarray(self.transform.scale, dtype=np.float64)
+            translate = np.asarray(self.transform.translate, dtype=np.float64)
+            mins = mins * scale + translate
+            maxs = maxs * scale + translate
+        for obj_id, obj_min, obj_max in zip(obj_ids, mins.tolist(), maxs.tolist(), strict=True):
+            if addifmissing is True or hasattr(self.CityObjects[obj_id], "geographicalExtent"):
+                self.CityObjects[obj_id].geographicalExtent = [*obj_min, *obj_max]  # type: ignore
 
     def get_x_unit_crs(self: CityjsonV113, target_crs_crs: CRS) -> str:
         axe = next(
@@ -1189,32 +1125,15 @@ class CityjsonV113(BaseModel):
         return unit_name
 
     def crs_transform(self: CityjsonV113, source_crs: CRS, target_crs: CRS, epoch: float | None = None) -> None:
-        message = ""
-        extra = {}
-        if len(source_crs.axis_info) != THREE_DIMENSIONAL:
-            message += (
-                f"CityJSON requires 3D source-crs as input. Source CRS {source_crs} is {len(source_crs.axis_info)}D. "
-            )
-            extra["crs"] = ["source-crs"]
-        if len(target_crs.axis_info) != THREE_DIMENSIONAL:
-            message += (
-                f"CityJSON requires 3D target-crs as input. Target CRS {target_crs} is {len(target_crs.axis_info)}D. "
-            )
-            if "crs" in extra:
-                extra["crs"].append("target-crs")
-            else:
-                extra["crs"] = ["target-crs"]
-        if message != "":
-            raise DataValidationError(message, extra=extra)
-        callback = get_transform_crs_fun_city_json(source_crs, target_crs, epoch=epoch)
-        imp_digits = math.ceil(abs(math.log(self.transform.scale[0], 10)))
-        self.decompress()
-        self.vertices = [callback(vertex) for vertex in self.vertices]
-        # self.vertices = [
-        #     list(vertex) for vertex in self.vertices
-        # ]  # convert result to list since, callback function to transform coordinates returns tuples
+        validate_crss_cityjson(source_crs, target_crs)
+        transform_vertices = get_transform_crs_fun_city_json(source_crs, target_crs, epoch=epoch)
+        imp_digits = self.get_important_digits(source_crs, target_crs)
         self.set_epsg("{}:{}".format(*target_crs.to_authority()))
-        self.update_bbox()
+        self.crs_transform_vertices(transform_vertices, imp_digits)
+
+    def get_important_digits(self: CityjsonV113, source_crs: CRS, target_crs: CRS) -> int:
+        """Number of decimals of the quantized vertices in target_crs, based on the scale of the transform"""
+        imp_digits = math.ceil(abs(math.log(self.transform.scale[0], 10)))
         src_unit = self.get_x_unit_crs(source_crs)
         target_unit = self.get_x_unit_crs(target_crs)
         # 0.00001 degree ~= 1 meter
@@ -1224,5 +1143,67 @@ class CityjsonV113(BaseModel):
             imp_digits -= 5
         else:  # src_unit == target_unit
             pass  # imp_digits unchanged
-        self.compress(imp_digits)
-        self.update_bbox_each_cityobjects(False)
+        return imp_digits
+
+    def crs_transform_vertices(
+        self: CityjsonV113,
+        transform_vertices: Callable[[npt.NDArray[np.float64]], npt.NDArray[np.float64]],
+        important_digits: int,
+        translate: list[int | float] | None = None,
+    ) -> None:
+        """Transform and compress the vertices, and update the bboxes. The bbox of the CityJSON is only updated when
+        translate is None, i.e. when the vertices of the whole city model are transformed."""
+        # the boundaries are flattened once, for removing duplicate vertices before the transformation, compression and
+        # updating the bboxes of the CityObjects
+        geometries = self._geometries()
+        flat = FlatBoundaries.from_nested(g.boundaries for _, g in geometries)
+        vertices = as_vertex_array(self.vertices)
+        if np.issubdtype(vertices.dtype, np.integer):
+            # transform shared vertices once
+            vertices = self._remove_duplicate_vertices(vertices, flat)
+        vertices = transform_vertices(dequantize(vertices, self.transform.scale, self.transform.translate))
+        if translate is None:
+            self._update_bbox(vertices)
+        vertices = self._compress(vertices, flat, important_digits, translate)
+        self._update_bbox_each_cityobjects(vertices, geometries, flat, False)
+        flat.update_nested()
+        self.vertices = vertices.tolist()
+
+
+class Type42(Enum):
+    CityJSONFeature = "CityJSONFeature"
+
+
+class CityjsonFeatureV113(BaseModel):
+    """CityJSONFeature 1.1.3, a line of a CityJSON Text Sequence (CityJSONSeq), see:
+    https://www.cityjson.org/specs/1.1.3/#text-sequences-and-streaming-with-cityjsonfeature
+
+    The vertices are quantized with the transform of the first line of the sequence, a CityJSON object without
+    CityObjects and vertices.
+    """
+
+    type: Type42
+    id: str
+    CityObjects: dict[str, CityObject]
+    vertices: list[list[float | int]]
+    appearance: Appearance | None = None
+
+
+def validate_crss_cityjson(source_crs: CRS, target_crs: CRS) -> None:
+    message = ""
+    extra = {}
+    if len(source_crs.axis_info) != THREE_DIMENSIONAL:
+        message += (
+            f"CityJSON requires 3D source-crs as input. Source CRS {source_crs} is {len(source_crs.axis_info)}D. "
+        )
+        extra["crs"] = ["source-crs"]
+    if len(target_crs.axis_info) != THREE_DIMENSIONAL:
+        message += (
+            f"CityJSON requires 3D target-crs as input. Target CRS {target_crs} is {len(target_crs.axis_info)}D. "
+        )
+        if "crs" in extra:
+            extra["crs"].append("target-crs")
+        else:
+            extra["crs"] = ["target-crs"]
+    if message != "":
+        raise DataValidationError(message, extra=extra)
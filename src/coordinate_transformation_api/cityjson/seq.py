@@ -0,0 +1,96 @@
+"""Transformation of CityJSON Text Sequences (CityJSONSeq), see:
+https://www.cityjson.org/specs/1.1.3/#text-sequences-and-streaming-with-cityjsonfeature
+
+The first line of a CityJSONSeq is a CityJSON object without CityObjects and vertices, with the metadata and the
+transform. Each following line is a CityJSONFeature, of which the vertices are quantized with this transform. The
+features are transformed one by one, so memory use does not depend on the number of features.
+"""
+
+from collections.abc import AsyncIterable, AsyncIterator
+
+import numpy as np
+from pyproj import CRS
+
+from coordinate_transformation_api.cityjson.models import (
+    CityjsonFeatureV113,
+    CityjsonV113,
+    Metadata,
+    validate_crss_cityjson,
+)
+from coordinate_transformation_api.cityjson.vertices import round_decimals
+from coordinate_transformation_api.crs_transform import get_transform_crs_fun_city_json
+from coordinate_transformation_api.models import DataValidationError
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Non-empty lines of a stream of chunks, without line endings"""
+    buffer = bytearray()
+    async for chunk in chunks:
+        search_from = len(buffer)
+        buffer += chunk
+        start = 0
+        while (end := buffer.find(b"\n", search_from)) != -1:
+            line = bytes(buffer[start:end])
+            if line.strip():
+                yield line
+            start = search_from = end + 1
+        del buffer[:start]
+    if bytes(buffer).strip():
+        yield bytes(buffer)
+
+
+class CityjsonSeqTransformer:
+    """Transforms the header (first line) and the features of a CityJSONSeq from source_crs to target_crs.
+
+    The transform of the header is replaced by a transform with the scale of the target CRS and with the transformed
+    origin of the header as translate, the vertices of the features are quantized with this transform. The origin is the
+    minimum of the geographicalExtent of the header if available, otherwise the translate. The geographicalExtent of
+    the header is removed, since it can only be calculated after all features are transformed.
+    """
+
+    def __init__(
+        self: "CityjsonSeqTransformer",
+        header: CityjsonV113,
+        source_crs: CRS,
+        target_crs: CRS,
+        epoch: float | None = None,
+    ) -> None:
+        validate_crss_cityjson(source_crs, target_crs)
+        if header.CityObjects or header.vertices:
+            raise DataValidationError(
+                "first line of CityJSONSeq should be a CityJSON object without CityObjects and vertices"
+            )
+        self.header = header
+        self.source_transform = header.transform.model_copy(deep=True)
+        self.transform_vertices = get_transform_crs_fun_city_json(source_crs, target_crs, epoch=epoch)
+        self.important_digits = header.get_important_digits(source_crs, target_crs)
+        self.transform_header(target_crs)
+
+    def transform_header(self: "CityjsonSeqTransformer", target_crs: CRS) -> None:
+        origin = self.source_transform.translate
+        if self.header.metadata is not None and self.header.metadata.geographicalExtent is not None:
+            origin = self.header.metadata.geographicalExtent[:3]
+            self.header.metadata.geographicalExtent = None
+        origin_t = self.transform_vertices(np.asarray([origin], dtype=np.float64))
+        if self.header.metadata is None:
+            self.header.metadata = Metadata()
+        self.header.set_epsg("{}:{}".format(*target_crs.to_authority()))
+        scale = float(f"1e-{self.important_digits}")
+        self.header.transform.scale = [scale, scale, scale]
+        self.header.transform.translate = round_decimals(origin_t[0], self.important_digits).tolist()
+
+    def transform_feature(self: "CityjsonSeqTransformer", feature: CityjsonFeatureV113) -> None:
+        """Transform the vertices of the feature and quantize them with the transform of the header"""
+        # the methods of CityjsonV113 transform, compress and clean the vertices, the header is only used for the
+        # transform of the input vertices
+        city_model = CityjsonV113.model_construct(
+            type=self.header.type,
+            version=self.header.version,
+            CityObjects=feature.CityObjects,
+            vertices=feature.vertices,
+            transform=self.source_transform.model_copy(deep=True),
+        )
+        city_model.crs_transform_vertices(
+            self.transform_vertices, self.important_digits, self.header.transform.translate
+        )
+        feature.vertices = city_model.vertices
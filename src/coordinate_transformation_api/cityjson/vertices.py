@@ -0,0 +1,84 @@
+"""Vectorized operations on the (N, 3) vertex array of a CityJSON model
+
+Quantization is byte-identical to formatting each coordinate offset with `"%.{important_digits}f"` and removing the
+decimal point, as done by cjio. Rounding is identical to Python's `round`.
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+VertexArray = npt.NDArray[np.float64] | npt.NDArray[np.int64]
+
+# float64 products above 2**52 have no fractional part, rounding them cannot be decided without the exact decimal value
+MAX_EXACT_SCALED = 2.0**52
+
+
+def as_vertex_array(vertices: Sequence[Sequence[float | int]] | VertexArray) -> VertexArray:
+    """(N, 3) array of vertices, int64 when all coordinates are integers (quantized) and float64 otherwise"""
+    array = np.asarray(vertices)
+    if array.size == 0:
+        return np.empty((0, 3), dtype=np.float64)
+    if array.ndim != 2 or array.shape[1] != 3:  # noqa: PLR2004
+        raise ValueError(f"expected vertices of 3 coordinates, got array of shape {array.shape}")
+    if np.issubdtype(array.dtype, np.integer):
+        return array.astype(np.int64, copy=False)
+    return array.astype(np.float64, copy=False)
+
+
+def dequantize(vertices: VertexArray, scale: Sequence[float], translate: Sequence[float]) -> npt.NDArray[np.float64]:
+    """Unquantized coordinates: https://www.cityjson.org/specs/1.1.3/#transform-object"""
+    vertices_float = np.asarray(vertices, dtype=np.float64)
+    return vertices_float * np.asarray(scale, dtype=np.float64) + np.asarray(translate, dtype=np.float64)
+
+
+def rounding_undecided(scaled: npt.NDArray[np.float64]) -> npt.NDArray[np.bool_]:
+    """Whether rounding the (rounded) product scaled to an integer might differ from rounding the exact product, because
+    it is (close to) halfway between two integers or too large"""
+    halfway_distance = np.abs(scaled - np.floor(scaled) - 0.5)
+    return (halfway_distance <= 2 * np.spacing(np.abs(scaled))) | (np.abs(scaled) >= MAX_EXACT_SCALED)
+
+
+def round_decimals(values: npt.NDArray[np.float64], digits: int) -> npt.NDArray[np.float64]:
+    """Values rounded to digits decimals, identical to round(value, digits)"""
+    factor = 10.0**digits
+    scaled = values * factor
+    rounded = np.rint(scaled) / factor
+    undecided = rounding_undecided(scaled)
+    if undecided.any():
+        rounded[undecided] = [round(value, digits) for value in values[undecided].tolist()]
+    return rounded
+
+
+def quantize(vertices: VertexArray, translate: Sequence[float | int], important_digits: int) -> npt.NDArray[np.int64]:
+    """Integer coordinates relative to translate with scale 10**-important_digits, rounded half to even"""
+    if important_digits < 0:
+        raise ValueError(f"important_digits should not be negative, got {important_digits}")
+    offsets = np.asarray(vertices, dtype=np.float64) - np.asarray(translate, dtype=np.float64)
+    if not np.isfinite(offsets).all():
+        raise ValueError("unable to quantize vertices with non-finite coordinates")
+    scaled = offsets * 10.0**important_digits
+    undecided = rounding_undecided(scaled)
+    quantized = np.rint(np.where(undecided, 0.0, scaled)).astype(np.int64)
+    if undecided.any():
+        fmt = f"%.{important_digits}f"
+        for index in zip(*np.nonzero(undecided), strict=True):
+            quantized[index] = int((fmt % offsets[index]).replace(".", ""))
+    return quantized
+
+
+def unique_vertices(vertices: VertexArray) -> tuple[VertexArray, npt.NDArray[np.intp]]:
+    """Unique vertices in order of first occurrence, and for each vertex the index of its unique vertex"""
+    if len(vertices) == 0:
+        return vertices, np.empty(0, dtype=np.intp)
+    _, first, inverse = np.unique(vertices, axis=0, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    new_index = np.empty_like(order)
+    new_index[order] = np.arange(len(order))
+    return vertices[first[order]], new_index[inverse.ravel()]
+
+
+def vertex_bbox(vertices: VertexArray) -> list[float | int]:
+    """[minx, miny, minz, maxx, maxy, maxz] of non-empty vertices"""
+    return [*vertices.min(axis=0).tolist(), *vertices.max(axis=0).tolist()]
@@ -0,0 +1,395 @@
+import typing
+import zlib
+from collections.abc import Callable, Iterator
+
+from fastapi import HTTPException
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from coordinate_transformation_api.limit_middleware.middleware import (
+    get_content_length,
+    get_media_type,
+    problem_response,
+)
+
+# brotli and zstandard are optional dependencies (install the compression extra), gzip is always available
+try:
+    import brotli  # type: ignore[import-untyped]
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # type: ignore[assignment]
+
+DECODED_CHUNK_SIZE = 64 * 1024
+# zstd decompressobj does not support an output limit, feeding small input slices bounds the output per slice
+ZSTD_INPUT_SLICE_SIZE = 128
+
+
+class Decoder(typing.Protocol):
+    def decompress(self: "Decoder", data: bytes) -> Iterator[bytes]: ...
+
+    @property
+    def finished(self: "Decoder") -> bool: ...
+
+
+class Encoder(typing.Protocol):
+    def compress(self: "Encoder", data: bytes) -> bytes: ...
+
+    def flush(self: "Encoder") -> bytes: ...
+
+    def finish(self: "Encoder") -> bytes: ...
+
+
+class GzipDecoder:
+    def __init__(self: "GzipDecoder") -> None:
+        self._obj = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+
+    def decompress(self: "GzipDecoder", data: bytes) -> Iterator[bytes]:
+        while True:
+            chunk = self._obj.decompress(data, DECODED_CHUNK_SIZE)
+            data = self._obj.unconsumed_tail
+            if self._obj.eof and self._obj.unused_data:  # concatenated gzip members
+                data = self._obj.unused_data
+                self._obj = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+            if chunk:
+                yield chunk
+            if not data and len(chunk) < DECODED_CHUNK_SIZE:
+                return
+
+    @property
+    def finished(self: "GzipDecoder") -> bool:
+        return self._obj.eof
+
+
+class BrotliDecoder:
+    def __init__(self: "BrotliDecoder") -> None:
+        self._obj = brotli.Decompressor()
+
+    def decompress(self: "BrotliDecoder", data: bytes) -> Iterator[bytes]:
+        chunk = self._obj.process(data, output_buffer_limit=DECODED_CHUNK_SIZE)
+        while chunk:  # output pending as long as processing without new input yields data
+            yield chunk
+            if self._obj.is_finished():
+                return
+            chunk = self._obj.process(b"", output_buffer_limit=DECODED_CHUNK_SIZE)
+
+    @property
+    def finished(self: "BrotliDecoder") -> bool:
+        finished: bool = self._obj.is_finished()
+        return finished
+
+
+class ZstdDecoder:
+    def __init__(self: "ZstdDecoder") -> None:
+        self._obj = zstandard.ZstdDecompressor().decompressobj()
+
+    def decompress(self: "ZstdDecoder", data: bytes) -> Iterator[bytes]:
+        view = memoryview(data)
+        for i in range(0, len(view), ZSTD_INPUT_SLICE_SIZE):
+            chunk = self._obj.decompress(view[i : i + ZSTD_INPUT_SLICE_SIZE])
+            if chunk:
+                yield chunk
+
+    @property
+    def finished(self: "ZstdDecoder") -> bool:
+        return self._obj.eof
+
+
+class GzipEncoder:
+    def __init__(self: "GzipEncoder", level: int) -> None:
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self: "GzipEncoder", data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self: "GzipEncoder") -> bytes:
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self: "GzipEncoder") -> bytes:
+        return self._obj.flush()
+
+
+class BrotliEncoder:
+    def __init__(self: "BrotliEncoder", level: int) -> None:
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self: "BrotliEncoder", data: bytes) -> bytes:
+        compressed: bytes = self._obj.process(data)
+        return compressed
+
+    def flush(self: "BrotliEncoder") -> bytes:
+        compressed: bytes = self._obj.flush()
+        return compressed
+
+    def finish(self: "BrotliEncoder") -> bytes:
+        compressed: bytes = self._obj.finish()
+        return compressed
+
+
+class ZstdEncoder:
+    def __init__(self: "ZstdEncoder", level: int) -> None:
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self: "ZstdEncoder", data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self: "ZstdEncoder") -> bytes:
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self: "ZstdEncoder") -> bytes:
+        return self._obj.flush()
+
+
+DECODERS: dict[str, Callable[[], Decoder]] = {"gzip": GzipDecoder}
+# order of ENCODERS is the server preference when the client accepts multiple encodings with the same q-value
+ENCODERS: dict[str, Callable[[int], Encoder]] = {}
+DECODE_ERRORS: tuple[type[Exception], ...] = (zlib.error,)
+if zstandard is not None:
+    DECODERS["zstd"] = ZstdDecoder
+    ENCODERS["zstd"] = ZstdEncoder
+    DECODE_ERRORS += (zstandard.ZstdError,)
+if brotli is not None:
+    DECODERS["br"] = BrotliDecoder
+    ENCODERS["br"] = BrotliEncoder
+    DECODE_ERRORS += (brotli.error,)
+ENCODERS["gzip"] = GzipEncoder
+DEFAULT_COMPRESSION_LEVELS = {"zstd": 3, "br": 4, "gzip": 6}
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """Select response content-coding from Accept-Encoding header value, see RFC 9110 section 12.5.3"""
+    qvalues: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        qvalue = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    qvalue = float(value)
+                except ValueError:
+                    qvalue = 0.0
+        qvalues[coding] = qvalue
+
+    selected, selected_qvalue = None, 0.0
+    for coding in ENCODERS:
+        qvalue = qvalues.get(coding, qvalues.get("*", 0.0))
+        if qvalue > selected_qvalue:
+            selected, selected_qvalue = coding, qvalue
+    return selected
+
+
+class RequestDecompressionMiddleware:
+    """Decompress gzip, br and zstd encoded request bodies while streaming
+
+    Needs to be added after (wrapping) ContentSizeLimitMiddleware, so the max content size is checked against the
+    decoded body. The size of the encoded body is checked against max_compressed_size, or against the limit of its media
+    type in max_compressed_size_media_types (as the max content size of ContentSizeLimitMiddleware).
+    """
+
+    def __init__(
+        self: "RequestDecompressionMiddleware",
+        app: ASGIApp,
+        max_compressed_size: int | None = None,
+        max_compressed_size_media_types: dict[str, int] | None = None,
+    ) -> None:
+        self.app = app
+        self.max_compressed_size = max_compressed_size
+        self.max_compressed_size_media_types = max_compressed_size_media_types or {}
+
+    def get_max_compressed_size(self: "RequestDecompressionMiddleware", scope: Scope) -> int | None:
+        media_type = get_media_type(scope)
+        if media_type is not None and media_type in self.max_compressed_size_media_types:
+            return self.max_compressed_size_media_types[media_type]
+        return self.max_compressed_size
+
+    @staticmethod
+    def check_compressed_size(received: int, max_compressed_size: int | None) -> None:
+        if max_compressed_size is not None and received > max_compressed_size:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Maximum compressed content size limit ({max_compressed_size}) exceeded ({received} bytes read)",
+            )
+
+    def receive_wrapper(
+        self: "RequestDecompressionMiddleware",
+        receive: Receive,
+        content_encoding: str,
+        decoder: Decoder,
+        max_compressed_size: int | None,
+    ) -> Callable:
+        received = 0
+        chunks: Iterator[bytes] = iter(())
+        more_body = True
+        done = False
+
+        def next_chunk() -> bytes | None:
+            try:
+                return next(chunks, None)
+            except DECODE_ERRORS as e:
+                raise HTTPException(
+                    status_code=400, detail=f"Request body is not valid {content_encoding} encoded data"
+                ) from e
+
+        async def inner() -> Message:
+            nonlocal received, chunks, more_body, done
+            if done:  # body complete, pass through to detect client disconnects
+                return await receive()
+            while (chunk := next_chunk()) is None:
+                if not more_body:
+                    if not decoder.finished:
+                        raise HTTPException(
+                            status_code=400, detail=f"Request body is truncated {content_encoding} encoded data"
+                        )
+                    done = True
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                message = await receive()
+                if message["type"] != "http.request":
+                    return message
+                body = message.get("body", b"")
+                received += len(body)
+                self.check_compressed_size(received, max_compressed_size)
+                more_body = message.get("more_body", False)
+                chunks = decoder.decompress(body)
+            return {"type": "http.request", "body": chunk, "more_body": True}
+
+        return inner
+
+    async def __call__(self: "RequestDecompressionMiddleware", scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_encoding = Headers(scope=scope).get("content-encoding", "identity").strip().lower()
+        if content_encoding == "identity":
+            await self.app(scope, receive, send)
+            return
+
+        if content_encoding not in DECODERS:
+            response = problem_response(
+                415,
+                f"Unsupported Content-Encoding: {content_encoding}, supported encodings are: {', '.join(DECODERS)}",
+            )
+            response.headers["Accept-Encoding"] = ", ".join(DECODERS)  # see RFC 9110 section 12.5.3
+            await response(scope, receive, send)
+            return
+
+        content_length = get_content_length(scope)
+        max_compressed_size = self.get_max_compressed_size(scope)
+        if max_compressed_size is not None and content_length is not None and content_length > max_compressed_size:
+            response = problem_response(
+                413,
+                f"Maximum compressed content size limit ({max_compressed_size}) exceeded (Content-Length: {content_length} bytes)",
+            )
+            await response(scope, receive, send)
+            return
+
+        # decoded body has unknown length, drop the headers describing the encoded body
+        scope["headers"] = [
+            (k, v) for k, v in scope["headers"] if k.lower() not in (b"content-encoding", b"content-length")
+        ]
+        decoder = DECODERS[content_encoding]()
+        await self.app(scope, self.receive_wrapper(receive, content_encoding, decoder, max_compressed_size), send)
+
+
+class ResponseCompressionMiddleware:
+    """Compress response bodies with the content-coding negotiated through the Accept-Encoding header
+
+    Responses smaller than minimum_size are not compressed, streaming responses are compressed chunk by chunk. Each
+    chunk is flushed from the encoder, so the client receives it without waiting for the rest of the response (as the
+    features of a CityJSONSeq response).
+    """
+
+    def __init__(
+        self: "ResponseCompressionMiddleware",
+        app: ASGIApp,
+        minimum_size: int = 1000,
+        compression_levels: dict[str, int] | None = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compression_levels = DEFAULT_COMPRESSION_LEVELS | (compression_levels or {})
+
+    async def __call__(self: "ResponseCompressionMiddleware", scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = CompressionResponder(self.app, encoding, self.compression_levels[encoding], self.minimum_size)
+        await responder(scope, receive, send)
+
+
+class CompressionResponder:
+    def __init__(self: "CompressionResponder", app: ASGIApp, encoding: str, level: int, minimum_size: int) -> None:
+        self.app = app
+        self.encoding = encoding
+        self.level = level
+        self.minimum_size = minimum_size
+        self.send: Send
+        self.start_message: Message | None = None
+        self.encoder: Encoder | None = None
+        self.passthrough = False
+
+    async def __call__(self: "CompressionResponder", scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_with_compression)
+
+    async def send_start_message(self: "CompressionResponder") -> None:
+        if self.start_message is not None:
+            await self.send(self.start_message)
+            self.start_message = None
+
+    async def send_with_compression(self: "CompressionResponder", message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self.passthrough = "content-encoding" in headers or headers.get("content-type", "").startswith(
+                "text/event-stream"
+            )
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send_start_message()
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.encoder is None:
+            assert self.start_message is not None  # noqa: S101
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send_start_message()
+                await self.send(message)
+                return
+
+            self.encoder = ENCODERS[self.encoding](self.level)
+            headers["Content-Encoding"] = self.encoding
+            if not more_body:
+                body = self.encoder.compress(body) + self.encoder.finish()
+                headers["Content-Length"] = str(len(body))
+                await self.send_start_message()
+                await self.send({"type": "http.response.body", "body": body, "more_body": False})
+                return
+            del headers["Content-Length"]
+            await self.send_start_message()
+
+        data = self.encoder.compress(body)
+        if not more_body:
+            data += self.encoder.finish()
+        elif body:
+            data += self.encoder.flush()
+        if data or not more_body:
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
@@ -11,3 +11,12 @@ DEVIATION_VALID_BBOX = [
 DENSITY_CHECK_RESULT_HEADER = "density-check-result"
 THREE_DIMENSIONAL = 3
 TWO_DIMENSIONAL = 2
+TRANSFORMER_CACHE_SIZE = (
+    256  # number of (source-crs, target-crs, with-epoch) combinations for which the selected transformer is cached
+)
+CITYJSON_MEDIA_TYPE = "application/city+json"
+CITYJSON_SEQ_MEDIA_TYPE = "application/city+json-seq"
+MAX_VALIDATION_ERRORS = 100  # number of validation errors in a response, further errors are counted in errors-omitted
+MAX_DENSITY_CHECK_REPORT_SEGMENTS = (
+    100  # failed line segments in the density check report of POST /transform, unless density-check-report=full
+)
@@ -1,17 +1,18 @@
 import math
 from collections.abc import Callable, Generator
-from functools import partial, wraps
-from importlib import resources as impresources
+from functools import lru_cache, partial
 from itertools import chain
 from typing import Any, cast
 
-import yaml
+import numpy as np
+import numpy.typing as npt
+from geodense.geojson import CrsFeatureCollection
 from geodense.lib import (  # type: ignore
     GeojsonObject,
     InfValCoordinateError,
-    transform_geojson_geometries,
 )
 from geodense.types import GeojsonGeomNoGeomCollection
+from geojson_pydantic import Feature, GeometryCollection
 from geojson_pydantic.geometries import _GeometryBase
 from geojson_pydantic.types import (
     BBox,
@@ -24,24 +25,23 @@ from geojson_pydantic.types import (
 )
 from pyproj import CRS, Transformer, transformer
 from shapely import GeometryCollection as ShpGeometryCollection
-from shapely.geometry import shape
 
-from coordinate_transformation_api import assets
+from coordinate_transformation_api.cityjson.vertices import round_decimals
 from coordinate_transformation_api.constants import (
     DEFAULT_DIGITS_FOR_ROUNDING,
     HEIGHT_DIGITS_FOR_ROUNDING,
     THREE_DIMENSIONAL,
+    TRANSFORMER_CACHE_SIZE,
     TWO_DIMENSIONAL,
 )
+from coordinate_transformation_api.geometry_arrays import GeometryArrays
 from coordinate_transformation_api.models import (
     TransformationNotPossibleError,
 )
+from coordinate_transformation_api.startup_cache import load_crs_config
 from coordinate_transformation_api.types import CoordinatesType, ShapelyGeometry
 
-assets_resources = impresources.files(assets)
-crs_conf = assets_resources.joinpath("crs-config.yaml")
-with open(str(crs_conf)) as f:
-    CRS_CONFIG = yaml.safe_load(f)
+CRS_CONFIG = load_crs_config()
 
 
 def get_precision(crs: CRS) -> int:
@@ -51,24 +51,22 @@ def get_precision(crs: CRS) -> int:
     return DEFAULT_DIGITS_FOR_ROUNDING
 
 
-def get_shapely_objects(
-    body: GeojsonObject,
-) -> list[ShapelyGeometry]:
-    def _shapely_object(geometry: GeojsonGeomNoGeomCollection) -> ShapelyGeometry:
-        return shape(geometry)  # type: ignore
-
-    result = transform_geojson_geometries(body, _shapely_object)
-    flat_result: list[ShapelyGeometry] = []
-    # check if result iterable
-    if hasattr(result, "__iter__"):
-        for item in result:
-            if isinstance(item, list):
-                flat_result.append(ShpGeometryCollection(item))
-            else:
-                flat_result.append(item)
-    else:
-        flat_result = [result]
-    return flat_result
+def get_shapely_objects(body: GeojsonObject, arrays: GeometryArrays | None = None) -> list[ShapelyGeometry | None]:
+    """Shapely geometries of the Features of a FeatureCollection or the members of a GeometryCollection, geometries
+    of a GeometryCollection as a shapely GeometryCollection and Features without geometry as None. The geometries are
+    converted from the GeometryArrays of body (arrays, when already built by the caller)."""
+    if arrays is None:
+        arrays = GeometryArrays(body)
+    geometries = arrays.to_shapely()
+
+    def _shapely_object(item: Any) -> ShapelyGeometry | None:  # noqa: ANN401
+        if isinstance(item, list):
+            return ShpGeometryCollection([_shapely_object(member) for member in item])
+        return geometries[item] if item is not None else None
+
+    if isinstance(arrays.structure, list):
+        return [_shapely_object(item) for item in arrays.structure]
+    return [_shapely_object(arrays.structure)]
 
 
 def mutate_geom_coordinates(
@@ -146,6 +144,78 @@ def get_bbox_from_coordinates(coordinates: Any) -> BBox:  # noqa: ANN401
         raise ValueError(f"expected dimension of coordinates is either 2 or 3, got {len(coordinate_tuples)}")
 
 
+def _bbox_from_extent(extent: tuple[tuple[float, ...], tuple[float, ...]] | None) -> BBox | None:
+    if extent is None:
+        return None
+    mins, maxs = extent
+    if len(mins) not in (TWO_DIMENSIONAL, THREE_DIMENSIONAL):
+        raise ValueError(f"expected dimension of coordinates is either 2 or 3, got {len(mins)}")
+    return cast(BBox, mins + maxs)
+
+
+def has_bbox(item: GeojsonObject | None) -> bool:
+    """Whether item or any of its members has a bbox member, without traversing coordinates"""
+    if item is None:
+        return False
+    if item.bbox is not None:
+        return True
+    if isinstance(item, CrsFeatureCollection):
+        return any(has_bbox(feature) for feature in item.features)
+    if isinstance(item, Feature):
+        return has_bbox(item.geometry)
+    if isinstance(item, GeometryCollection):
+        return any(has_bbox(geometry) for geometry in item.geometries)
+    return False
+
+
+class BboxSweep:
+    """Bboxes of a GeoJSON object computed during the transform sweep, as update_bbox sets them after transforming
+
+    The transformed positions of a geometry are collected by the coordinate callback of the sweep and reduced to the
+    extent of the geometry at the end of the geometry callback. The extents of GeometryCollections, Features and
+    FeatureCollections are aggregated from those of their members (traverse_geojson_geometries calls node callbacks
+    bottom-up). As in update_bbox, only objects with a bbox member get an updated bbox and the dimension of a bbox is
+    the lowest dimension of its positions.
+    """
+
+    def __init__(self: "BboxSweep") -> None:
+        self.positions: list[Position] = []
+        self.extents: dict[int, tuple[tuple[float, ...], tuple[float, ...]] | None] = {}
+
+    def geometry_callback(
+        self: "BboxSweep", mutate: Callable[[GeojsonGeomNoGeomCollection], None], geom: GeojsonGeomNoGeomCollection
+    ) -> None:
+        self.positions = []
+        mutate(geom)
+        extent = None
+        if self.positions:
+            columns = list(zip(*self.positions, strict=False))
+            extent = tuple(map(min, columns)), tuple(map(max, columns))
+        self.extents[id(geom)] = extent
+
+    def node_callback(self: "BboxSweep", item: GeojsonObject) -> None:
+        if isinstance(item, CrsFeatureCollection):
+            members: list = item.features
+        elif isinstance(item, Feature):
+            members = [item.geometry]
+        elif isinstance(item, GeometryCollection):
+            members = item.geometries
+        else:  # extent set by geometry_callback
+            members = []
+        if members:
+            extents = [extent for member in members if (extent := self.extents.get(id(member))) is not None]
+            self.extents[id(item)] = (
+                (
+                    tuple(map(min, zip(*(mins for mins, _ in extents), strict=False))),
+                    tuple(map(max, zip(*(maxs for _, maxs in extents), strict=False))),
+                )
+                if extents
+                else None
+            )
+        if item.bbox is not None:  # only update bbox if already set
+            item.bbox = _bbox_from_extent(self.extents.get(id(item)))
+
+
 def exclude_transformation(source_crs_str: str, target_crs_str: str) -> bool:
     return source_crs_str in CRS_CONFIG and (target_crs_str in CRS_CONFIG[source_crs_str]["exclude-transformations"])
 
@@ -194,7 +264,20 @@ def check_axis(s_crs: CRS, t_crs: CRS) -> None:
         )
 
 
-def get_transformer(source_crs: CRS, target_crs: CRS, epoch: float | None) -> Transformer:  # quit
+def get_transformer(source_crs: CRS, target_crs: CRS, epoch: float | None) -> Transformer:
+    # creating a TransformerGroup is expensive, the selected transformer only depends on the crss and whether an epoch
+    # is supplied, so the selection is cached
+    return _get_transformer(source_crs, target_crs, epoch is not None)
+
+
+def transformer_cache_stats() -> tuple[int, int]:
+    """Returns number of hits and misses of the transformer cache"""
+    cache_info = _get_transformer.cache_info()
+    return cache_info.hits, cache_info.misses
+
+
+@lru_cache(maxsize=TRANSFORMER_CACHE_SIZE)
+def _get_transformer(source_crs: CRS, target_crs: CRS, with_epoch: bool) -> Transformer:
     # Get available transformer through TransformerGroup
     # TODO check/validate if always_xy=True is correct
     tfg = transformer.TransformerGroup(source_crs, target_crs, allow_ballpark=False, always_xy=True)
@@ -207,7 +290,7 @@ def get_transformer(source_crs: CRS, target_crs: CRS, epoch: float | None) -> Tr
     # When no input epoch is given we need to check that we don't perform an time-dependent transformation. Otherwise
     # the transformation would be done with a default epoch value, which isn't correct. So we need to search for the "best"
     # transformation that doesn't include a time-dependent operation methode.
-    if epoch is None:
+    if not with_epoch:
         for tf in tfg.transformers:
             if needs_epoch(tf) is not True:
                 return tf
@@ -216,7 +299,7 @@ def get_transformer(source_crs: CRS, target_crs: CRS, epoch: float | None) -> Tr
     # we don't want to use the 'default' epoch associated with the transformation. Instead, we won't execute the transformation. Because
     # when the transformation is done with the default epoch (e.g. 2010), but the coords are from 2023 this
     # results in wrong results. We prefer giving an exception, rather than a wrong result.
-    if needs_epoch(tfg.transformers[0]) is True and epoch is None:
+    if needs_epoch(tfg.transformers[0]) is True and not with_epoch:
         raise TransformationNotPossibleError(
             src_crs=source_crs,
             target_crs=target_crs,
@@ -254,35 +337,38 @@ def get_transform_crs_fun_city_json(
     precision: int | None = None,
     epoch: float | None = None,
 ) -> Callable[
-    [list[float]],
-    list[float],
-]:
-    fun = get_transform_crs_fun(source_crs, target_crs, precision, epoch)
-
-    @wraps(fun)
-    def inner(val: list[float]) -> list[float]:
-        """wrapper function for transform_crs function to accept and return tuple[float,float,float] for cityjson to satisfy mypy"""
-        val_pos = Position3D(*val)
-        val_pos_t = fun(val_pos)
-        return list(val_pos_t)
-
-    return inner
-
-
-def get_transform_crs_fun(
-    source_crs: CRS,
-    target_crs: CRS,
-    precision: int | None = None,
-    epoch: float | None = None,
-) -> Callable[
-    [Position],
-    Position,
+    [npt.NDArray[np.float64]],
+    npt.NDArray[np.float64],
 ]:
-    """TODO: improve type annotation/handling geojson/cityjson transformation, with the current implementation mypy is not complaining"""
-
+    """Returns function to transform an (N, 3) array of CityJSON vertices with one call of the transformer(s), with the
+    same results as the function returned by get_transform_crs_fun. CityJSON vertices are 3D, so vertices of which the
+    height cannot be transformed raise an InfValCoordinateError instead of being returned as 2D positions."""
     if precision is None:
         precision = get_precision(target_crs)
-
+    transformer, ver_transformer = _get_transformers(source_crs, target_crs, epoch)
+
+    def transform_vertices(vertices: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        xx, yy, zz = vertices[:, 0], vertices[:, 1], vertices[:, 2]
+        tt = np.full(len(vertices), float(epoch)) if epoch is not None else None
+        if ver_transformer is not None:  # see transform_compound_crs
+            x, y, _ = transformer.transform(xx, yy, zz, tt)[:3]
+            z = ver_transformer.transform(xx, yy, zz, tt)[2]
+            height = round_decimals(np.asarray(z), HEIGHT_DIGITS_FOR_ROUNDING)
+        else:  # see transform_crs
+            x, y, z = transformer.transform(xx, yy, zz, tt)[:3]
+            height = round_decimals(round_decimals(np.asarray(z), precision), HEIGHT_DIGITS_FOR_ROUNDING)
+        x = round_decimals(np.asarray(x), precision)
+        y = round_decimals(np.asarray(y), precision)
+        output = np.column_stack([x, y, height])
+        if np.isinf(output).any():
+            raise InfValCoordinateError("Coordinates contain inf val")
+        return output
+
+    return transform_vertices
+
+
+def _get_transformers(source_crs: CRS, target_crs: CRS, epoch: float | None) -> tuple[Transformer, Transformer | None]:
+    """Returns the transformer and, for transformations involving a compound CRS, the vertical transformer"""
     check_axis(source_crs, target_crs)
     if exclude_transformation(
         "{}:{}".format(*source_crs.to_authority()),
@@ -308,14 +394,32 @@ def get_transform_crs_fun(
             )  # this will do the 3d transformation that might fail, in that case Z/H value is dropped
         except TransformationNotPossibleError as e:
             raise TransformationNotPossibleError(source_crs, target_crs, reason=e.reason) from e
+        return h_transformer, v_transformer
+    return get_transformer(source_crs, target_crs, epoch), None
+
+
+def get_transform_crs_fun(
+    source_crs: CRS,
+    target_crs: CRS,
+    precision: int | None = None,
+    epoch: float | None = None,
+) -> Callable[
+    [Position],
+    Position,
+]:
+    """TODO: improve type annotation/handling geojson/cityjson transformation, with the current implementation mypy is not complaining"""
+
+    if precision is None:
+        precision = get_precision(target_crs)
 
+    transformer, v_transformer = _get_transformers(source_crs, target_crs, epoch)
+    if v_transformer is not None:
         # note transformers are injected in transform_compound_crs so they are instantiated only once
         _transform_compound_crs = partial(
-            transform_compound_crs, h_transformer, v_transformer, target_crs, precision, epoch
+            transform_compound_crs, transformer, v_transformer, target_crs, precision, epoch
         )
         return _transform_compound_crs
     else:
-        transformer = get_transformer(source_crs, target_crs, epoch)
         # note transformer is injected in transform_crs is instantiated once
         # creating transformers is expensive
         _transform_crs = partial(transform_crs, transformer, precision, epoch)
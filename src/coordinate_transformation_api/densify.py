@@ -0,0 +1,172 @@
+"""Vectorized densification, an alternative to densify_geojson_object of geodense with identical output
+
+geodense inserts the intermediate points of each line segment separately, with a pyproj call per segment. Here the
+line segments of all coordinate sequences are taken from the GeometryArrays of the GeoJSON object, their geodesic lengths and
+azimuths are calculated with a single Geod.inv call and all intermediate points with a single Geod.fwd call, on the
+start points repeated by the number of intermediate points of their segment. The densified coordinate sequences are
+assembled with offsets into an output array. The output is a deep copy of the input in which the densified coordinate
+sequences replace the input sequences.
+
+As in geodense, the vertices of the coordinate sequences are rounded to the precision of the CRS of the densify config,
+and a line segment starts at the rounded vertex of the previous segment, except for the first segment.
+"""
+
+import copy
+
+import numpy as np
+import numpy.typing as npt
+from geodense.lib import GeojsonObject, validate_geom_type  # type: ignore
+from geodense.models import DEFAULT_PRECISION_METERS, DenseConfig, GeodenseError
+from geojson_pydantic.types import Position, Position2D, Position3D
+
+from coordinate_transformation_api.cityjson.vertices import round_decimals
+from coordinate_transformation_api.density_check import segment_lengths
+from coordinate_transformation_api.geometry_arrays import GeometryArrays, ranges
+
+
+class LineSegments:
+    """Consecutive positions of the coordinate sequences as arrays, a segment i runs from position i to i + 1"""
+
+    def __init__(
+        self: "LineSegments", arrays: GeometryArrays, sequences: npt.NDArray[np.int64], precision: int
+    ) -> None:
+        index = ranges(arrays.sequence_offsets, sequences)
+        self.sizes = arrays.sequence_sizes[sequences]
+        self.three_dimensional = arrays.three_dimensional[index]
+        self.x, self.y, self.h = arrays.x[index], arrays.y[index], arrays.z[index]
+        self.rx = round_decimals(self.x, precision)
+        self.ry = round_decimals(self.y, precision)
+        self.rh = round_decimals(self.h, DEFAULT_PRECISION_METERS)
+        self.first = arrays.first[index]
+        # segments from the last position of a coordinate sequence to the first of the next are not densified
+        self.valid = ~self.first[1:]
+
+    def start(self: "LineSegments") -> tuple[npt.NDArray[np.float64], ...]:
+        """Start positions of the segments, the rounded positions except at the start of a coordinate sequence"""
+        first = self.first[:-1]
+        return (
+            np.where(first, self.x[:-1], self.rx[:-1]),
+            np.where(first, self.y[:-1], self.ry[:-1]),
+            np.where(first, self.h[:-1], self.rh[:-1]),
+        )
+
+
+def _intermediate_point_counts(
+    lengths: npt.NDArray[np.float64], max_segment_length: float
+) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+    """Number of intermediate points and new segment length per segment longer than max_segment_length, as
+    _get_intermediate_nr_points_and_segment_length of geodense"""
+    nr_segments = np.floor_divide(lengths, max_segment_length).astype(np.int64)
+    nr_segments += np.mod(lengths, max_segment_length) > 0
+    return nr_segments - 1, lengths / nr_segments
+
+
+def _to_geographic(densify_config: DenseConfig, x: npt.NDArray, y: npt.NDArray) -> tuple[npt.NDArray, npt.NDArray]:
+    """Positions in the base geographic CRS of a projected CRS, as in geodense"""
+    if not densify_config.src_crs.is_projected:
+        return x, y
+    if densify_config.transformer is None:
+        raise GeodenseError("transformer cannot be None when src_crs.is_projected=True")
+    x_t, y_t = densify_config.transformer.transform(x, y)
+    return x_t, y_t
+
+
+def _from_geographic(
+    densify_config: DenseConfig, lons: npt.NDArray, lats: npt.NDArray
+) -> tuple[npt.NDArray, npt.NDArray]:
+    if not densify_config.src_crs.is_projected:
+        return lons, lats
+    if densify_config.back_transformer is None:
+        raise GeodenseError("back_transformer cannot be None when src_crs.is_projected=True")
+    x, y = densify_config.back_transformer.transform(lons, lats)
+    return x, y
+
+
+def predict_vertex_count(densify_config: DenseConfig, arrays: GeometryArrays) -> int:
+    """Number of vertices of the densified geometries (of arrays), from the geodesic lengths of their line segments
+    without calculating the intermediate points"""
+    if len(arrays) < 2:  # noqa: PLR2004
+        return len(arrays)
+    lengths = segment_lengths(densify_config, arrays.x, arrays.y)
+    # segments from the last position of a coordinate sequence to the first of the next are not densified, nan
+    # lengths are not counted
+    dense = ~arrays.first[1:] & (lengths > densify_config.max_segment_length)
+    nr_points, _ = _intermediate_point_counts(lengths[dense], densify_config.max_segment_length)
+    return len(arrays) + int(nr_points.sum())
+
+
+def densify_geojson_object(
+    densify_config: DenseConfig, geojson_obj: GeojsonObject, arrays: GeometryArrays | None = None
+) -> GeojsonObject:
+    """Densified copy of geojson_obj, identical to densify_geojson_object of geodense. arrays: the GeometryArrays of
+    geojson_obj, when already built by the caller"""
+    validate_geom_type(geojson_obj, "densify")
+    if densify_config.in_projection:
+        raise GeodenseError("in_projection densification is not supported by the vectorized densify engine")
+    if arrays is None:
+        arrays = GeometryArrays(geojson_obj)
+    # as in geodense, coordinate sequences of a single position (such as Points) are not rounded
+    sequences = np.flatnonzero(arrays.sequence_sizes > 1)
+    if len(sequences) == 0:
+        return copy.deepcopy(geojson_obj)
+
+    precision = densify_config.get_coord_precision()
+    segments = LineSegments(arrays, sequences, precision)
+    ax, ay, ah = segments.start()
+    bh = segments.h[1:]
+    ax_t, ay_t = _to_geographic(densify_config, ax, ay)
+    az12, _, lengths = densify_config.geod.inv(
+        ax_t, ay_t, *_to_geographic(densify_config, segments.x[1:], segments.y[1:]), return_back_azimuth=True
+    )
+    lengths = np.asarray(lengths, dtype=np.float64)
+    if np.isnan(lengths[segments.valid]).any():
+        raise GeodenseError(
+            "unable to calculate geodesic distance, output calculation geodesic distance: nan, expected: floating-point number"
+        )
+
+    dense = np.flatnonzero(segments.valid & (lengths > densify_config.max_segment_length))
+    nr_points = np.zeros(len(segments.x), dtype=np.int64)  # intermediate points after each position
+    nr_points_dense, new_lengths = _intermediate_point_counts(lengths[dense], densify_config.max_segment_length)
+    nr_points[dense] = nr_points_dense
+
+    # intermediate point k (1-based) of a segment is at distance k * new segment length from its start
+    segment = np.repeat(np.arange(len(dense)), nr_points_dense)
+    k = np.arange(len(segment)) - np.repeat(np.cumsum(nr_points_dense) - nr_points_dense, nr_points_dense) + 1
+    lons, lats, _ = densify_config.geod.fwd(
+        np.asarray(ax_t)[dense][segment],
+        np.asarray(ay_t)[dense][segment],
+        np.asarray(az12)[dense][segment],
+        k * new_lengths[segment],
+        return_back_azimuth=True,
+    )
+    lons, lats = _from_geographic(densify_config, lons, lats)
+    start = dense[segment]
+    three_dimensional = segments.three_dimensional[start] & segments.three_dimensional[start + 1]
+    height_a = ah[start]
+    heights = round_decimals(
+        height_a + k * ((bh[start] - height_a) * (new_lengths[segment] / lengths[start])), DEFAULT_PRECISION_METERS
+    )
+
+    # output index of each position, followed by the intermediate points of its segment
+    position_index = np.arange(len(segments.x)) + np.cumsum(nr_points) - nr_points
+    point_index = np.repeat(position_index[dense] + 1, nr_points_dense) + k - 1
+    size = len(segments.x) + len(segment)
+    out_x, out_y, out_h = np.empty(size), np.empty(size), np.empty(size)
+    out_3d = np.empty(size, dtype=bool)
+    out_x[position_index], out_y[position_index], out_h[position_index] = segments.rx, segments.ry, segments.rh
+    out_3d[position_index] = segments.three_dimensional
+    out_x[point_index] = round_decimals(np.asarray(lons, dtype=np.float64), precision)
+    out_y[point_index] = round_decimals(np.asarray(lats, dtype=np.float64), precision)
+    out_h[point_index], out_3d[point_index] = heights, three_dimensional
+
+    positions: list[Position] = [
+        Position3D(x, y, h) if is_3d else Position2D(x, y)
+        for x, y, h, is_3d in zip(out_x.tolist(), out_y.tolist(), out_h.tolist(), out_3d.tolist(), strict=True)
+    ]
+    ends = position_index[np.cumsum(segments.sizes) - 1] + 1
+    # copy geojson_obj with the densified coordinate sequences, by passing them as copies of the input sequences
+    memo = {
+        id(arrays.sequences[i]): positions[begin:end]
+        for i, begin, end in zip(sequences.tolist(), [0, *ends[:-1].tolist()], ends.tolist(), strict=True)
+    }
+    return copy.deepcopy(geojson_obj, memo)
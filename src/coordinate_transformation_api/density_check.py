@@ -0,0 +1,167 @@
+"""Vectorized density check, an alternative to check_density_geojson_object of geodense with identical output
+
+geodense calculates the length of each line segment with a separate call to pyproj. Here the line segments of all
+coordinate sequences of the GeoJSON object are taken from its GeometryArrays, in the same order as geodense traverses
+them, and their lengths are calculated with a single call to pyproj. The segments longer than
+max_segment_length are selected with a mask and reported as in geodense.
+
+Before measuring, an upper bound of the segment lengths of each coordinate sequence is derived from its bounding box
+(see max_segment_length_bounds). The segments of sequences of which the bound does not exceed max_segment_length, such
+as the rings of small parcels, cannot fail the check and are not measured.
+"""
+
+import numpy as np
+import numpy.typing as npt
+from geodense.geojson import CrsFeatureCollection
+from geodense.lib import GeojsonObject, validate_geom_type  # type: ignore
+from geodense.models import DenseConfig, GeodenseError
+from geodense.types import ReportLineString
+from geojson_pydantic import Feature, LineString
+
+from coordinate_transformation_api.geometry_arrays import GeometryArrays
+
+SEGMENT_LENGTH_TOLERANCE = (
+    0.001  # segments are reported when longer than max_segment_length + tolerance, as in geodense
+)
+BBOX_MARGIN = 0.01  # relative margin of the geographic bbox of a projected bbox, for the curvature of its edges
+MAX_LATITUDE = 90.0
+FIRST_CHUNK_SEGMENTS = 4096  # segments measured in the first chunk when the number of failed segments is capped
+
+
+def segment_lengths(
+    densify_config: DenseConfig, x: npt.NDArray[np.float64], y: npt.NDArray[np.float64]
+) -> npt.NDArray[np.float64]:
+    """Length of the segments from (x[:-1], y[:-1]) to (x[1:], y[1:]), with the distance calculation of geodense"""
+    if densify_config.in_projection:
+        return np.sqrt((x[1:] - x[:-1]) ** 2 + (y[1:] - y[:-1]) ** 2)
+    if densify_config.src_crs.is_projected:
+        if densify_config.transformer is None:
+            raise GeodenseError("transformer cannot be None when src_crs.is_projected=True")
+        x, y = densify_config.transformer.transform(x, y)
+    _, _, lengths = densify_config.geod.inv(x[:-1], y[:-1], x[1:], y[1:], return_back_azimuth=True)
+    return np.asarray(lengths, dtype=np.float64)
+
+
+def _geographic_bboxes(
+    densify_config: DenseConfig, bboxes: tuple[npt.NDArray[np.float64], ...]
+) -> tuple[npt.NDArray[np.float64], ...]:
+    """Geographic bboxes containing the bboxes in the projected CRS of densify_config, from their corners and edge
+    midpoints with a relative margin"""
+    if densify_config.transformer is None:
+        raise GeodenseError("transformer cannot be None when src_crs.is_projected=True")
+    min_x, min_y, max_x, max_y = bboxes
+    mid_x, mid_y = (min_x + max_x) / 2, (min_y + max_y) / 2
+    xs = np.stack([min_x, mid_x, max_x, max_x, max_x, mid_x, min_x, min_x])
+    ys = np.stack([min_y, min_y, min_y, mid_y, max_y, max_y, max_y, mid_y])
+    lons, lats = densify_config.transformer.transform(xs, ys)
+    lons, lats = np.asarray(lons), np.asarray(lats)
+    margin_lon = (lons.max(axis=0) - lons.min(axis=0)) * BBOX_MARGIN
+    margin_lat = (lats.max(axis=0) - lats.min(axis=0)) * BBOX_MARGIN
+    return (
+        lons.min(axis=0) - margin_lon,
+        lats.min(axis=0) - margin_lat,
+        lons.max(axis=0) + margin_lon,
+        lats.max(axis=0) + margin_lat,
+    )
+
+
+def max_segment_length_bounds(
+    densify_config: DenseConfig, bboxes: tuple[npt.NDArray[np.float64], ...]
+) -> npt.NDArray[np.float64]:
+    """Upper bounds of the length of any segment within the bboxes (min_x, min_y, max_x, max_y)
+
+    For a geographic bbox the bound is the length of the path along a meridian over the latitude range followed by a
+    parallel over the longitude range, with the meridional radius of curvature of the highest and the radius of the
+    parallel of the lowest absolute latitude of the bbox, which is at least the geodesic distance between any two
+    positions in it. Bboxes with invalid latitudes get a nan bound, so they are measured.
+    """
+    min_x, min_y, max_x, max_y = bboxes
+    if densify_config.in_projection:
+        return np.hypot(max_x - min_x, max_y - min_y)
+    if densify_config.src_crs.is_projected:
+        min_x, min_y, max_x, max_y = _geographic_bboxes(densify_config, bboxes)
+    valid = (min_y >= -MAX_LATITUDE) & (max_y <= MAX_LATITUDE)
+    high_lat = np.radians(np.maximum(np.abs(min_y), np.abs(max_y)))
+    low_lat = np.radians(np.where((min_y <= 0) & (max_y >= 0), 0.0, np.minimum(np.abs(min_y), np.abs(max_y))))
+    a, es = densify_config.geod.a, densify_config.geod.es
+    meridional_radius = a * (1 - es) / (1 - es * np.sin(high_lat) ** 2) ** 1.5
+    parallel_radius = a * np.cos(low_lat) / np.sqrt(1 - es * np.sin(low_lat) ** 2)
+    bounds = np.radians(max_y - min_y) * meridional_radius + np.radians(max_x - min_x) * parallel_radius
+    return np.where(valid, bounds, np.nan)
+
+
+def _measured_positions(
+    densify_config: DenseConfig, x: npt.NDArray[np.float64], y: npt.NDArray[np.float64], sizes: npt.NDArray[np.int64]
+) -> npt.NDArray[np.bool_]:
+    """Mask of the positions of the coordinate sequences (of sizes) of which the segments need to be measured"""
+    starts = np.cumsum(sizes) - sizes
+    nonempty = sizes > 0
+    bboxes = tuple(
+        ufunc.reduceat(values, starts[nonempty])
+        for ufunc, values in ((np.minimum, x), (np.minimum, y), (np.maximum, x), (np.maximum, y))
+    )
+    measured = np.zeros(len(sizes), dtype=bool)
+    # not (bound <= max_segment_length), to measure the sequences with a nan bound
+    measured[nonempty] = ~(max_segment_length_bounds(densify_config, bboxes) <= densify_config.max_segment_length)
+    return np.repeat(measured, sizes)
+
+
+def _failed_segments(
+    densify_config: DenseConfig,
+    x: npt.NDArray[np.float64],
+    y: npt.NDArray[np.float64],
+    checked: npt.NDArray[np.bool_],
+    max_failed_segments: int | None,
+) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+    """Indices of the checked segments longer than max_segment_length (at most max_failed_segments) and the lengths
+    of the segments"""
+    lengths = np.zeros(len(checked))
+    failed: list[npt.NDArray[np.int64]] = []
+    nr_failed, start = 0, 0
+    chunk = len(checked) if max_failed_segments is None else FIRST_CHUNK_SEGMENTS
+    while start < len(checked) and (max_failed_segments is None or nr_failed < max_failed_segments):
+        end = min(start + chunk, len(checked))
+        lengths[start:end] = segment_lengths(densify_config, x[start : end + 1], y[start : end + 1])
+        if not densify_config.in_projection and np.isnan(lengths[start:end][checked[start:end]]).any():
+            raise GeodenseError(
+                "unable to calculate geodesic distance, output calculation geodesic distance: nan, expected: floating-point number"
+            )
+        limit = densify_config.max_segment_length + SEGMENT_LENGTH_TOLERANCE
+        failed.append(np.flatnonzero(checked[start:end] & (lengths[start:end] > limit)) + start)
+        nr_failed += len(failed[-1])
+        start, chunk = end, chunk * 2
+    return np.concatenate(failed or [np.zeros(0, dtype=np.int64)])[:max_failed_segments], lengths
+
+
+def check_density_geojson_object(
+    densify_config: DenseConfig,
+    geojson_obj: GeojsonObject,
+    max_failed_segments: int | None = None,
+    arrays: GeometryArrays | None = None,
+) -> CrsFeatureCollection:
+    """Density check report of geojson_obj, identical to check_density_geojson_object of geodense when
+    max_failed_segments is None. arrays: the GeometryArrays of geojson_obj, when already built by the caller"""
+    validate_geom_type(geojson_obj, "density-check")
+    if arrays is None:
+        arrays = GeometryArrays(geojson_obj)
+    report: list[ReportLineString] = []
+    if len(arrays) > 1:
+        x, y = arrays.x, arrays.y
+        index = np.flatnonzero(_measured_positions(densify_config, x, y, arrays.sequence_sizes))
+        # the segments from the last position of a sequence to the first position of the next are not checked
+        checked = (index[1:] == index[:-1] + 1) & ~arrays.first[index[1:]]
+        failed, lengths = _failed_segments(densify_config, x[index], y[index], checked, max_failed_segments)
+        report = [(lengths[i].item(), (arrays.position(index[i]), arrays.position(index[i] + 1))) for i in failed]
+
+    # the positions are positions of geojson_obj, so the features are constructed without validation
+    features: list[Feature] = [
+        Feature.model_construct(
+            type="Feature",
+            properties={"segment_length": length},
+            geometry=LineString.model_construct(type="LineString", coordinates=list(segment)),
+        )
+        for length, segment in report
+    ]
+    result = CrsFeatureCollection(features=features, type="FeatureCollection", name="density-check-report")
+    result.set_crs_auth_code(":".join(densify_config.src_crs.to_authority()))
+    return result
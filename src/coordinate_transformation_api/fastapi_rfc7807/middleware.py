@@ -15,7 +15,7 @@ from starlette.requests import Request
 from starlette.responses import Response
 from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from coordinate_transformation_api.constants import DENSITY_CHECK_RESULT_HEADER
+from coordinate_transformation_api.constants import DENSITY_CHECK_RESULT_HEADER, MAX_VALIDATION_ERRORS
 from coordinate_transformation_api.models import (
     CrsNotFoundError,
     DataValidationError,
@@ -305,14 +305,28 @@ def from_request_validation_error(exc: RequestValidationError) -> ProblemError:
          A new Problem instance populated from the RequestValidationError.
     """
 
+    errors = exc.errors()
+    extra = {}
+    if len(errors) > MAX_VALIDATION_ERRORS:
+        extra = {"errors-omitted": len(errors) - MAX_VALIDATION_ERRORS}
+        errors = errors[:MAX_VALIDATION_ERRORS]
     return ProblemError(
         title="Validation Error",
         status=400,
         detail="One or more user-provided parameters are invalid",
-        errors=exc.errors(),
+        errors=[without_container_input(error) for error in errors],
+        **extra,  # type: ignore
     )
 
 
+def without_container_input(error: Any) -> Any:  # noqa: ANN401
+    """Validation error without its input when the input is an object or array, which can be (a large part of) the
+    request body, or bytes, the raw request body of a body validated as JSON (not JSON serializable)"""
+    if isinstance(error, dict) and isinstance(error.get("input"), dict | list | bytes):
+        return {key: value for key, value in error.items() if key != "input"}
+    return error
+
+
 def from_exception(exc: Exception) -> ProblemError:
     """Create a new Problem instance from a broad-class Exception.
 
@@ -0,0 +1,143 @@
+"""Columnar representation of the geometries of a GeoJSON object
+
+GeometryArrays holds the positions of all geometries of a GeoJSON object in coordinate arrays, with offset arrays in
+the ragged array layout of shapely (see shapely.to_ragged_array): coordinate sequences (LineStrings, rings and the
+positions of a (Multi)Point) index into the positions, parts (Polygons, or the single part of other geometry types)
+index into the coordinate sequences and geometries index into the parts. The geometries are in the order in which
+geodense traverses them, so the consumers of the arrays (density check, densify, bbox check and shapely conversion)
+process the positions in the same order as geodense.
+
+The arrays are read once per GeoJSON object, by the request handler, and passed to each consumer. Reading them creates
+no objects per position: the coordinates are read from the positions of the GeoJSON object with a flat iterator.
+"""
+
+from itertools import chain
+from typing import cast
+
+import numpy as np
+import numpy.typing as npt
+import shapely
+from geodense.lib import GeojsonObject, transform_geojson_geometries  # type: ignore
+from geodense.types import GeojsonGeomNoGeomCollection, LineStringCoords, Nested
+from geojson_pydantic.types import Position, Position2D, Position3D
+
+from coordinate_transformation_api.constants import THREE_DIMENSIONAL
+
+SHAPELY_GEOMETRY_TYPES = {
+    "Point": shapely.GeometryType.POINT,
+    "MultiPoint": shapely.GeometryType.MULTIPOINT,
+    "LineString": shapely.GeometryType.LINESTRING,
+    "MultiLineString": shapely.GeometryType.MULTILINESTRING,
+    "Polygon": shapely.GeometryType.POLYGON,
+    "MultiPolygon": shapely.GeometryType.MULTIPOLYGON,
+}
+
+
+def offsets(sizes: npt.NDArray[np.int64]) -> npt.NDArray[np.int64]:
+    """Offsets of consecutive ranges of sizes, with a leading 0"""
+    return np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+
+
+def ranges(range_offsets: npt.NDArray[np.int64], selection: npt.NDArray[np.int64]) -> npt.NDArray[np.int64]:
+    """Concatenated indices of the selected ranges of range_offsets"""
+    sizes = range_offsets[selection + 1] - range_offsets[selection]
+    starts = np.repeat(range_offsets[selection] - (np.cumsum(sizes) - sizes), sizes)
+    return starts + np.arange(sizes.sum(), dtype=np.int64)
+
+
+class GeometryArrays:
+    """Positions of the geometries of a GeoJSON object as arrays, see module docstring"""
+
+    def __init__(self: "GeometryArrays", geojson_obj: GeojsonObject) -> None:
+        # the coordinate sequences of the GeoJSON object, not copied, so results can be written back into a copy
+        self.sequences: list[LineStringCoords] = []
+        part_sizes: list[int] = []
+        geometry_sizes: list[int] = []
+        geometry_types: list[int] = []
+
+        def add_geometry(geometry: GeojsonGeomNoGeomCollection | None) -> int | None:
+            if geometry is None:  # Feature without geometry
+                return None
+            coordinates = geometry.coordinates
+            if geometry.type == "Point":
+                sequences = [[coordinates]]
+            elif geometry.type in ("MultiPoint", "LineString"):
+                sequences = [coordinates]
+            elif geometry.type in ("MultiLineString", "Polygon"):
+                sequences = list(coordinates)
+            else:
+                sequences = [ring for polygon in coordinates for ring in polygon]
+            parts = [len(polygon) for polygon in coordinates] if geometry.type == "MultiPolygon" else [len(sequences)]
+            self.sequences.extend(cast(list[LineStringCoords], sequences))
+            part_sizes.extend(parts)
+            geometry_sizes.append(len(parts))
+            geometry_types.append(SHAPELY_GEOMETRY_TYPES[geometry.type])
+            return len(geometry_types) - 1
+
+        # the index of each geometry, nested as the Features and GeometryCollections of geojson_obj
+        self.structure: Nested | int | None = transform_geojson_geometries(geojson_obj, add_geometry)
+        self.sequence_sizes = np.fromiter(map(len, self.sequences), np.int64, len(self.sequences))
+        self.sequence_offsets = offsets(self.sequence_sizes)
+        self.part_offsets = offsets(np.asarray(part_sizes, dtype=np.int64))
+        self.geometry_offsets = offsets(np.asarray(geometry_sizes, dtype=np.int64))
+        self.geometry_types = np.asarray(geometry_types, dtype=np.int64)
+
+        n = int(self.sequence_offsets[-1])
+        dimensions = np.fromiter(map(len, chain.from_iterable(self.sequences)), np.int64, n)
+        position_offsets = offsets(dimensions)
+        values = np.fromiter(
+            chain.from_iterable(chain.from_iterable(self.sequences)), np.float64, int(position_offsets[-1])
+        )
+        starts = position_offsets[:-1]
+        self.three_dimensional = dimensions == THREE_DIMENSIONAL
+        self.x, self.y = values[starts], values[starts + 1]
+        self.z = np.zeros(n)
+        self.z[self.three_dimensional] = values[starts[self.three_dimensional] + 2]
+        # positions at the start of a coordinate sequence
+        self.first = np.zeros(n, dtype=bool)
+        self.first[self.sequence_offsets[:-1][self.sequence_sizes > 0]] = True
+
+    def __len__(self: "GeometryArrays") -> int:
+        """Number of positions"""
+        return len(self.x)
+
+    def position(self: "GeometryArrays", i: int) -> Position:
+        if self.three_dimensional[i]:
+            return Position3D(self.x[i].item(), self.y[i].item(), self.z[i].item())
+        return Position2D(self.x[i].item(), self.y[i].item())
+
+    def geometry_three_dimensional(self: "GeometryArrays") -> npt.NDArray[np.bool_]:
+        """Whether all positions of a geometry are 3D, per geometry"""
+        counts = offsets(self.three_dimensional.astype(np.int64))
+        bounds = self.sequence_offsets[self.part_offsets[self.geometry_offsets]]
+        sizes = np.diff(bounds)
+        result: npt.NDArray[np.bool_] = (sizes > 0) & (np.diff(counts[bounds]) == sizes)
+        return result
+
+    def to_shapely(self: "GeometryArrays") -> npt.NDArray[np.object_]:
+        """Shapely geometries of the geometries (GeometryCollection members separately), with shapely.from_ragged_array
+        per geometry type and dimension. A geometry is 3D when all its positions are 3D."""
+        coordinates = np.column_stack([self.x, self.y, self.z])
+        three_dimensional = self.geometry_three_dimensional()
+        result = np.empty(len(self.geometry_types), dtype=object)
+        for geometry_type, is_3d in set(zip(self.geometry_types.tolist(), three_dimensional.tolist(), strict=True)):
+            geometries = np.flatnonzero((self.geometry_types == geometry_type) & (three_dimensional == is_3d))
+            parts = ranges(self.geometry_offsets, geometries)
+            sequences = ranges(self.part_offsets, parts)
+            sequence_offsets = offsets(np.diff(self.sequence_offsets)[sequences])
+            part_offsets = offsets(np.diff(self.part_offsets)[parts])
+            geometry_offsets = offsets(np.diff(self.geometry_offsets)[geometries])
+            type_offsets: tuple[npt.NDArray[np.int64], ...] = {
+                shapely.GeometryType.POINT: (),
+                shapely.GeometryType.MULTIPOINT: (sequence_offsets,),
+                shapely.GeometryType.LINESTRING: (sequence_offsets,),
+                shapely.GeometryType.MULTILINESTRING: (sequence_offsets, part_offsets),
+                shapely.GeometryType.POLYGON: (sequence_offsets, part_offsets),
+                shapely.GeometryType.MULTIPOLYGON: (sequence_offsets, part_offsets, geometry_offsets),
+            }[geometry_type]
+            result[geometries] = shapely.from_ragged_array(
+                shapely.GeometryType(geometry_type),
+                coordinates[ranges(self.sequence_offsets, sequences)][:, : 3 if is_3d else 2],
+                type_offsets or None,
+            )
+        return result
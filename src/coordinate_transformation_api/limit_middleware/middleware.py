@@ -1,9 +1,13 @@
 import asyncio
 import typing
-from collections.abc import Callable
+from collections.abc import AsyncGenerator, Callable, Coroutine
+from http import HTTPStatus
+from tempfile import SpooledTemporaryFile
+from typing import Any
 
 from fastapi import HTTPException, Request, Response
 from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp, Receive, Scope, Send
 
@@ -44,42 +48,204 @@ class TimeoutMiddleware(BaseHTTPMiddleware):
 
 Message = typing.MutableMapping[str, typing.Any]
 
+SPOOLED_BODY_SCOPE_KEY = "coordinate_transformation_api.spooled_body"
+SPOOL_CHUNK_SIZE = 64 * 1024
+METHODS_WITHOUT_BODY = ("GET", "HEAD", "OPTIONS")
+
+
+def get_content_length(scope: Scope) -> int | None:
+    for name, value in scope.get("headers", []):
+        if name.lower() == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+def get_media_type(scope: Scope) -> str | None:
+    for name, value in scope.get("headers", []):
+        if name.lower() == b"content-type":
+            return bytes(value).decode("latin-1").split(";")[0].strip().lower()
+    return None
+
+
+def problem_response(status_code: int, detail: str) -> JSONResponse:
+    return JSONResponse(
+        {
+            "type": "about:blank",
+            "title": HTTPStatus(status_code).phrase,
+            "status": status_code,
+            "detail": detail,
+        },
+        status_code=status_code,
+        media_type="application/problem+json",
+    )  # need to manully set the error response, since the body is read before the request reaches the rfc7807 middleware
+
 
 class ContentSizeLimitMiddleware:
     # based on https://github.com/steinnes/content-size-limit-asgi/tree/master
+    # extended with Content-Length based admission and spooling of large request bodies to a temporary file, so
+    # per-request memory is capped at spool_threshold bytes. Request bodies of the media types in
+    # max_content_size_media_types have their own limit, for bodies that are processed as a stream.
     def __init__(
         self: "ContentSizeLimitMiddleware",
         app: ASGIApp,
         max_content_size: int | None = None,
+        spool_threshold: int | None = None,
+        max_content_size_media_types: dict[str, int] | None = None,
     ) -> None:
         self.app = app
         self.max_content_size = max_content_size
+        self.spool_threshold = spool_threshold
+        self.max_content_size_media_types = max_content_size_media_types or {}
         self.received = 0
 
-    def receive_wrapper(self: "ContentSizeLimitMiddleware", receive: Receive) -> Callable:
+    def get_max_content_size(self: "ContentSizeLimitMiddleware", scope: Scope) -> int | None:
+        media_type = get_media_type(scope)
+        if media_type is not None and media_type in self.max_content_size_media_types:
+            return self.max_content_size_media_types[media_type]
+        return self.max_content_size
+
+    def receive_wrapper(self: "ContentSizeLimitMiddleware", receive: Receive, max_content_size: int | None) -> Callable:
         received = 0
 
         async def inner() -> Message:
             nonlocal received
             message = await receive()
-            if message["type"] != "http.request" or self.max_content_size is None:
+            if message["type"] != "http.request" or max_content_size is None:
                 return message
 
             body_len = len(message.get("body", b""))
             received += body_len
-            if received > self.max_content_size:
+            if received > max_content_size:
                 raise HTTPException(
                     status_code=413,
-                    detail=f"Maximum content size limit ({self.max_content_size}) exceeded ({body_len} bytes read)",
+                    detail=f"Maximum content size limit ({max_content_size}) exceeded ({body_len} bytes read)",
                 )
             return message
 
         return inner
 
+    def should_spool(self: "ContentSizeLimitMiddleware", scope: Scope, content_length: int | None) -> bool:
+        if self.spool_threshold is None or scope.get("method") in METHODS_WITHOUT_BODY:
+            return False
+        return content_length is None or content_length > self.spool_threshold
+
+    async def spool_body(self: "ContentSizeLimitMiddleware", receive: Receive) -> SpooledTemporaryFile | None:
+        """Read the complete request body into a SpooledTemporaryFile, which rolls over to disk once it grows
+        beyond spool_threshold bytes. Returns None when the client disconnects before the body is complete.
+        """
+        spool = SpooledTemporaryFile(max_size=self.spool_threshold or 0)
+        try:
+            more_body = True
+            while more_body:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    spool.close()
+                    return None
+                spool.write(message.get("body", b""))
+                more_body = message.get("more_body", False)
+        except BaseException:
+            spool.close()
+            raise
+        spool.seek(0)
+        return spool
+
+    @staticmethod
+    def replay_receive_wrapper(spool: SpooledTemporaryFile, receive: Receive) -> Callable:
+        offset = 0
+        done = False
+
+        async def inner() -> Message:
+            nonlocal offset, done
+            if done:  # body fully replayed, pass through to detect client disconnects
+                return await receive()
+            spool.seek(offset)  # spool is shared with SpooledBodyRequest, do not rely on the file position
+            chunk = spool.read(SPOOL_CHUNK_SIZE)
+            offset += len(chunk)
+            done = len(chunk) < SPOOL_CHUNK_SIZE
+            return {"type": "http.request", "body": chunk, "more_body": not done}
+
+        return inner
+
     async def __call__(self: "ContentSizeLimitMiddleware", scope: Scope, receive: Receive, send: Send) -> None:
         if scope["type"] != "http":
             await self.app(scope, receive, send)
             return
 
-        _receive = self.receive_wrapper(receive)
-        await self.app(scope, _receive, send)
+        content_length = get_content_length(scope)
+        max_content_size = self.get_max_content_size(scope)
+        if max_content_size is not None and content_length is not None and content_length > max_content_size:
+            response = problem_response(
+                413,
+                f"Maximum content size limit ({max_content_size}) exceeded (Content-Length: {content_length} bytes)",
+            )
+            await response(scope, receive, send)
+            return
+
+        _receive = self.receive_wrapper(receive, max_content_size)
+        if not self.should_spool(scope, content_length):
+            await self.app(scope, _receive, send)
+            return
+
+        try:
+            spool = await self.spool_body(_receive)
+        except HTTPException as exc:
+            response = problem_response(exc.status_code, str(exc.detail))
+            await response(scope, receive, send)
+            return
+        if spool is None:
+            return
+        try:
+            scope[SPOOLED_BODY_SCOPE_KEY] = spool
+            await self.app(scope, self.replay_receive_wrapper(spool, receive), send)
+        finally:
+            spool.close()
+
+
+class SpooledBodyRequest(Request):
+    """Request that reads a body spooled by ContentSizeLimitMiddleware directly from the spool file, instead of
+    reassembling it from the chunks replayed over the receive channel.
+    """
+
+    @property
+    def spool(self: "SpooledBodyRequest") -> SpooledTemporaryFile | None:
+        return self.scope.get(SPOOLED_BODY_SCOPE_KEY)
+
+    async def stream(self: "SpooledBodyRequest") -> AsyncGenerator[bytes, None]:
+        spool = self.spool
+        if spool is None or hasattr(self, "_body"):
+            async for chunk in super().stream():
+                yield chunk
+            return
+        offset = 0
+        while True:
+            spool.seek(offset)
+            chunk = spool.read(SPOOL_CHUNK_SIZE)
+            if not chunk:
+                break
+            offset += len(chunk)
+            yield chunk
+        yield b""
+
+    async def body(self: "SpooledBodyRequest") -> bytes:
+        spool = self.spool
+        if spool is None:
+            return await super().body()
+        if not hasattr(self, "_body"):
+            spool.seek(0)
+            self._body = spool.read()
+        return self._body
+
+
+class SpooledBodyRoute(APIRoute):
+    """APIRoute that hands SpooledBodyRequest instances to the route handler, see ContentSizeLimitMiddleware"""
+
+    def get_route_handler(self: "SpooledBodyRoute") -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        route_handler = super().get_route_handler()
+
+        async def spooled_body_route_handler(request: Request) -> Response:
+            return await route_handler(SpooledBodyRequest(request.scope, request.receive))
+
+        return spooled_body_route_handler
@@ -99,9 +99,21 @@ class AccessLogFormatter(jsonlogger.JsonFormatter):
         if hasattr(record, "response_time"):
             log_record["response_time_ms"] = record.response_time
 
+        # Add stage timings (in milliseconds) and point/feature counts if available
+        self.add_server_timing_fields(log_record, record)
+
         # Remove color-related fields added by uvicorn
         log_record.pop("color_message", None)
 
+    @staticmethod
+    def add_server_timing_fields(log_record: dict[str, Any], record: logging.LogRecord) -> None:
+        if hasattr(record, "server_timing"):
+            log_record["server_timing_ms"] = record.server_timing
+        if hasattr(record, "point_count"):
+            log_record["point_count"] = record.point_count
+        if hasattr(record, "feature_count"):
+            log_record["feature_count"] = record.feature_count
+
 
 def get_json_logging_config(
     log_level: str,
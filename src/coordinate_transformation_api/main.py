@@ -6,14 +6,16 @@ import logging
 import os
 from collections.abc import AsyncGenerator, Callable
 from contextlib import asynccontextmanager, suppress
+from functools import cache
 from importlib import resources as impresources
-from typing import Annotated, Any
+from typing import TYPE_CHECKING, Annotated, Any, cast
 
 import pyproj
 import uvicorn
 from fastapi import FastAPI, Header, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, PlainTextResponse
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.routing import APIRoute
 from fastapi.staticfiles import StaticFiles
 from geodense.geojson import CrsFeatureCollection
@@ -21,12 +23,20 @@ from geodense.lib import GeodenseError  # type: ignore
 from geojson_pydantic import Feature
 from geojson_pydantic.geometries import Geometry, GeometryCollection
 from geojson_pydantic.types import Position, Position2D, Position3D
+from pydantic import ValidationError
+from pyproj import CRS
 
 from coordinate_transformation_api import assets
 from coordinate_transformation_api.access_log_middleware import AccessLogMiddleware
-from coordinate_transformation_api.cityjson.models import CityjsonV113
+from coordinate_transformation_api.compression_middleware.middleware import (
+    RequestDecompressionMiddleware,
+    ResponseCompressionMiddleware,
+)
 from coordinate_transformation_api.constants import (
+    CITYJSON_MEDIA_TYPE,
+    CITYJSON_SEQ_MEDIA_TYPE,
     DENSITY_CHECK_RESULT_HEADER,
+    MAX_DENSITY_CHECK_REPORT_SEGMENTS,
     THREE_DIMENSIONAL,
     TWO_DIMENSIONAL,
 )
@@ -37,9 +47,18 @@ from coordinate_transformation_api.fastapi_rfc7807 import middleware
 from coordinate_transformation_api.fastapi_rfc7807.middleware import from_data_validation_error
 from coordinate_transformation_api.limit_middleware.middleware import (
     ContentSizeLimitMiddleware,
+    SpooledBodyRoute,
     TimeoutMiddleware,
 )
 from coordinate_transformation_api.logging_config import get_json_logging_config
+from coordinate_transformation_api.metrics import (
+    METRICS_AVAILABLE,
+    MetricsMiddleware,
+    count_transformation_not_possible,
+    metrics_response,
+    observe_points_transformed,
+    set_crs_pair,
+)
 from coordinate_transformation_api.models import (
     Conformance,
     Crs,
@@ -47,21 +66,29 @@ from coordinate_transformation_api.models import (
     DensityCheckError,
     DensityCheckFailedError,
     DensityCheckReport,
+    DensityCheckReportEnum,
     DensityCheckResult,
     LandingPage,
     Link,
     TransformGetAcceptHeaders,
 )
+from coordinate_transformation_api.routing import media_type_route
 from coordinate_transformation_api.settings import app_settings
+from coordinate_transformation_api.startup_cache import load_crss
+from coordinate_transformation_api.timing import ServerTimingMiddleware, mark_parsed, record_counts, timed
 from coordinate_transformation_api.util import (
+    GeojsonBody,
+    TransformBody,
     accept_html,
     check_crs_is_known,
     convert_point_coords_to_wkt,
     crs_transform,
     densify_request_body,
     density_check_request_body,
+    get_feature_count,
     get_pyproj_crss,
     get_src_crs_densify,
+    get_target_crs_densify,
     init_oas,
     post_transform_get_crss,
     raise_request_validation_error,
@@ -72,6 +99,9 @@ from coordinate_transformation_api.util import (
     validate_coords_source_crs,
 )
 
+if TYPE_CHECKING:
+    from coordinate_transformation_api.cityjson.models import CityjsonFeatureV113, CityjsonV113
+
 assets_resources = impresources.files(assets)
 
 OPEN_API_SPEC: dict
@@ -80,10 +110,34 @@ CRS_LIST: list[Crs]
 OPEN_API_SPEC, API_TITLE, API_VERSION = init_oas(CRS_CONFIG)
 crs_identifiers: list[str] = OPEN_API_SPEC["components"]["schemas"]["CrsEnum"]["enum"]
 crs_header_identifiers: list[str] = OPEN_API_SPEC["components"]["schemas"]["CrsHeaderEnum"]["enum"]
-CRS_LIST = [Crs.from_crs_str(x) for x in crs_identifiers]
+CRS_LIST = load_crss(crs_identifiers)
 BASE_DIR: str = os.path.dirname(__file__)
+METRICS_ENABLED = app_settings.metrics and METRICS_AVAILABLE
 logger: logging.Logger
 
+
+@cache
+def cityjson_models() -> tuple[type["CityjsonV113"], type["CityjsonFeatureV113"]]:
+    """CityJSON and CityJSONFeature request body models, imported and built on first use of CityJSON since importing
+    the generated CityJSON models takes a considerable part of the startup time"""
+    if app_settings.cityjson_validation == "fast":
+        from coordinate_transformation_api.cityjson.fast import CityjsonFeatureV113Fast, CityjsonV113Fast
+
+        return CityjsonV113Fast, CityjsonFeatureV113Fast
+    from coordinate_transformation_api.cityjson.models import CityjsonFeatureV113, CityjsonV113
+
+    return CityjsonV113, CityjsonFeatureV113
+
+
+def validate_cityjson(data: dict | bytes, loc: tuple[str | int, ...] = ("body",)) -> "CityjsonV113":
+    """Validate a CityJSON (JSON) request body, validation errors are raised as RequestValidationError at loc"""
+    model = cityjson_models()[0]
+    try:
+        return model.model_validate_json(data) if isinstance(data, bytes) else model.model_validate(data)
+    except ValidationError as e:
+        raise RequestValidationError([{**error, "loc": (*loc, *error["loc"])} for error in e.errors()]) from e
+
+
 CrsEnum: enum = enum.Enum("CrsEnum", {x.replace(":", "_"): x for x in crs_identifiers})  # type: ignore
 CrsHeaderEnum: enum = enum.Enum("CrsHeaderEnum", {x.replace(":", "_"): x for x in crs_header_identifiers})  # type: ignore
 
@@ -94,6 +148,8 @@ async def lifespan(_app: FastAPI) -> AsyncGenerator:
     logger = logging.getLogger(__name__)
     logger.info(f"settings: {app_settings}")
     logger.info(f"pyproj datadir: {pyproj.datadir.get_data_dir()}")
+    if app_settings.metrics and not METRICS_AVAILABLE:
+        logger.warning("metrics are enabled, but prometheus-client is not installed (metrics extra)")
     if not app_settings.debug:  # suppres pyproj warnings in prod
         logging.getLogger("pyproj").setLevel(logging.ERROR)
     with suppress(asyncio.CancelledError):  # required for cancellation see runner method
@@ -109,10 +165,35 @@ async def lifespan_probes(_app: FastAPI) -> AsyncGenerator:
 app_probes: FastAPI = FastAPI(docs_url=None, lifespan=lifespan_probes)
 
 app: FastAPI = FastAPI(docs_url=None, lifespan=lifespan)
+app.router.route_class = SpooledBodyRoute  # read request bodies spooled by ContentSizeLimitMiddleware from disk
 # note: order of adding middleware is required for it to work
-middleware.register(app)
-app.add_middleware(ContentSizeLimitMiddleware, max_content_size=app_settings.max_size_request_body)
+middleware.register(app, post_hooks=[count_transformation_not_possible] if METRICS_ENABLED else None)
+app.add_middleware(
+    ContentSizeLimitMiddleware,
+    max_content_size=app_settings.max_size_request_body,
+    spool_threshold=app_settings.spool_threshold_request_body,
+    max_content_size_media_types={CITYJSON_SEQ_MEDIA_TYPE: app_settings.max_size_request_body_cityjson_seq},
+)
+app.add_middleware(
+    RequestDecompressionMiddleware,
+    max_compressed_size=app_settings.max_size_compressed_request_body,
+    max_compressed_size_media_types={
+        CITYJSON_SEQ_MEDIA_TYPE: app_settings.max_size_compressed_request_body_cityjson_seq
+    },
+)
 app.add_middleware(TimeoutMiddleware, timeout_seconds=app_settings.request_timeout)
+if app_settings.server_timing:
+    app.add_middleware(ServerTimingMiddleware)
+if app_settings.response_compression:
+    app.add_middleware(
+        ResponseCompressionMiddleware,
+        minimum_size=app_settings.response_compression_min_size,
+        compression_levels={
+            "gzip": app_settings.response_compression_level_gzip,
+            "br": app_settings.response_compression_level_br,
+            "zstd": app_settings.response_compression_level_zstd,
+        },
+    )
 
 # Add access log middleware to capture Host header and optionally X-Forwarded-For
 if app_settings.access_log:
@@ -205,6 +286,10 @@ async def add_api_version(request: Request, call_next: Callable) -> Response:
     return response
 
 
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)  # added last so it is the outermost middleware and records all requests
+
+
 @app.get("/favicon.ico", include_in_schema=False)
 async def favicon() -> FileResponse:
     """Serve favicon.ico from static assets."""
@@ -296,6 +381,13 @@ async def readiness() -> dict:
     return {"status": "ok"}
 
 
+if METRICS_ENABLED:
+
+    @app_probes.get("/metrics")
+    async def metrics() -> Response:
+        return metrics_response()
+
+
 @app.get("/", response_model=LandingPage)
 async def landingpage():  # type: ignore  # noqa: ANN201
     self = Link(
@@ -364,25 +456,35 @@ async def conformance() -> Conformance:
     response_model=Feature | CrsFeatureCollection | Geometry,
     response_model_exclude_none=True,
 )
-async def densify(  # noqa: ANN201
-    body: Feature | CrsFeatureCollection | Geometry | GeometryCollection,
+async def densify(  # noqa: ANN201, PLR0913
+    body: GeojsonBody,
     source_crs: Annotated[CrsEnum | None, Query(alias="source-crs")] = None,
+    target_crs: Annotated[CrsEnum | None, Query(alias="target-crs")] = None,
     content_crs: Annotated[CrsHeaderEnum | None, Header(alias="content-crs")] = None,
+    accept_crs: Annotated[CrsHeaderEnum | None, Header(alias="accept-crs")] = None,
     max_segment_deviation: Annotated[float | None, Query(alias="max-segment-deviation", ge=0.0001)] = None,
     max_segment_length: Annotated[float | None, Query(alias="max-segment-length", ge=200)] = 200,
 ):
     source_crs_str: str
+    target_crs_str: str
     content_crs_str: str
+    accept_crs_str: str
+    source_crs_str, target_crs_str, content_crs_str, accept_crs_str = (
+        x.value if x is not None else None for x in [source_crs, target_crs, content_crs, accept_crs]
+    )
 
-    source_crs_str, content_crs_str = (x.value if x is not None else None for x in [source_crs, content_crs])
-
+    mark_parsed()
     s_crs = get_src_crs_densify(body, source_crs_str, content_crs_str)
-    body_d = densify_request_body(body, s_crs, max_segment_deviation, max_segment_length)
+    t_crs = get_target_crs_densify(s_crs, target_crs_str, accept_crs_str)
+    set_crs_pair(s_crs, t_crs)
+    with timed("densify"):
+        body_d = densify_request_body(body, s_crs, max_segment_deviation, max_segment_length, t_crs)
 
-    return JSONResponse(
-        content=body_d.model_dump(exclude_none=True),
-        headers=set_response_headers(("content-crs", Crs.from_crs_str(s_crs).crs)),
-    )
+    with timed("serialize"):
+        return JSONResponse(
+            content=body_d.model_dump(exclude_none=True),
+            headers=set_response_headers(("content-crs", Crs.from_crs_str(t_crs).crs)),
+        )
 
 
 @app.post(
@@ -391,7 +493,7 @@ async def densify(  # noqa: ANN201
     response_model_exclude_none=True,
 )
 async def density_check(  # noqa: ANN201
-    body: Feature | CrsFeatureCollection | Geometry | GeometryCollection,
+    body: GeojsonBody,
     source_crs: Annotated[CrsEnum | None, Query(alias="source-crs")] = None,
     content_crs: Annotated[CrsHeaderEnum | None, Header(alias="content-crs")] = None,
     max_segment_deviation: Annotated[float | None, Query(alias="max-segment-deviation", ge=0.0001)] = None,
@@ -402,15 +504,18 @@ async def density_check(  # noqa: ANN201
 
     source_crs_str, content_crs_str = (x.value if x is not None else None for x in [source_crs, content_crs])
 
+    mark_parsed()
     s_crs = get_src_crs_densify(body, source_crs_str, content_crs_str)
+    set_crs_pair(s_crs)
     try:  # raises GeodenseError when all geometries in body are (multi)point
-        failed_line_segments = density_check_request_body(
-            body,
-            str_to_crs(s_crs),
-            max_segment_deviation,
-            max_segment_length,
-            epoch=None,
-        )
+        with timed("density_check"):
+            failed_line_segments = density_check_request_body(
+                body,
+                str_to_crs(s_crs),
+                max_segment_deviation,
+                max_segment_length,
+                epoch=None,
+            )
     except GeodenseError as e:
         raise DensityCheckError(str(e)) from e
 
@@ -418,7 +523,8 @@ async def density_check(  # noqa: ANN201
     headers = {}
     if not report.check_result:
         headers = set_response_headers(("content-crs", Crs.from_crs_str(s_crs).crs))
-    return JSONResponse(report.model_dump(exclude_none=True), headers=headers)
+    with timed("serialize"):
+        return JSONResponse(report.model_dump(exclude_none=True), headers=headers)
 
 
 @app.get("/transform")
@@ -449,6 +555,7 @@ async def transform(  # noqa: PLR0913, ANN201
     )
 
     s_crs, t_crs = get_pyproj_crss(source_crs_str, target_crs_str, content_crs_str, accept_crs_str)
+    set_crs_pair(s_crs, t_crs)
 
     _coords_list = list(map(lambda x: float(x), coordinates.split(",")))
 
@@ -461,6 +568,7 @@ async def transform(  # noqa: PLR0913, ANN201
     validate_coords_source_crs(position, s_crs, CRS_LIST)
 
     position_t = transform_coordinates(position, s_crs, t_crs, epoch)
+    observe_points_transformed(1)
 
     # if height/elevation is inf, strip it from response
     if len(position_t) == THREE_DIMENSIONAL and position_t[2] == float("inf"):
@@ -484,13 +592,124 @@ async def transform(  # noqa: PLR0913, ANN201
         )
 
 
+def cityjson_transform_response(body: "CityjsonV113", s_crs: CRS, t_crs: CRS, epoch: float | None) -> Response:
+    with timed("transform"):
+        body.crs_transform(s_crs, t_crs, epoch)
+    observe_points_transformed(len(body.vertices))
+    record_counts(point_count=len(body.vertices), feature_count=len(body.CityObjects))
+    response_headers = set_response_headers(
+        (
+            DENSITY_CHECK_RESULT_HEADER,
+            DensityCheckResult.not_implemented.value,
+        ),
+    )
+    with timed("serialize"):
+        return Response(
+            content=body.model_dump_json(exclude_none=True),
+            headers=response_headers,
+            media_type=CITYJSON_MEDIA_TYPE,
+        )
+
+
+async def post_transform_cityjson(  # noqa: PLR0913
+    request: Request,
+    source_crs: Annotated[CrsEnum | None, Query(alias="source-crs")] = None,
+    target_crs: Annotated[CrsEnum | None, Query(alias="target-crs")] = None,
+    content_crs: Annotated[CrsHeaderEnum | None, Header(alias="content-crs")] = None,
+    accept_crs: Annotated[CrsHeaderEnum | None, Header(alias="accept-crs")] = None,
+    epoch: Annotated[float | None, Query(alias="epoch")] = None,
+) -> Response:
+    """POST /transform with a CityJSON (application/city+json) body, validated against the CityJSON model only"""
+    source_crs_str: str
+    target_crs_str: str
+    content_crs_str: str
+    accept_crs_str: str
+    source_crs_str, target_crs_str, content_crs_str, accept_crs_str = (
+        x.value if x is not None else None for x in [source_crs, target_crs, content_crs, accept_crs]
+    )
+
+    body = validate_cityjson(await request.body())
+    mark_parsed()
+    s_crs, t_crs = post_transform_get_crss(body, source_crs_str, target_crs_str, content_crs_str, accept_crs_str)
+    set_crs_pair(s_crs, t_crs)
+    return cityjson_transform_response(body, s_crs, t_crs, epoch)
+
+
+async def post_transform_cityjson_seq(  # noqa: PLR0913
+    request: Request,
+    source_crs: Annotated[CrsEnum | None, Query(alias="source-crs")] = None,
+    target_crs: Annotated[CrsEnum | None, Query(alias="target-crs")] = None,
+    content_crs: Annotated[CrsHeaderEnum | None, Header(alias="content-crs")] = None,
+    accept_crs: Annotated[CrsHeaderEnum | None, Header(alias="accept-crs")] = None,
+    epoch: Annotated[float | None, Query(alias="epoch")] = None,
+) -> StreamingResponse:
+    """POST /transform with a CityJSON Text Sequence (CityJSONSeq) body, the features are transformed and returned
+    one by one. Errors in the features after the first line of the response has been sent abort the response.
+
+    The number of points and features is only known when the response has been sent, after the access log entry and
+    the Server-Timing header, so they are not recorded there. The points transformed metric is recorded per feature."""
+    source_crs_str: str
+    target_crs_str: str
+    content_crs_str: str
+    accept_crs_str: str
+    source_crs_str, target_crs_str, content_crs_str, accept_crs_str = (
+        x.value if x is not None else None for x in [source_crs, target_crs, content_crs, accept_crs]
+    )
+
+    from coordinate_transformation_api.cityjson.seq import CityjsonSeqTransformer, iter_lines
+
+    if getattr(request, "spool", None) is None:
+        await request.body()  # the body is read while the response is sent, read small bodies in advance
+    lines = iter_lines(request.stream())
+    header_line = await anext(lines, None)
+    if header_line is None:
+        raise_request_validation_error("CityJSONSeq request body is empty", loc=("body",))
+    header = validate_cityjson(cast(bytes, header_line), loc=("body", 0))
+    mark_parsed()
+    s_crs, t_crs = post_transform_get_crss(header, source_crs_str, target_crs_str, content_crs_str, accept_crs_str)
+    set_crs_pair(s_crs, t_crs)
+    transformer = CityjsonSeqTransformer(header, s_crs, t_crs, epoch)
+
+    async def transform_features() -> AsyncGenerator[str, None]:
+        yield transformer.header.model_dump_json(exclude_none=True) + "\n"
+        async for line in lines:
+            feature = cityjson_models()[1].model_validate_json(line)
+            transformer.transform_feature(feature)
+            observe_points_transformed(len(feature.vertices))
+            yield feature.model_dump_json(exclude_none=True) + "\n"
+
+    return StreamingResponse(
+        transform_features(),
+        headers=set_response_headers((DENSITY_CHECK_RESULT_HEADER, DensityCheckResult.not_implemented.value)),
+        media_type=CITYJSON_SEQ_MEDIA_TYPE,
+    )
+
+
+# added before the POST /transform route for other media types, see MediaTypeRoute
+app.router.add_api_route(
+    "/transform",
+    post_transform_cityjson_seq,
+    methods=["POST"],
+    include_in_schema=False,
+    route_class_override=media_type_route(CITYJSON_SEQ_MEDIA_TYPE),
+)
+
+app.router.add_api_route(
+    "/transform",
+    post_transform_cityjson,
+    methods=["POST"],
+    include_in_schema=False,
+    route_class_override=media_type_route(CITYJSON_MEDIA_TYPE),
+)
+
+
 @app.post(
     "/transform",
-    response_model=Feature | CrsFeatureCollection | Geometry | GeometryCollection | CityjsonV113,
+    response_model=Feature | CrsFeatureCollection | Geometry | GeometryCollection | dict[str, Any],
     response_model_exclude_none=True,
 )
 async def post_transform(  # noqa: ANN201, PLR0913
-    body: Feature | CrsFeatureCollection | Geometry | GeometryCollection | CityjsonV113,
+    body: TransformBody,
     source_crs: Annotated[CrsEnum | None, Query(alias="source-crs")] = None,
     target_crs: Annotated[CrsEnum | None, Query(alias="target-crs")] = None,
     content_crs: Annotated[CrsHeaderEnum | None, Header(alias="content-crs")] = None,
@@ -499,6 +718,9 @@ async def post_transform(  # noqa: ANN201, PLR0913
     density_check: Annotated[bool, Query(alias="density-check")] = True,
     max_segment_deviation: Annotated[float | None, Query(alias="max-segment-deviation", ge=0.0001)] = None,
     max_segment_length: Annotated[float | None, Query(alias="max-segment-length", ge=200)] = 200,
+    density_check_report: Annotated[
+        DensityCheckReportEnum, Query(alias="density-check-report")
+    ] = DensityCheckReportEnum.capped,
 ):
     # get string values from CrsEnum|None parameters
     source_crs_str: str
@@ -509,28 +731,37 @@ async def post_transform(  # noqa: ANN201, PLR0913
         x.value if x is not None else None for x in [source_crs, target_crs, content_crs, accept_crs]
     )
 
-    s_crs, t_crs = post_transform_get_crss(body, source_crs_str, target_crs_str, content_crs_str, accept_crs_str)
-    response_headers: dict = {}
-
-    if isinstance(body, CityjsonV113):
-        body.crs_transform(s_crs, t_crs, epoch)
-        response_headers = set_response_headers(
-            (
-                DENSITY_CHECK_RESULT_HEADER,
-                DensityCheckResult.not_implemented.value,
-            ),
-            headers=response_headers,
-        )
-        return Response(
-            content=body.model_dump_json(exclude_none=True),
-            headers=response_headers,
-            media_type="application/city+json",
+    if isinstance(body, dict):  # CityJSON, see TransformBody
+        cityjson_body = validate_cityjson(body)
+        mark_parsed()
+        s_crs, t_crs = post_transform_get_crss(
+            cityjson_body, source_crs_str, target_crs_str, content_crs_str, accept_crs_str
         )
+        set_crs_pair(s_crs, t_crs)
+        return cityjson_transform_response(cityjson_body, s_crs, t_crs, epoch)
     else:
+        mark_parsed()
+        s_crs, t_crs = post_transform_get_crss(body, source_crs_str, target_crs_str, content_crs_str, accept_crs_str)
+        set_crs_pair(s_crs, t_crs)
+        response_headers: dict = {}
+        record_counts(feature_count=get_feature_count(body))
         if density_check:
             try:  # raises GeodenseError when all geometries in body are (multi)point
-                d_body = copy.deepcopy(body)
-                fc_report = density_check_request_body(d_body, s_crs, max_segment_deviation, max_segment_length, epoch)
+                # a capped report stops the density check at the first failed line segment after the cap
+                max_failed_segments = (
+                    MAX_DENSITY_CHECK_REPORT_SEGMENTS + 1
+                    if density_check_report == DensityCheckReportEnum.capped
+                    else None
+                )
+                with timed("density_check"):
+                    d_body = copy.deepcopy(body)
+                    fc_report = density_check_request_body(
+                        d_body, s_crs, max_segment_deviation, max_segment_length, epoch, max_failed_segments
+                    )
+                report_extra = {}
+                if len(fc_report.features) > MAX_DENSITY_CHECK_REPORT_SEGMENTS and max_failed_segments is not None:
+                    fc_report.features = fc_report.features[:MAX_DENSITY_CHECK_REPORT_SEGMENTS]
+                    report_extra = {"report-capped": True}
                 result = DensityCheckReport.from_fc_report(fc_report)
                 if result.check_result:
                     response_headers = set_response_headers(
@@ -545,6 +776,7 @@ async def post_transform(  # noqa: ANN201, PLR0913
                     raise DensityCheckFailedError(
                         f"density-check failed, with following query parameters: density-check: True, {val_name.replace('_', '-')}: {val}",
                         result.model_dump(by_alias=True),  # type: ignore
+                        report_extra,
                     )
             except GeodenseError as e:
                 if str(e) == "GeoJSON contains only (Multi)Point geometries":
@@ -563,7 +795,8 @@ async def post_transform(  # noqa: ANN201, PLR0913
                 headers=response_headers,
             )
 
-        body_t = crs_transform(body, s_crs, t_crs, epoch)
+        with timed("transform"):
+            body_t = crs_transform(body, s_crs, t_crs, epoch, count_points=True)
 
         # TODO: implement response header to indicate dropped geometries due to inf values in transformed coordinates
 
@@ -574,11 +807,12 @@ async def post_transform(  # noqa: ANN201, PLR0913
         if epoch is not None:
             response_headers = set_response_headers(("epoch", epoch), headers=response_headers)
 
-        response_body = body_t.model_dump(exclude_none=True)
-        return JSONResponse(
-            content=response_body,
-            headers=response_headers,
-        )
+        with timed("serialize"):
+            response_body = body_t.model_dump(exclude_none=True)
+            return JSONResponse(
+                content=response_body,
+                headers=response_headers,
+            )
 
 
 app.openapi = lambda: OPEN_API_SPEC  # type: ignore
@@ -0,0 +1,207 @@
+"""Prometheus metrics, exposed on the /metrics endpoint of the probes app
+
+Requires the optional prometheus-client dependency (install the metrics extra), without it all functions in this
+module are no-ops.
+"""
+
+import time
+from contextvars import ContextVar
+
+from fastapi import Request, Response
+from pyproj import CRS
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from coordinate_transformation_api.constants import DENSITY_CHECK_RESULT_HEADER
+from coordinate_transformation_api.crs_transform import transformer_cache_stats
+from coordinate_transformation_api.models import TransformationNotPossibleError
+
+try:
+    import prometheus_client
+    from prometheus_client import Counter, Gauge, Histogram
+except ImportError:
+    prometheus_client = None  # type: ignore[assignment]
+
+METRICS_AVAILABLE = prometheus_client is not None
+NO_CRS_LABEL = ""
+UNMATCHED_ENDPOINT_LABEL = "unmatched"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = (1e2, 1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+RATIO_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+# labels of the request being processed, set by the route handlers and read by MetricsMiddleware. The dict is shared
+# by reference, so values set in tasks spawned for the request (BaseHTTPMiddleware) are visible to the middleware.
+_request_labels: ContextVar[dict[str, str] | None] = ContextVar("request_labels", default=None)
+
+
+def _transformer_cache_hit_ratio() -> float:
+    hits, misses = transformer_cache_stats()
+    if hits + misses == 0:
+        return 0.0
+    return hits / (hits + misses)
+
+
+if METRICS_AVAILABLE:
+    REQUEST_DURATION = Histogram(
+        "ct_api_request_duration_seconds",
+        "Request latency in seconds by endpoint and CRS pair",
+        ["method", "endpoint", "status", "source_crs", "target_crs"],
+        buckets=LATENCY_BUCKETS,
+    )
+    REQUESTS_IN_PROGRESS = Gauge(
+        "ct_api_requests_in_progress",
+        "Number of requests being processed",
+        ["method"],
+    )
+    REQUEST_BODY_BYTES = Histogram(
+        "ct_api_request_body_bytes",
+        "Size of request bodies in bytes, as received (before decompression)",
+        ["endpoint"],
+        buckets=BYTES_BUCKETS,
+    )
+    RESPONSE_BODY_BYTES = Histogram(
+        "ct_api_response_body_bytes",
+        "Size of response bodies in bytes, as sent (after compression)",
+        ["endpoint"],
+        buckets=BYTES_BUCKETS,
+    )
+    POINTS_TRANSFORMED = Counter(
+        "ct_api_points_transformed",
+        "Number of points (positions or vertices) transformed by CRS pair",
+        ["source_crs", "target_crs"],
+    )
+    TRANSFORM_DEDUP_RATIO = Histogram(
+        "ct_api_transform_dedup_ratio",
+        "Fraction of the points of a request that were duplicates of a transformed point, with TRANSFORM_DEDUP",
+        ["source_crs", "target_crs"],
+        buckets=RATIO_BUCKETS,
+    )
+    DENSITY_CHECK_RESULTS = Counter(
+        "ct_api_density_check_results",
+        "Density check results, see the density-check-result response header",
+        ["endpoint", "result"],
+    )
+    TRANSFORMATION_NOT_POSSIBLE = Counter(
+        "ct_api_transformation_not_possible",
+        "Number of requests that failed with a transformation-not-possible error by reason",
+        ["reason"],
+    )
+    TRANSFORMER_CACHE_HITS = Gauge("ct_api_transformer_cache_hits", "Number of transformer cache hits")
+    TRANSFORMER_CACHE_MISSES = Gauge("ct_api_transformer_cache_misses", "Number of transformer cache misses")
+    TRANSFORMER_CACHE_HIT_RATIO = Gauge("ct_api_transformer_cache_hit_ratio", "Ratio of transformer cache hits")
+    TRANSFORMER_CACHE_HITS.set_function(lambda: transformer_cache_stats()[0])
+    TRANSFORMER_CACHE_MISSES.set_function(lambda: transformer_cache_stats()[1])
+    TRANSFORMER_CACHE_HIT_RATIO.set_function(_transformer_cache_hit_ratio)
+
+
+def crs_label(crs: CRS | str | None) -> str:
+    if crs is None:
+        return NO_CRS_LABEL
+    if isinstance(crs, str):
+        return crs
+    authority = crs.to_authority()
+    return "{}:{}".format(*authority) if authority is not None else crs.srs
+
+
+def set_crs_pair(source_crs: CRS | str | None, target_crs: CRS | str | None = None) -> None:
+    """Set CRS pair labels for the metrics of the current request"""
+    labels = _request_labels.get()
+    if labels is None:
+        return
+    labels["source_crs"] = crs_label(source_crs)
+    labels["target_crs"] = crs_label(target_crs)
+
+
+def observe_points_transformed(count: int) -> None:
+    if not METRICS_AVAILABLE:
+        return
+    labels = _request_labels.get() or {}
+    POINTS_TRANSFORMED.labels(
+        source_crs=labels.get("source_crs", NO_CRS_LABEL), target_crs=labels.get("target_crs", NO_CRS_LABEL)
+    ).inc(count)
+
+
+def observe_dedup_ratio(count: int, unique_count: int) -> None:
+    """Record the fraction of count points that were not transformed, since they were duplicates of the unique_count
+    transformed points"""
+    if not METRICS_AVAILABLE or count == 0:
+        return
+    labels = _request_labels.get() or {}
+    TRANSFORM_DEDUP_RATIO.labels(
+        source_crs=labels.get("source_crs", NO_CRS_LABEL), target_crs=labels.get("target_crs", NO_CRS_LABEL)
+    ).observe(1 - unique_count / count)
+
+
+def count_transformation_not_possible(_request: Request, _response: Response, exc: Exception) -> None:
+    """post hook for the rfc7807 exception handler"""
+    if METRICS_AVAILABLE and isinstance(exc, TransformationNotPossibleError):
+        TRANSFORMATION_NOT_POSSIBLE.labels(reason=exc.reason).inc()
+
+
+def metrics_response() -> Response:
+    return Response(
+        content=prometheus_client.generate_latest(),
+        media_type=prometheus_client.CONTENT_TYPE_LATEST,
+    )
+
+
+def get_endpoint_label(scope: Scope) -> str:
+    route = scope.get("route")  # set by the router on a matching route
+    return getattr(route, "path", UNMATCHED_ENDPOINT_LABEL)
+
+
+class MetricsMiddleware:
+    """Record request metrics, needs to be the outermost middleware to record all requests"""
+
+    def __init__(self: "MetricsMiddleware", app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self: "MetricsMiddleware", scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not METRICS_AVAILABLE:
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        labels: dict[str, str] = {}
+        token = _request_labels.set(labels)
+        request_bytes = 0
+        response_bytes = 0
+        status = 500  # in case the app raises before sending a response
+        density_check_result: str | None = None
+
+        async def receive_wrapper() -> Message:
+            nonlocal request_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                request_bytes += len(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_bytes, status, density_check_result
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                density_check_result = Headers(raw=message["headers"]).get(DENSITY_CHECK_RESULT_HEADER)
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        method = scope["method"]
+        in_progress = REQUESTS_IN_PROGRESS.labels(method=method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            in_progress.dec()
+            _request_labels.reset(token)
+            endpoint = get_endpoint_label(scope)
+            REQUEST_DURATION.labels(
+                method=method,
+                endpoint=endpoint,
+                status=str(status),
+                source_crs=labels.get("source_crs", NO_CRS_LABEL),
+                target_crs=labels.get("target_crs", NO_CRS_LABEL),
+            ).observe(time.perf_counter() - start_time)
+            REQUEST_BODY_BYTES.labels(endpoint=endpoint).observe(request_bytes)
+            RESPONSE_BODY_BYTES.labels(endpoint=endpoint).observe(response_bytes)
+            if density_check_result is not None:
+                DENSITY_CHECK_RESULTS.labels(endpoint=endpoint, result=density_check_result).inc()
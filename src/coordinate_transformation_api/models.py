@@ -76,9 +76,10 @@ class DensityCheckFailedError(DataValidationError):
         self: "DensityCheckFailedError",
         message: str,
         report: CrsFeatureCollection,
+        extra: dict | None = None,
     ) -> None:
         # Call the base class constructor with the parameters it needs
-        super().__init__(message)
+        super().__init__(message, extra)
         # Now for your custom code...
         self.report = report
 
@@ -101,6 +102,17 @@ class DensifyError(DataValidationError):
     pass
 
 
+class DensifyVertexBudgetExceededError(DataValidationError):
+    type_str = "nsgi.nl/densify-vertex-budget-exceeded"
+    title = "Densified Geometries Exceed the Vertex Budget"
+
+    def __init__(self: "DensifyVertexBudgetExceededError", predicted_vertices: int, vertex_budget: int) -> None:
+        super().__init__(
+            f"densification would result in {predicted_vertices} vertices, more than the maximum of {vertex_budget} vertices, increase max-segment-length or max-segment-deviation or split the request body",
+            {"predicted-vertices": predicted_vertices, "vertex-budget": vertex_budget},
+        )
+
+
 class Link(BaseModel):
     title: str
     type: str
@@ -139,6 +151,11 @@ class TransformGetAcceptHeaders(Enum):
     wkt = "text/plain"
 
 
+class DensityCheckReportEnum(Enum):
+    capped = "capped"
+    full = "full"
+
+
 class DensityCheckResult(Enum):
     not_run = "not-run"
     success = "success"
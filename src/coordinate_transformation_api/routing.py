@@ -0,0 +1,21 @@
+from starlette.routing import Match
+from starlette.types import Scope
+
+from coordinate_transformation_api.limit_middleware.middleware import SpooledBodyRoute, get_media_type
+
+
+class MediaTypeRoute(SpooledBodyRoute):
+    """SpooledBodyRoute that only matches requests with a body of one of media_types, so routes for request bodies of
+    different media types can share a path. Needs to be added before the route for other media types."""
+
+    media_types: tuple[str, ...] = ()
+
+    def matches(self: "MediaTypeRoute", scope: Scope) -> tuple[Match, Scope]:
+        match, child_scope = super().matches(scope)
+        if match != Match.NONE and get_media_type(scope) not in self.media_types:
+            return Match.NONE, {}
+        return match, child_scope
+
+
+def media_type_route(*media_types: str) -> type[MediaTypeRoute]:
+    return type("MediaTypeRoute", (MediaTypeRoute,), {"media_types": media_types})
@@ -58,6 +58,81 @@ class AppSettings(BaseSettings):
         default=2000000,
         description="max size request body in bytes",
     )
+    max_size_request_body_cityjson_seq: int = Field(
+        alias="MAX_SIZE_REQUEST_BODY_CITYJSON_SEQ",
+        default=500000000,
+        description="max size request body in bytes of CityJSON Text Sequences (application/city+json-seq), which are transformed feature by feature",
+    )
+    spool_threshold_request_body: int | None = Field(
+        alias="SPOOL_THRESHOLD_REQUEST_BODY",
+        default=1000000,
+        description="request bodies larger than this number of bytes (or of unknown length) are spooled to a temporary file on disk instead of held in memory",
+    )
+    max_size_compressed_request_body: int = Field(
+        alias="MAX_SIZE_COMPRESSED_REQUEST_BODY",
+        default=1000000,
+        description="max size of a gzip, br or zstd encoded request body in bytes, MAX_SIZE_REQUEST_BODY applies to the decoded request body. Does not apply to CityJSON Text Sequences, see MAX_SIZE_COMPRESSED_REQUEST_BODY_CITYJSON_SEQ",
+    )
+    max_size_compressed_request_body_cityjson_seq: int = Field(
+        alias="MAX_SIZE_COMPRESSED_REQUEST_BODY_CITYJSON_SEQ",
+        default=500000000,
+        description="max size of a gzip, br or zstd encoded CityJSON Text Sequence (application/city+json-seq) request body in bytes, MAX_SIZE_REQUEST_BODY_CITYJSON_SEQ applies to the decoded request body",
+    )
+    response_compression: bool = Field(
+        alias="RESPONSE_COMPRESSION",
+        default=True,
+        description="compress responses with gzip, br or zstd, based on the Accept-Encoding request header",
+    )
+    response_compression_min_size: int = Field(
+        alias="RESPONSE_COMPRESSION_MIN_SIZE",
+        default=1000,
+        description="minimum size of response body in bytes to be compressed",
+    )
+    response_compression_level_gzip: int = Field(
+        alias="RESPONSE_COMPRESSION_LEVEL_GZIP",
+        default=6,
+        description="gzip compression level of responses (1-9)",
+    )
+    response_compression_level_br: int = Field(
+        alias="RESPONSE_COMPRESSION_LEVEL_BR",
+        default=4,
+        description="brotli compression level of responses (0-11)",
+    )
+    response_compression_level_zstd: int = Field(
+        alias="RESPONSE_COMPRESSION_LEVEL_ZSTD",
+        default=3,
+        description="zstd compression level of responses (1-22)",
+    )
+    cityjson_validation: Literal["full", "fast"] = Field(
+        alias="CITYJSON_VALIDATION",
+        default="full",
+        description="full: validate CityJSON request bodies against the complete CityJSON schema, fast: only validate the CityObject types, geometries and extents used by the transformation, other members pass through unchanged",
+    )
+    density_check_engine: Literal["vectorized", "geodense"] = Field(
+        alias="DENSITY_CHECK_ENGINE",
+        default="vectorized",
+        description="vectorized: calculate the segment lengths of the density check with a single pyproj call (see density_check.py), geodense: with the per segment implementation of geodense, the output is identical",
+    )
+    densify_max_output_vertices: int = Field(
+        alias="DENSIFY_MAX_OUTPUT_VERTICES",
+        default=1000000,
+        description="max number of vertices of the densified geometries of a /densify request, predicted from the geodesic segment lengths before densifying, requests exceeding it are rejected. 0 disables the check",
+    )
+    densify_engine: Literal["vectorized", "geodense"] = Field(
+        alias="DENSIFY_ENGINE",
+        default="vectorized",
+        description="vectorized: calculate all intermediate points of /densify with single pyproj calls (see densify.py), geodense: with the per segment implementation of geodense, the output is identical",
+    )
+    transform_dedup: bool = Field(
+        alias="TRANSFORM_DEDUP",
+        default=False,
+        description="transform each distinct position of a GeoJSON request body once, such as the shared vertices of adjacent polygons and the closing vertices of rings, and reuse the result for its other occurrences, the output is identical",
+    )
+    startup_cache: bool = Field(
+        alias="STARTUP_CACHE",
+        default=True,
+        description="load the OAS, CRS config and CRS metadata from the startup cache in the assets when it is up to date, see startup_cache.py",
+    )
     log_level: str = Field(alias="LOG_LEVEL", default="INFO")
     debug: bool = Field(
         alias="DEBUG",
@@ -95,6 +170,16 @@ class AppSettings(BaseSettings):
         default=None,
         description="alternative header to extract real client IP (e.g., 'X-Real-IP', 'CF-Connecting-IP', 'True-Client-IP'), defaults to X-Forwarded-For",
     )
+    metrics: bool = Field(
+        alias="METRICS",
+        default=True,
+        description="record Prometheus metrics and expose them on /metrics of the probes app (port 8001), requires the metrics extra",
+    )
+    server_timing: bool = Field(
+        alias="SERVER_TIMING",
+        default=False,
+        description="time the stages of transform, densify and density check requests, report the timings in the Server-Timing response header and in the access log",
+    )
     api_key_in_oas: bool = Field(
         alias="API_KEY_IN_OAS",
         default=False,
@@ -0,0 +1,120 @@
+"""Startup cache: the parsed OAS, the CRS config and the CRS metadata of the available CRSs, precomputed at build time
+
+Parsing the OAS and CRS config YAML and retrieving the metadata of each CRS from the PROJ database takes most of the
+import time of the app. The cache is written to the assets with `python -m coordinate_transformation_api.startup_cache`
+after the PROJ data has been installed (see Dockerfile) and loaded as JSON at startup. The cache is only used when its
+key matches the key of the installed assets, pyproj and PROJ database, otherwise the values are computed as before.
+Settings dependent changes of the OAS (see init_oas) are applied after loading.
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import logging
+import os
+from functools import cache
+from importlib import resources as impresources
+from typing import Any, cast
+
+import pyproj
+import yaml
+
+from coordinate_transformation_api import assets
+from coordinate_transformation_api.models import Crs
+from coordinate_transformation_api.settings import app_settings
+
+OAS_FILE = "openapi.yaml"
+CRS_CONFIG_FILE = "crs-config.yaml"
+STARTUP_CACHE_FILE = "startup-cache.json"
+
+assets_resources = impresources.files(assets)
+logger = logging.getLogger(__name__)
+
+
+def cache_key() -> str:
+    """Hash of the inputs of the cached values: the OAS and CRS config assets, the pyproj and PROJ versions and the
+    PROJ database"""
+    digest = hashlib.sha256()
+    for name in (OAS_FILE, CRS_CONFIG_FILE):
+        digest.update(assets_resources.joinpath(name).read_bytes())
+    digest.update(f"{pyproj.__version__} {pyproj.proj_version_str}".encode())
+    proj_db = os.path.join(pyproj.datadir.get_data_dir(), "proj.db")
+    if os.path.exists(proj_db):
+        stat = os.stat(proj_db)
+        digest.update(f"{proj_db} {stat.st_size} {stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def read_yaml_asset(name: str) -> dict:
+    with assets_resources.joinpath(name).open("rb") as f:
+        return cast(dict, yaml.safe_load(f))
+
+
+def build_startup_cache() -> dict[str, Any]:
+    crs_config = read_yaml_asset(CRS_CONFIG_FILE)
+    return {
+        "key": cache_key(),
+        "oas": read_yaml_asset(OAS_FILE),
+        "crs_config": crs_config,
+        "crss": {x: Crs.from_crs_str(x).model_dump() for x in crs_config},
+    }
+
+
+def read_startup_cache(path: str) -> dict[str, Any] | None:
+    """Startup cache from path, None when missing or stale"""
+    if not os.path.isfile(path):
+        return None
+    with open(path, "rb") as f:
+        startup_cache: dict[str, Any] = json.load(f)
+    if startup_cache.get("key") != cache_key():
+        logger.warning(f"startup cache {path} is stale, rebuild it with python -m {__name__}")
+        return None
+    return startup_cache
+
+
+@cache
+def get_startup_cache() -> dict[str, Any] | None:
+    """Startup cache from the assets, None when disabled, missing or stale"""
+    if not app_settings.startup_cache:
+        return None
+    return read_startup_cache(str(assets_resources.joinpath(STARTUP_CACHE_FILE)))
+
+
+def load_oas() -> dict:
+    """Unmodified OAS, a copy since init_oas modifies it"""
+    startup_cache = get_startup_cache()
+    if startup_cache is None:
+        return read_yaml_asset(OAS_FILE)
+    return copy.deepcopy(startup_cache["oas"])
+
+
+def load_crs_config() -> dict:
+    startup_cache = get_startup_cache()
+    if startup_cache is None:
+        return read_yaml_asset(CRS_CONFIG_FILE)
+    return copy.deepcopy(startup_cache["crs_config"])
+
+
+def load_crss(crs_identifiers: list[str]) -> list[Crs]:
+    """Crs metadata of the CRSs, from the startup cache when available"""
+    startup_cache = get_startup_cache()
+    cached = {} if startup_cache is None else startup_cache["crss"]
+    return [Crs.model_validate(cached[x]) if x in cached else Crs.from_crs_str(x) for x in crs_identifiers]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m coordinate_transformation_api.startup_cache",
+        description="Write the startup cache of the installed assets and PROJ database",
+    )
+    parser.add_argument("-o", "--output", help=f"cache file, default {STARTUP_CACHE_FILE} in the assets")
+    args = parser.parse_args()
+    output = args.output or str(assets_resources.joinpath(STARTUP_CACHE_FILE))
+    with open(output, "w") as f:
+        json.dump(build_startup_cache(), f)
+    print(f"startup cache written to {output}")
+
+
+if __name__ == "__main__":
+    main()
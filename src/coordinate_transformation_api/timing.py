@@ -0,0 +1,126 @@
+"""Opt-in per-stage timing of requests, reported in the Server-Timing response header and the access log"""
+
+import time
+from collections.abc import Generator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from coordinate_transformation_api.access_log_middleware import _request_data
+
+STAGE_DESCRIPTIONS = {
+    "parse": "receive and validate request",
+    "density_check": "density check",
+    "transform": "coordinate transformation",
+    "densify": "densification",
+    "update_bbox": "update bbox",
+    "serialize": "serialize response",
+    "total": "total",
+}
+
+
+class StageTimings:
+    """Durations per stage in seconds. Durations of nested stages are excluded from the enclosing stage."""
+
+    def __init__(self: "StageTimings") -> None:
+        self.start = time.perf_counter()
+        self.durations: dict[str, float] = {}
+        self.point_count: int | None = None
+        self.feature_count: int | None = None
+        self._child_durations: list[float] = []
+
+    @contextmanager
+    def stage(self: "StageTimings", name: str) -> Generator[None, None, None]:
+        start = time.perf_counter()
+        self._child_durations.append(0.0)
+        try:
+            yield
+        finally:
+            child_duration = self._child_durations.pop()
+            duration = time.perf_counter() - start
+            self.durations[name] = self.durations.get(name, 0.0) + duration - child_duration
+            if self._child_durations:
+                self._child_durations[-1] += duration
+
+    def mark_parsed(self: "StageTimings") -> None:
+        self.durations["parse"] = time.perf_counter() - self.start
+
+    def durations_ms(self: "StageTimings") -> dict[str, float]:
+        return {name: round(duration * 1000, 2) for name, duration in self.durations.items()}
+
+
+_stage_timings: ContextVar[StageTimings | None] = ContextVar("stage_timings", default=None)
+
+
+def timing_active() -> bool:
+    return _stage_timings.get() is not None
+
+
+def timed(stage: str) -> AbstractContextManager[None]:
+    """Time stage of the current request, no-op when server timing is not enabled"""
+    timings = _stage_timings.get()
+    if timings is None:
+        return nullcontext()
+    return timings.stage(stage)
+
+
+def mark_parsed() -> None:
+    """Record the parse stage, to be called at the start of the route handler"""
+    timings = _stage_timings.get()
+    if timings is not None:
+        timings.mark_parsed()
+
+
+def record_counts(point_count: int | None = None, feature_count: int | None = None) -> None:
+    timings = _stage_timings.get()
+    if timings is None:
+        return
+    if point_count is not None:
+        timings.point_count = point_count
+    if feature_count is not None:
+        timings.feature_count = feature_count
+
+
+def format_server_timing(durations_ms: dict[str, float]) -> str:
+    return ", ".join(
+        f'{name};dur={duration};desc="{STAGE_DESCRIPTIONS.get(name, name)}"' for name, duration in durations_ms.items()
+    )
+
+
+class ServerTimingMiddleware:
+    """Add Server-Timing header to responses of requests with timed stages, and store the timings and point and
+    feature counts for the access log"""
+
+    def __init__(self: "ServerTimingMiddleware", app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self: "ServerTimingMiddleware", scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # the timings of an enclosing profiler (see benchmarks/memory.py) are reused
+        timings = _stage_timings.get() or StageTimings()
+        token = _stage_timings.set(timings)
+        # reset, thread-local storage outlives the request
+        _request_data.server_timing = None
+        _request_data.point_count = None
+        _request_data.feature_count = None
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and timings.durations:
+                timings.durations["total"] = time.perf_counter() - timings.start
+                durations_ms = timings.durations_ms()
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", format_server_timing(durations_ms))
+                _request_data.server_timing = durations_ms
+                _request_data.point_count = timings.point_count
+                _request_data.feature_count = timings.feature_count
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _stage_timings.reset(token)
@@ -3,12 +3,12 @@ from __future__ import annotations
 import logging
 import math
 import re
+from collections.abc import Callable
+from enum import Enum
 from functools import partial
-from importlib import resources as impresources
 from importlib.metadata import version
-from typing import Any, cast
+from typing import TYPE_CHECKING, Annotated, Any, Union, cast
 
-import yaml
 from fastapi import Request
 from fastapi.exceptions import RequestValidationError, ResponseValidationError
 from geodense.geojson import CrsFeatureCollection
@@ -24,13 +24,10 @@ from geodense.models import DenseConfig, GeodenseError
 from geojson_pydantic import Feature, GeometryCollection
 from geojson_pydantic.geometries import Geometry
 from geojson_pydantic.types import Position
-from pydantic import ValidationError
+from pydantic import Discriminator, Tag, ValidationError
 from pydantic_core import InitErrorDetails, PydanticCustomError
 from pyproj import CRS
-from shapely import STRtree, box
 
-from coordinate_transformation_api import assets
-from coordinate_transformation_api.cityjson.models import CityjsonV113
 from coordinate_transformation_api.constants import (
     DENSIFY_CRS_2D,
     DENSIFY_CRS_3D,
@@ -38,22 +35,48 @@ from coordinate_transformation_api.constants import (
     THREE_DIMENSIONAL,
 )
 from coordinate_transformation_api.crs_transform import (
+    BboxSweep,
+    check_axis,
     get_bbox_from_coordinates,
     get_coordinate_from_geometry,
     get_precision,
     get_transform_crs_fun,
+    get_transformer,
+    has_bbox,
     mutate_geom_coordinates,
 )
+from coordinate_transformation_api.densify import densify_geojson_object as vectorized_densify_geojson_object
+from coordinate_transformation_api.densify import predict_vertex_count
+from coordinate_transformation_api.density_check import (
+    check_density_geojson_object as vectorized_check_density_geojson_object,
+)
+from coordinate_transformation_api.geometry_arrays import GeometryArrays
+from coordinate_transformation_api.metrics import observe_dedup_ratio, observe_points_transformed
 from coordinate_transformation_api.models import (
     Crs as AvailableCrs,
 )
 from coordinate_transformation_api.models import (
     DensifyError,
+    DensifyVertexBudgetExceededError,
     DeviationOutOfBboxError,
+    TransformationNotPossibleError,
 )
 from coordinate_transformation_api.settings import app_settings
-
-BBOX_3D_DIMENSION = 6
+from coordinate_transformation_api.startup_cache import load_oas
+from coordinate_transformation_api.timing import record_counts, timed, timing_active
+
+if TYPE_CHECKING:  # the CityJSON models are imported on first use, see cityjson_models in main
+    from coordinate_transformation_api.cityjson.models import CityjsonV113
+
+GEOJSON_GEOMETRY_TYPES = (
+    "Point",
+    "MultiPoint",
+    "LineString",
+    "MultiLineString",
+    "Polygon",
+    "MultiPolygon",
+    "GeometryCollection",
+)
 
 logger = logging.getLogger(__name__)
 
@@ -106,14 +129,50 @@ def get_source_crs_body(
     source_crs: str | None = None
     if isinstance(body, CrsFeatureCollection) and body.crs is not None:
         source_crs = body.get_crs_auth_code()
-    elif isinstance(body, CityjsonV113) and body.metadata is not None and body.metadata.referenceSystem is not None:
-        ref_system: str = body.metadata.referenceSystem
+    elif (
+        get_body_type(body) == "CityJSON"
+        and (metadata := cast("CityjsonV113", body).metadata) is not None
+        and metadata.referenceSystem is not None
+    ):
+        ref_system: str = metadata.referenceSystem
         crs_auth = ref_system.split("/")[-3]
         crs_id = ref_system.split("/")[-1]
         source_crs = f"{crs_auth}:{crs_id}"
     return source_crs
 
 
+def get_body_type(body: Any) -> str | None:
+    """Tag of the request body model, based on the top-level type member. Used as discriminator of the request body
+    union, so the body is only validated against the model of its type."""
+    body_type = body.get("type") if isinstance(body, dict) else getattr(body, "type", None)
+    if isinstance(body_type, Enum):
+        body_type = body_type.value
+    if body_type in GEOJSON_GEOMETRY_TYPES:
+        return "Geometry"
+    return body_type if isinstance(body_type, str) else None
+
+
+# request bodies are validated against the model selected by their type member (see get_body_type), instead of
+# against each member of the union
+GeojsonBody = Annotated[
+    Union[  # noqa: UP007
+        Annotated[Feature, Tag("Feature")],
+        Annotated[CrsFeatureCollection, Tag("FeatureCollection")],
+        Annotated[Geometry, Tag("Geometry")],
+    ],
+    Discriminator(get_body_type),
+]
+TransformBody = Annotated[
+    Union[  # noqa: UP007
+        Annotated[Feature, Tag("Feature")],
+        Annotated[CrsFeatureCollection, Tag("FeatureCollection")],
+        Annotated[Geometry, Tag("Geometry")],
+        Annotated[dict[str, Any], Tag("CityJSON")],  # validated with main.validate_cityjson
+    ],
+    Discriminator(get_body_type),
+]
+
+
 def accept_html(request: Request) -> bool:
     if "accept" in request.headers:
         accept_header = request.headers["accept"]
@@ -122,30 +181,32 @@ def accept_html(request: Request) -> bool:
     return False
 
 
-def request_body_within_valid_bbox(body: GeojsonObject, source_crs: str) -> bool:
-    if source_crs not in [DENSIFY_CRS_2D, DENSIFY_CRS_3D]:
-        transform_f = get_transform_crs_fun(str_to_crs(source_crs), str_to_crs(DENSIFY_CRS_2D))
+def request_body_within_valid_bbox(body: GeojsonObject, source_crs: str | CRS) -> bool:
+    """Whether all positions of body are within DEVIATION_VALID_BBOX (OGC:CRS84)
 
-        if body.bbox is None:
-            # set bbox to initial value, otherwise wont be updated
-            body.bbox = (0, 0, 0, 0)
-            body_t = traverse_geojson_geometries(body, None, update_bbox)
+    A body in another CRS than DENSIFY_CRS_2D or DENSIFY_CRS_3D is transformed first, density_check_request_body and
+    densify_request_body check the GeometryArrays of the body they transformed to the densify CRS already, see
+    geometry_arrays_within_valid_bbox.
+    """
+    if isinstance(source_crs, CRS):
+        source_crs = "{}:{}".format(*source_crs.to_authority())
+    if source_crs not in [DENSIFY_CRS_2D, DENSIFY_CRS_3D]:
+        s_crs = str_to_crs(source_crs)
+        body = crs_transform(body, s_crs, str_to_crs(DENSIFY_CRS_2D))  # only the horizontal positions are checked
+    return geometry_arrays_within_valid_bbox(GeometryArrays(body))
 
-        body_bbox = body_t.bbox
 
-        if len(body_t.bbox) == BBOX_3D_DIMENSION:
-            # reduce bbox to 2D
-            body_bbox = body_t.bbox[0:2] + body_t.bbox[3:5]
+def geometry_arrays_within_valid_bbox(arrays: GeometryArrays) -> bool:
+    """Whether all positions of arrays, in DENSIFY_CRS_2D or DENSIFY_CRS_3D, are within DEVIATION_VALID_BBOX"""
+    x, y = arrays.x, arrays.y
+    min_x, min_y, max_x, max_y = DEVIATION_VALID_BBOX
+    # positions that could not be transformed are dropped, so a body without positions is not within the bbox
+    return len(arrays) > 0 and bool(((x >= min_x) & (x <= max_x) & (y >= min_y) & (y <= max_y)).all())
 
-        body_bbox_t = [
-            *transform_f(body_bbox[:2]),
-            *transform_f(body_bbox[2:]),
-        ]
 
-    shapely_bbox = [box(*body_bbox_t)]
-    tree = STRtree(shapely_bbox)
-    contains_index = tree.query(box(*DEVIATION_VALID_BBOX), predicate="contains").tolist()  # type: ignore
-    return len(shapely_bbox) == len(contains_index)
+def get_densify_crs(source_crs: CRS) -> str:
+    """CRS in which the density check and densification are done, DENSIFY_CRS_3D for 3D source CRSs"""
+    return DENSIFY_CRS_3D if len(source_crs.axis_info) == THREE_DIMENSIONAL else DENSIFY_CRS_2D
 
 
 def update_bbox(item: GeojsonObject):
@@ -159,56 +220,113 @@ def update_bbox(item: GeojsonObject):
         item.bbox = bbox
 
 
+def get_feature_count(body: GeojsonObject) -> int:
+    if isinstance(body, CrsFeatureCollection):
+        return len(body.features)
+    return 1 if isinstance(body, Feature) else 0
+
+
+def timed_update_bbox(update: Callable[[GeojsonObject], None], item: GeojsonObject) -> None:
+    with timed("update_bbox"):
+        update(item)
+
+
 def crs_transform(
     body: GeojsonObject,
     s_crs: CRS,
     t_crs: CRS,
     epoch: float | None = None,
+    count_points: bool = False,
 ) -> GeojsonObject:
-    t_callback = get_transform_crs_fun(s_crs, t_crs, epoch=epoch)
+    """count_points: record number of transformed points in metrics and server timing, to be set for the
+    transformation requested by the client only
+
+    With TRANSFORM_DEDUP each distinct position is transformed once, the epoch is the same for all positions of the
+    body so positions are identified by their coordinates."""
+    transform_fun = get_transform_crs_fun(s_crs, t_crs, epoch=epoch)
+    point_count = 0
+    # the bboxes are computed from the transformed positions in the same sweep, when the body has bbox members
+    bbox_sweep = BboxSweep() if has_bbox(body) else None
+    transformed: dict[Position, Position] | None = {} if app_settings.transform_dedup else None
+
+    def t_callback(position):
+        nonlocal point_count
+        point_count += 1
+        if transformed is None:
+            position_t = transform_fun(position)
+        elif (position_t := transformed.get(position)) is None:
+            position_t = transformed[position] = transform_fun(position)
+        if bbox_sweep is not None:
+            bbox_sweep.positions.append(position_t)
+        return position_t
+
     crs_transform_fun = partial(mutate_geom_coordinates, t_callback)
-    body_t = traverse_geojson_geometries(body, crs_transform_fun, update_bbox)
+    if bbox_sweep is None:
+        body_t = traverse_geojson_geometries(body, crs_transform_fun)
+    else:
+        bbox_callback = bbox_sweep.node_callback
+        if timing_active():
+            bbox_callback = partial(timed_update_bbox, bbox_sweep.node_callback)
+        body_t = traverse_geojson_geometries(
+            body, partial(bbox_sweep.geometry_callback, crs_transform_fun), bbox_callback
+        )
+    if count_points:
+        observe_points_transformed(point_count)
+        record_counts(point_count=point_count)
+        if transformed is not None:
+            observe_dedup_ratio(point_count, len(transformed))
 
     if isinstance(body_t, CrsFeatureCollection):
         body_t.set_crs_auth_code("{}:{}".format(*t_crs.to_authority()))
     return body_t
 
 
-def density_check_request_body(
+def density_check_request_body(  # noqa: PLR0913
     body: GeojsonObject,
     source_crs: CRS,
     max_segment_deviation: float | None,
     max_segment_length: float | None,
     epoch: float | None,
+    max_failed_segments: int | None = None,
 ) -> CrsFeatureCollection:
-    """Run density check with geodense implementation, by running density check in DENSIFY_CRS."""
-    validate_geom_type(body)
-    if max_segment_deviation is not None:
-        bbox_check_deviation_set(body, source_crs, max_segment_deviation)
-        max_segment_length = convert_deviation_to_distance(max_segment_deviation)
+    """Run density check with geodense implementation, by running density check in DENSIFY_CRS.
 
-    transform_crs = (
-        str_to_crs(DENSIFY_CRS_3D) if len(source_crs.axis_info) == THREE_DIMENSIONAL else str_to_crs(DENSIFY_CRS_2D)
-    )
+    With max_failed_segments the report contains at most max_failed_segments failed line segments, the vectorized
+    density check engine then stops at the last of them."""
+    validate_geom_type(body)
+    transform_crs_str = get_densify_crs(source_crs)
+    transform_crs = str_to_crs(transform_crs_str)
     transform = "{}:{}".format(*source_crs.to_authority()) not in [
         DENSIFY_CRS_3D,
         DENSIFY_CRS_2D,
     ]
 
+    body_t = body
     if transform:
         body_t = crs_transform(
             body, source_crs, transform_crs, epoch=epoch
         )  # !NOTE: crs_transform is required for density_check and densify
+    # read once, for the bbox check and the vectorized density check
+    arrays = GeometryArrays(body_t)
+    if max_segment_deviation is not None:
+        bbox_check_deviation_set(arrays, max_segment_deviation)
+        max_segment_length = convert_deviation_to_distance(max_segment_deviation)
     c = DenseConfig(CRS.from_authority(*DENSIFY_CRS_2D.split(":")), max_segment_length)
-    failed_line_segments = check_density_geojson_object(c, body_t)
+    if app_settings.density_check_engine == "vectorized":
+        failed_line_segments = vectorized_check_density_geojson_object(c, body_t, max_failed_segments, arrays)
+    else:
+        failed_line_segments = check_density_geojson_object(c, body_t)
+        failed_line_segments.features = failed_line_segments.features[:max_failed_segments]
 
+    failed_line_segments_t = failed_line_segments
     if transform:
         failed_line_segments_t = crs_transform(failed_line_segments, transform_crs, source_crs, epoch=epoch)
     return failed_line_segments_t
 
 
-def bbox_check_deviation_set(body: GeojsonObject, source_crs, max_segment_deviation) -> None:
-    if max_segment_deviation is not None and not request_body_within_valid_bbox(body, source_crs):
+def bbox_check_deviation_set(arrays: GeometryArrays, max_segment_deviation: float | None) -> None:
+    """arrays: GeometryArrays of the body in the densify CRS"""
+    if max_segment_deviation is not None and not geometry_arrays_within_valid_bbox(arrays):
         raise DeviationOutOfBboxError(
             f"Geometries not within bounding box: {DEVIATION_VALID_BBOX!s}. Use of max_segment_deviation parameter requires data to be within mentioned bounding box."
         )
@@ -219,37 +337,45 @@ def densify_request_body(
     source_crs: str,
     max_segment_deviation: float | None,
     max_segment_length: float | None,
+    target_crs: str | None = None,
 ) -> GeojsonObject:
     """densify request body according to geodense by densifying in DENSIFY_CRS
 
     Args:
         body (Feature | FeatureCollection | _GeometryBase | GeometryCollection): request body to transform, will be transformed in place
         transformer (Transformer): pyproj Transformer object
+        target_crs (str | None): CRS of the densified body, the densified body is transformed from DENSIFY_CRS to target_crs directly, defaults to source_crs
     """
 
-    if max_segment_deviation is not None:
-        bbox_check_deviation_set(body, source_crs, max_segment_deviation)
-        max_segment_length = convert_deviation_to_distance(max_segment_deviation)
-
-    source_crs_crs = CRS.from_authority(*source_crs.split(":"))
-    transform_crs = DENSIFY_CRS_3D if len(source_crs_crs.axis_info) == THREE_DIMENSIONAL else DENSIFY_CRS_2D
-    transform = source_crs not in [DENSIFY_CRS_3D, DENSIFY_CRS_2D]
-
     s_crs = str_to_crs(source_crs)
+    transform_crs = get_densify_crs(s_crs)
+    transform = source_crs not in [DENSIFY_CRS_3D, DENSIFY_CRS_2D]
+    target_crs = source_crs if target_crs is None else target_crs
     t_crs = str_to_crs(transform_crs)
 
     body_t = body
     if transform:
         body_t = crs_transform(body, s_crs, t_crs)
+    # read once, for the bbox check, the vertex count prediction and the vectorized densify engine
+    arrays = GeometryArrays(body_t)
+    if max_segment_deviation is not None:
+        bbox_check_deviation_set(arrays, max_segment_deviation)
+        max_segment_length = convert_deviation_to_distance(max_segment_deviation)
     c = DenseConfig(CRS.from_authority(*transform_crs.split(":")), max_segment_length)
     try:
-        body_t_d = densify_geojson_object(c, body_t)
+        vertex_budget = app_settings.densify_max_output_vertices
+        if vertex_budget > 0 and (predicted_vertices := predict_vertex_count(c, arrays)) > vertex_budget:
+            raise DensifyVertexBudgetExceededError(predicted_vertices, vertex_budget)
+        if app_settings.densify_engine == "vectorized":
+            body_t_d = vectorized_densify_geojson_object(c, body_t, arrays)
+        else:
+            body_t_d = densify_geojson_object(c, body_t)
     except GeodenseError as e:
         raise DensifyError(str(e)) from e
 
     body_d = body_t_d
-    if transform:
-        body_d = crs_transform(body_t_d, t_crs, s_crs)  # transform back to source_crs
+    if target_crs != transform_crs:
+        body_d = crs_transform(body_t_d, t_crs, str_to_crs(target_crs))  # transform back to source_crs or target_crs
     return body_d
 
 
@@ -263,38 +389,35 @@ def init_oas(crs_config) -> tuple[dict, str, str]:
     Returns:
         Tuple[dict, str, dict]: _description_
     """
-    oas_filepath = impresources.files(assets) / "openapi.yaml"
-
     available_crss = list(crs_config.keys())
     available_crss_uri = list(map(lambda x: x["uri"], list(crs_config.values())))
 
-    with oas_filepath.open("rb") as oas_file:
-        oas = yaml.load(oas_file, yaml.SafeLoader)
-        servers = [{"url": app_settings.base_url.strip("/")}]
-        oas["servers"] = servers
-        oas["info"]["version"] = version("coordinate_transformation_api")
-        oas["components"]["schemas"]["CrsEnum"]["enum"] = available_crss
-        oas["components"]["schemas"]["CrsHeaderEnum"]["enum"] = available_crss_uri
-
-        if app_settings.api_key_in_oas:
-            api_key_header_def = {
-                "APIKeyHeader": {
-                    "type": "apiKey",
-                    "in": "header",
-                    "name": "apikey",
-                }
+    oas = load_oas()
+    servers = [{"url": app_settings.base_url.strip("/")}]
+    oas["servers"] = servers
+    oas["info"]["version"] = version("coordinate_transformation_api")
+    oas["components"]["schemas"]["CrsEnum"]["enum"] = available_crss
+    oas["components"]["schemas"]["CrsHeaderEnum"]["enum"] = available_crss_uri
+
+    if app_settings.api_key_in_oas:
+        api_key_header_def = {
+            "APIKeyHeader": {
+                "type": "apiKey",
+                "in": "header",
+                "name": "apikey",
             }
-            security: dict = {"security": [{"APIKeyHeader": []}]}
-            if app_settings.example_api_key is not None:
-                api_key_description = f"\n\nThe Demo API key is `{app_settings.example_api_key}` and is intended for exploratory use of the API only. This key may stop working without warning."
-                oas["info"]["description"] = oas["info"]["description"] + api_key_description
+        }
+        security: dict = {"security": [{"APIKeyHeader": []}]}
+        if app_settings.example_api_key is not None:
+            api_key_description = f"\n\nThe Demo API key is `{app_settings.example_api_key}` and is intended for exploratory use of the API only. This key may stop working without warning."
+            oas["info"]["description"] = oas["info"]["description"] + api_key_description
 
-            oas["components"]["securitySchemes"] = api_key_header_def
+        oas["components"]["securitySchemes"] = api_key_header_def
 
-            for path in oas["paths"]:
-                if path != "/openapi":
-                    for op in oas["paths"][path]:
-                        oas["paths"][path][op] = oas["paths"][path][op] | security
+        for path in oas["paths"]:
+            if path != "/openapi":
+                for op in oas["paths"][path]:
+                    oas["paths"][path][op] = oas["paths"][path][op] | security
 
     api_title = oas["info"]["title"]
     return (oas, api_title, oas["info"]["version"])
@@ -403,7 +526,7 @@ def post_transform_get_crss(
             "No source CRS found in request. Defining a source CRS is required through the provided object a query parameter source-crs or header content-crs",
             loc=[("body", "crs"), ("query", "source-crs"), ("header", "content-crs")],  # type: ignore
         )
-    elif s_crs is None and isinstance(body, CityjsonV113):
+    elif s_crs is None and get_body_type(body) == "CityJSON":
         raise_request_validation_error(
             "metadata.referenceSystem field missing in CityJSON request body",
             loc=[
@@ -489,7 +612,31 @@ def get_src_crs_densify(
             "No source CRS found in request. Defining a source CRS is required through the query parameter source-crs or header content-crs",
             loc=("query", "source-crs", "header", "content-crs"),
         )
-    return cast(str, s_crs)
+    return "{}:{}".format(*extract_authority_code(cast(str, s_crs)))
+
+
+def get_target_crs_densify(source_crs: str, target_crs: str | None, accept_crs: str | None) -> str:
+    """Target CRS of a densify request as {auth}:{code}, the source CRS when no target CRS is requested
+
+    The densified body is transformed from the densify CRS of source_crs to the target CRS, a target CRS with more
+    dimensions than source_crs or without transformation from the densify CRS raises a RequestValidationError for the
+    target-crs query parameter or the accept-crs header."""
+    t_crs = "{}:{}".format(*extract_authority_code(target_crs or accept_crs or source_crs))
+    if t_crs == source_crs:
+        return t_crs
+    s_crs = str_to_crs(source_crs)
+    densify_crs = get_densify_crs(s_crs)
+    try:
+        check_axis(s_crs, str_to_crs(t_crs))
+        if t_crs != densify_crs:
+            get_transformer(str_to_crs(densify_crs), str_to_crs(t_crs), None)
+    except TransformationNotPossibleError as e:
+        raise_request_validation_error(
+            f"target CRS {t_crs} is not compatible with source CRS {source_crs} for densify: {e.reason}",
+            input=target_crs or accept_crs,
+            loc=("query", "target-crs") if target_crs is not None else ("header", "accept-crs"),
+        )
+    return t_crs
 
 
 def set_response_headers(*args, headers: dict[str, str] | None = None) -> dict[str, str]:
@@ -0,0 +1,63 @@
+import json
+
+import numpy as np
+import pytest
+
+from coordinate_transformation_api.cityjson.boundaries import FlatBoundaries, leaf_lists
+from coordinate_transformation_api.cityjson.models import CityjsonV113
+
+MULTI_POINT = [0, 1]
+MULTI_SURFACE = [[[2, 3, 4]], [[4, 3, 5], [6]]]
+SOLID = [[[[7, 8, 9]], []], [[[9, 8, 0]]]]
+
+
+@pytest.mark.parametrize(
+    ("boundaries", "expected"),
+    [
+        (MULTI_POINT, [[0, 1]]),
+        (MULTI_SURFACE, [[2, 3, 4], [4, 3, 5], [6]]),
+        (SOLID, [[], [7, 8, 9], [9, 8, 0]]),  # empty lists are leaves too
+        ([], [[]]),
+    ],
+)
+def test_leaf_lists(boundaries, expected):
+    assert leaf_lists(boundaries) == expected
+
+
+def test_flat_boundaries_remap_in_place():
+    boundaries = json.loads(json.dumps([MULTI_POINT, MULTI_SURFACE, SOLID]))
+    flat = FlatBoundaries.from_nested(boundaries)
+    assert flat.indices.tolist() == [0, 1, 2, 3, 4, 4, 3, 5, 6, 7, 8, 9, 9, 8, 0]
+    assert flat.geometry_offsets.tolist() == [0, 2, 9, 15]
+    assert flat.used_vertices().tolist() == list(range(10))
+    flat.remap(np.arange(10)[::-1])
+    flat.update_nested()
+    assert boundaries == [[9, 8], [[[7, 6, 5]], [[5, 6, 4], [3]]], [[[[2, 1, 0]], []], [[[0, 1, 9]]]]]
+
+
+def test_flat_boundaries_bbox():
+    vertices = np.array([[0.0, 0.0, 0.0], [1.0, 2.0, 3.0], [-1.0, 5.0, 1.0], [4.0, 4.0, 4.0]])
+    flat = FlatBoundaries.from_nested([[0, 1], [[[2]]], [], [3]])
+    mins, maxs = flat.bbox(vertices, np.array([0, 2, 3, 4]))
+    assert mins.tolist() == [[-1.0, 0.0, 0.0], [9e9, 9e9, 9e9], [4.0, 4.0, 4.0]]
+    assert maxs.tolist() == [[1.0, 5.0, 3.0], [-9e9, -9e9, -9e9], [4.0, 4.0, 4.0]]
+
+
+def test_update_bbox_each_cityobjects_all_geometries():
+    with open("tests/data/house_1.city.json") as f:
+        data = json.load(f)
+    obj_id = "GUID_0C208AED-A967-4A3B-8F57-EB2E7732176F_1"
+    geometry = data["CityObjects"][obj_id]["geometry"][0]
+    # second geometry of the CityObject, with the last vertex only
+    data["CityObjects"][obj_id]["geometry"].append({**geometry, "boundaries": [[[[len(data["vertices"]) - 1]]]]})
+    cj = CityjsonV113.model_validate(data)
+    cj.update_bbox_each_cityobjects(False)
+    extent = cj.CityObjects[obj_id].geographicalExtent  # type: ignore
+    cj.decompress()
+    vertices = np.array(cj.vertices)
+    indices = np.unique(
+        [i for each in geometry["boundaries"] for surface in each for ring in surface for i in ring]
+        + [len(data["vertices"]) - 1]
+    )
+    expected = [*vertices[indices].min(axis=0), *vertices[indices].max(axis=0)]
+    assert np.allclose(extent, expected)
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from coordinate_transformation_api.cityjson.fast import GEOMETRY_TYPES, CityjsonV113Fast, FastCityObject
+from coordinate_transformation_api.cityjson.models import CityjsonV113
+from coordinate_transformation_api.util import str_to_crs
+
+
+@pytest.fixture
+def house() -> dict:
+    with open("tests/data/house_1.city.json") as f:
+        return json.load(f)
+
+
+def test_geometry_types_from_generated_models():
+    assert GEOMETRY_TYPES["TINRelief"] == {"CompositeSurface"}
+    assert GEOMETRY_TYPES["Road"] == {"MultiLineString", "MultiSurface", "CompositeSurface"}
+    assert "GeometryInstance" in GEOMETRY_TYPES["CityFurniture"]
+
+
+def test_fast_crs_transform_matches_full(house):
+    s_crs, t_crs = str_to_crs("EPSG:7415"), str_to_crs("EPSG:9286")
+    results = []
+    for model in (CityjsonV113, CityjsonV113Fast):
+        cj = model.model_validate(house)
+        cj.crs_transform(s_crs, t_crs)
+        results.append(json.loads(cj.model_dump_json(exclude_none=True)))
+    assert results[0] == results[1]
+
+
+def test_fast_passes_through_unvalidated_members(house):
+    obj_id = "GUID_0C208AED-A967-4A3B-8F57-EB2E7732176F_1"
+    house["CityObjects"][obj_id]["lineage"] = {"source": "test"}
+    house["CityObjects"][obj_id]["geometry"][0]["semantics"]["surfaces"][0]["custom"] = [1, None]
+    house["+extra"] = {"a": 1}
+    result = json.loads(CityjsonV113Fast.model_validate(house).model_dump_json(exclude_none=True))
+    assert result["CityObjects"][obj_id]["lineage"] == {"source": "test"}
+    assert (
+        result["CityObjects"][obj_id]["geometry"][0]["semantics"]
+        == house["CityObjects"][obj_id]["geometry"][0]["semantics"]
+    )
+    assert result["appearance"] == house["appearance"]
+    assert result["+extra"] == {"a": 1}
+
+
+def test_fast_transforms_extension_city_object_geometries(house):
+    geometry = {"type": "MultiPoint", "lod": "1", "boundaries": [0, 1]}
+    house["CityObjects"]["ext"] = {"type": "+Statue", "geometry": [geometry]}
+    cj = CityjsonV113Fast.model_validate(house)
+    cj.crs_transform(str_to_crs("EPSG:7415"), str_to_crs("EPSG:9286"))
+    assert len(cj.CityObjects["ext"].geometry) == 1  # type: ignore
+    assert all(0 <= i < len(cj.vertices) for i in cj.CityObjects["ext"].geometry[0].boundaries)  # type: ignore
+
+
+@pytest.mark.parametrize(
+    ("city_object", "message"),
+    [
+        ({"type": "Building", "geometry": [{"type": "MultiPoint", "lod": "1", "boundaries": [0]}]}, "not allowed"),
+        ({"type": "House"}, "unknown CityObject type"),
+        ({"type": "Building", "geometry": [{"type": "Solid", "lod": "1", "boundaries": [[0]]}]}, "list"),
+        ({"type": "Building", "geometry": [{"type": "Sphere", "boundaries": []}]}, "tag"),
+    ],
+)
+def test_fast_city_object_invalid(city_object, message):
+    with pytest.raises(ValidationError, match=message):
+        FastCityObject.model_validate(city_object)
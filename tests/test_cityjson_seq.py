@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from coordinate_transformation_api.cityjson.models import CityjsonFeatureV113, CityjsonV113
+from coordinate_transformation_api.cityjson.seq import CityjsonSeqTransformer, iter_lines
+from coordinate_transformation_api.cityjson.vertices import as_vertex_array, dequantize
+from coordinate_transformation_api.models import DataValidationError
+from coordinate_transformation_api.util import str_to_crs
+
+
+def to_cityjson_seq(data: dict) -> tuple[dict, list[dict]]:
+    """Header and a single feature with all CityObjects of a CityJSON object"""
+    header = {**data, "CityObjects": {}, "vertices": []}
+    feature = {
+        "type": "CityJSONFeature",
+        "id": next(iter(data["CityObjects"])),
+        "CityObjects": data["CityObjects"],
+        "vertices": data["vertices"],
+    }
+    return header, [feature]
+
+
+def boundary_coordinates(city_objects: dict, vertices: list, scale: list, translate: list) -> np.ndarray:
+    def flatten(boundaries: list) -> list[int]:
+        return [i for each in boundaries for i in (flatten(each) if isinstance(each, list) else [each])]
+
+    indices = [i for obj in city_objects.values() for g in obj.get("geometry", []) for i in flatten(g["boundaries"])]
+    return dequantize(as_vertex_array(vertices)[indices], scale, translate)
+
+
+async def collect(chunks: list[bytes]) -> list[bytes]:
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    return [line async for line in iter_lines(stream())]
+
+
+@pytest.mark.parametrize(
+    "chunks",
+    [
+        [b'{"a": 1}\n{"b": 2}\n'],
+        [b'{"a"', b": 1}\n", b'{"b": 2}'],
+        [b'{"a": 1}\r\n\n  \n{"b"', b"", b": 2}\n\n"],
+    ],
+)
+def test_iter_lines(chunks):
+    lines = asyncio.run(collect(chunks))
+    assert [json.loads(line) for line in lines] == [{"a": 1}, {"b": 2}]
+
+
+def test_cityjson_seq_matches_cityjson_transform():
+    with open("tests/data/house_1.city.json") as f:
+        data = json.load(f)
+    s_crs, t_crs = str_to_crs("EPSG:7415"), str_to_crs("EPSG:9286")
+
+    cj = CityjsonV113.model_validate(data)
+    cj.crs_transform(s_crs, t_crs)
+    expected = cj.model_dump(exclude_none=True)
+
+    header_data, features_data = to_cityjson_seq(data)
+    header = CityjsonV113.model_validate(header_data)
+    transformer = CityjsonSeqTransformer(header, s_crs, t_crs)
+    feature = CityjsonFeatureV113.model_validate(features_data[0])
+    transformer.transform_feature(feature)
+    result = feature.model_dump(exclude_none=True)
+
+    assert header.metadata.referenceSystem == expected["metadata"]["referenceSystem"]  # type: ignore
+    assert header.metadata.geographicalExtent is None  # type: ignore
+    assert header.transform.scale == expected["transform"]["scale"]
+    assert np.allclose(
+        boundary_coordinates(result["CityObjects"], result["vertices"], **header.transform.model_dump()),
+        boundary_coordinates(expected["CityObjects"], expected["vertices"], **expected["transform"]),
+        rtol=0,
+        atol=header.transform.scale[0],
+    )
+    for obj_id, obj in result["CityObjects"].items():
+        if "geographicalExtent" in obj:
+            assert np.allclose(
+                obj["geographicalExtent"], expected["CityObjects"][obj_id]["geographicalExtent"], rtol=0, atol=1e-8
+            )
+
+
+def test_cityjson_seq_header_with_city_objects():
+    with open("tests/data/house_1.city.json") as f:
+        header = CityjsonV113.model_validate(json.load(f))
+    with pytest.raises(DataValidationError, match="without CityObjects and vertices"):
+        CityjsonSeqTransformer(header, str_to_crs("EPSG:7415"), str_to_crs("EPSG:9286"))
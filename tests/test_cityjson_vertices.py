@@ -0,0 +1,119 @@
+import json
+
+import numpy as np
+import pytest
+from geojson_pydantic.types import Position3D
+
+from coordinate_transformation_api.cityjson.models import CityjsonV113
+from coordinate_transformation_api.cityjson.vertices import (
+    as_vertex_array,
+    dequantize,
+    quantize,
+    round_decimals,
+    unique_vertices,
+    vertex_bbox,
+)
+from coordinate_transformation_api.crs_transform import get_transform_crs_fun, get_transform_crs_fun_city_json
+from coordinate_transformation_api.util import str_to_crs
+
+
+def format_quantize(vertices: list[list[float]], translate: list[float], important_digits: int) -> list[list[int]]:
+    """Reference implementation of quantization by cjio"""
+    p = "%." + str(important_digits) + "f"
+    return [[int((p % (v[i] - translate[i])).replace(".", "")) for i in range(3)] for v in vertices]
+
+
+@pytest.mark.parametrize("important_digits", [0, 3, 8])
+def test_quantize_matches_formatting(important_digits):
+    rng = np.random.default_rng(0)
+    vertices = np.concatenate(
+        [
+            rng.uniform(-1e5, 1e6, (10_000, 3)),
+            # offsets halfway between two quantized values
+            np.repeat((np.arange(-3000, 3000) + 0.5)[:, None] / 10**important_digits, 3, axis=1),
+            np.repeat(np.arange(-3000, 3000)[:, None] / 2000 + 0.0005, 3, axis=1),
+        ]
+    )
+    translate = [0.0, 0.0, 0.0]
+    expected = format_quantize(vertices.tolist(), translate, important_digits)
+    assert quantize(vertices, translate, important_digits).tolist() == expected
+
+
+def test_quantize_non_finite():
+    with pytest.raises(ValueError, match="non-finite"):
+        quantize(np.array([[1.0, 2.0, np.inf]]), [0.0, 0.0, 0.0], 3)
+
+
+def test_dequantize():
+    vertices = as_vertex_array([[1000, 2000, -3], [0, 0, 0]])
+    assert vertices.dtype == np.int64
+    result = dequantize(vertices, [0.001, 0.001, 0.01], [10.0, 20.0, 30.0])
+    assert result.tolist() == [[1000 * 0.001 + 10.0, 2000 * 0.001 + 20.0, -3 * 0.01 + 30.0], [10.0, 20.0, 30.0]]
+
+
+def test_unique_vertices_first_occurrence_order():
+    vertices = as_vertex_array([[5, 5, 5], [1, 1, 1], [5, 5, 5], [0, 0, 0], [1, 1, 1]])
+    unique, new_index = unique_vertices(vertices)
+    assert unique.tolist() == [[5, 5, 5], [1, 1, 1], [0, 0, 0]]
+    assert new_index.tolist() == [0, 1, 0, 2, 1]
+
+
+def test_vertex_bbox():
+    assert vertex_bbox(as_vertex_array([[1.0, 5.0, 3.0], [2.0, -1.0, 0.0]])) == [1.0, -1.0, 0.0, 2.0, 5.0, 3.0]
+
+
+def flatten(boundaries: list) -> list[int]:
+    return [i for each in boundaries for i in (flatten(each) if isinstance(each, list) else [each])]
+
+
+def boundary_coordinates(cj: CityjsonV113) -> np.ndarray:
+    indices = [
+        i
+        for city_object in cj.CityObjects.values()
+        for geometry in city_object.geometry or []  # type: ignore
+        for i in flatten(geometry.boundaries)
+    ]
+    return as_vertex_array(cj.vertices)[indices]
+
+
+def test_compress_round_trip():
+    with open("tests/data/house_1.city.json") as f:
+        data = json.load(f)
+    cj_original = CityjsonV113.model_validate(data)
+    cj_original.decompress()
+    cj = CityjsonV113.model_validate(data)
+    cj.decompress()
+    cj.compress(3)
+    assert all(isinstance(x, int) for v in cj.vertices for x in v)
+    assert cj.remove_duplicate_vertices() == 0
+    cj.decompress()
+    assert np.allclose(boundary_coordinates(cj), boundary_coordinates(cj_original), atol=0.001)
+
+
+@pytest.mark.parametrize("digits", [0, 4, 9])
+def test_round_decimals_matches_round(digits):
+    rng = np.random.default_rng(0)
+    values = np.concatenate(
+        [
+            rng.uniform(-180, 180, 10_000),
+            (np.arange(-3000, 3000) + 0.5) / 10**digits,
+            np.arange(-3000, 3000) / 1000 + 0.0005,
+            [np.inf, -np.inf, 0.0, -0.0, 1e300],
+        ]
+    )
+    assert round_decimals(values, digits).tolist() == [round(value, digits) for value in values.tolist()]
+
+
+@pytest.mark.parametrize(
+    ("source_crs", "target_crs", "epoch", "vertices"),
+    [
+        ("EPSG:7415", "EPSG:9286", None, [[155000.0, 463000.0, 4.0], [84000.123, 447000.456, -2.5]]),
+        ("EPSG:7912", "EPSG:7931", 2023.5, [[5.1, 52.1, 40.0], [4.123456789, 51.987654321, -1.0]]),
+    ],
+)
+def test_transform_crs_fun_city_json_matches_transform_crs_fun(source_crs, target_crs, epoch, vertices):
+    s_crs, t_crs = str_to_crs(source_crs), str_to_crs(target_crs)
+    transform_vertices = get_transform_crs_fun_city_json(s_crs, t_crs, epoch=epoch)
+    transform_position = get_transform_crs_fun(s_crs, t_crs, epoch=epoch)
+    expected = [list(transform_position(Position3D(*vertex))) for vertex in vertices]
+    assert transform_vertices(np.array(vertices)).tolist() == expected
@@ -0,0 +1,178 @@
+import asyncio
+import gzip
+import os
+import zlib
+
+import brotli
+import pytest
+import zstandard
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from coordinate_transformation_api.compression_middleware.middleware import (
+    RequestDecompressionMiddleware,
+    ResponseCompressionMiddleware,
+    negotiate_encoding,
+)
+from coordinate_transformation_api.fastapi_rfc7807 import middleware
+from coordinate_transformation_api.limit_middleware.middleware import ContentSizeLimitMiddleware, SpooledBodyRoute
+
+MAX_CONTENT_SIZE = 100_000
+MAX_COMPRESSED_CONTENT_SIZE = 1000
+MINIMUM_SIZE = 500
+SEQ_MEDIA_TYPE = "application/city+json-seq"
+
+COMPRESS = {
+    "gzip": gzip.compress,
+    "br": brotli.compress,
+    "zstd": zstandard.ZstdCompressor().compress,
+}
+DECOMPRESS = {
+    "gzip": gzip.decompress,
+    "br": brotli.decompress,
+    "zstd": lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data),
+}
+
+
+@pytest.fixture(params=[None, 10])
+def client(request) -> TestClient:
+    app = FastAPI()
+    app.router.route_class = SpooledBodyRoute
+    middleware.register(app)
+    app.add_middleware(ContentSizeLimitMiddleware, max_content_size=MAX_CONTENT_SIZE, spool_threshold=request.param)
+    app.add_middleware(
+        RequestDecompressionMiddleware,
+        max_compressed_size=MAX_COMPRESSED_CONTENT_SIZE,
+        max_compressed_size_media_types={SEQ_MEDIA_TYPE: MAX_CONTENT_SIZE},
+    )
+    app.add_middleware(ResponseCompressionMiddleware, minimum_size=MINIMUM_SIZE)
+
+    @app.post("/echo")
+    async def echo(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(await request.body())
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        return StreamingResponse(iter([b"a" * 1000, b"b" * 1000]), media_type="text/plain")
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+def test_request_body_decompressed(client, encoding):
+    body = b"coordinates " * 1000
+    response = client.post(
+        "/echo",
+        content=COMPRESS[encoding](body),
+        headers={"Content-Encoding": encoding, "Accept-Encoding": "identity"},
+    )
+    assert response.status_code == 200  # noqa: PLR2004
+    assert response.content == body
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+def test_decoded_request_body_size_limit(client, encoding):
+    response = client.post(
+        "/echo",
+        content=COMPRESS[encoding](b"x" * (MAX_CONTENT_SIZE + 1)),
+        headers={"Content-Encoding": encoding},
+    )
+    assert response.status_code == 413  # noqa: PLR2004
+
+
+def test_compressed_request_body_size_limit(client):
+    response = client.post(
+        "/echo",
+        content=gzip.compress(os.urandom(MAX_COMPRESSED_CONTENT_SIZE * 2)),
+        headers={"Content-Encoding": "gzip"},
+    )
+    assert response.status_code == 413  # noqa: PLR2004
+    assert "compressed" in response.json()["detail"]
+
+
+def test_compressed_request_body_size_limit_of_media_type(client):
+    body = os.urandom(MAX_COMPRESSED_CONTENT_SIZE * 2)
+    response = client.post(
+        "/echo",
+        content=gzip.compress(body),
+        headers={"Content-Encoding": "gzip", "Content-Type": SEQ_MEDIA_TYPE},
+    )
+    assert response.status_code == 200  # noqa: PLR2004
+    assert response.content == body
+
+
+@pytest.mark.parametrize("content", [b"not gzip data", gzip.compress(b"x" * 1000)[:-10]])
+def test_invalid_request_body_encoding(client, content):
+    response = client.post("/echo", content=content, headers={"Content-Encoding": "gzip"})
+    assert response.status_code == 400  # noqa: PLR2004
+
+
+def test_unsupported_request_body_encoding(client):
+    response = client.post("/echo", content=b"foo", headers={"Content-Encoding": "compress"})
+    assert response.status_code == 415  # noqa: PLR2004
+    assert "gzip" in response.headers["Accept-Encoding"]
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+@pytest.mark.parametrize("path", ["/echo", "/stream"])
+def test_response_compressed(client, encoding, path):
+    body = b"a" * 1000 + b"b" * 1000
+    with client.stream(
+        "POST" if path == "/echo" else "GET", path, content=body, headers={"Accept-Encoding": encoding}
+    ) as response:
+        assert response.headers["Content-Encoding"] == encoding
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert DECOMPRESS[encoding](b"".join(response.iter_raw())) == body
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+async def test_streamed_response_chunks_flushed(encoding):
+    chunks = [b"a" * 1000, b"b" * 1000]
+    app = ResponseCompressionMiddleware(
+        StreamingResponse(iter(chunks), media_type="application/city+json-seq"), minimum_size=MINIMUM_SIZE
+    )
+    messages = []
+
+    async def receive() -> dict:
+        await asyncio.Event().wait()  # no disconnect while the response is sent
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", encoding.encode())]}
+    await app(scope, receive, send)
+    decompressor = {
+        "gzip": lambda: zlib.decompressobj(wbits=zlib.MAX_WBITS | 16),
+        "br": brotli.Decompressor,
+        "zstd": lambda: zstandard.ZstdDecompressor().decompressobj(),
+    }[encoding]()
+    decompress = decompressor.process if encoding == "br" else decompressor.decompress
+    bodies = [message["body"] for message in messages if message["type"] == "http.response.body"]
+    # the first chunk can be decoded before the rest of the response has been sent
+    assert decompress(bodies[0]) == chunks[0]
+
+
+def test_small_response_not_compressed(client):
+    response = client.post("/echo", content=b"a" * (MINIMUM_SIZE - 1), headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert response.content == b"a" * (MINIMUM_SIZE - 1)
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("gzip, deflate, br, zstd", "zstd"),
+        ("gzip;q=1.0, br;q=0.5", "gzip"),
+        ("zstd;q=0, br", "br"),
+        ("*", "zstd"),
+        ("*;q=0", None),
+    ],
+)
+def test_negotiate_encoding(accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding) == expected
@@ -0,0 +1,91 @@
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from coordinate_transformation_api.fastapi_rfc7807 import middleware
+from coordinate_transformation_api.limit_middleware.middleware import (
+    SPOOLED_BODY_SCOPE_KEY,
+    ContentSizeLimitMiddleware,
+    SpooledBodyRoute,
+)
+
+MAX_CONTENT_SIZE = 1000
+MAX_CONTENT_SIZE_STREAM = 5000
+STREAM_MEDIA_TYPE = "application/city+json-seq"
+SPOOL_THRESHOLD = 100
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.router.route_class = SpooledBodyRoute
+    middleware.register(app)
+    app.add_middleware(
+        ContentSizeLimitMiddleware,
+        max_content_size=MAX_CONTENT_SIZE,
+        spool_threshold=SPOOL_THRESHOLD,
+        max_content_size_media_types={STREAM_MEDIA_TYPE: MAX_CONTENT_SIZE_STREAM},
+    )
+
+    @app.post("/echo")
+    async def echo(request: Request) -> dict:
+        body = await request.body()
+        return {"size": len(body), "spooled": SPOOLED_BODY_SCOPE_KEY in request.scope, "body": body.decode()}
+
+    @app.post("/stream")
+    async def stream(request: Request) -> dict:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+        return {"size": size}
+
+    return TestClient(app)
+
+
+def test_content_length_exceeded_rejected_before_reading_body(client):
+    response = client.post("/echo", content=b"x" * (MAX_CONTENT_SIZE + 1))
+    assert response.status_code == 413  # noqa: PLR2004
+    assert response.headers["content-type"] == "application/problem+json"
+    assert "Content-Length" in response.json()["detail"]
+
+
+def test_chunked_body_exceeded_rejected(client):
+    response = client.post("/echo", content=iter([b"x" * 600, b"x" * 600]))
+    assert response.status_code == 413  # noqa: PLR2004
+
+
+@pytest.mark.parametrize(
+    ("content", "spooled"),
+    [
+        (b"x" * SPOOL_THRESHOLD, False),
+        (b"x" * (SPOOL_THRESHOLD + 1), True),
+        (b"x" * MAX_CONTENT_SIZE, True),
+        (iter([b"x" * 10, b"y" * 10]), True),
+    ],
+)
+def test_body_spooled_above_threshold(client, content, spooled):
+    response = client.post("/echo", content=content)
+    assert response.status_code == 200  # noqa: PLR2004
+    result = response.json()
+    assert result["spooled"] == spooled
+    expected = content if isinstance(content, bytes) else b"x" * 10 + b"y" * 10
+    assert result["body"] == expected.decode()
+
+
+def test_spooled_body_stream(client):
+    response = client.post("/stream", content=b"x" * MAX_CONTENT_SIZE)
+    assert response.status_code == 200  # noqa: PLR2004
+    assert response.json()["size"] == MAX_CONTENT_SIZE
+
+
+@pytest.mark.parametrize(
+    ("content", "status_code"),
+    [
+        (b"x" * MAX_CONTENT_SIZE_STREAM, 200),
+        (b"x" * (MAX_CONTENT_SIZE_STREAM + 1), 413),
+        (iter([b"x" * 3000, b"x" * 3000]), 413),
+    ],
+)
+def test_max_content_size_media_type(client, content, status_code):
+    response = client.post("/stream", content=content, headers={"content-type": f"{STREAM_MEDIA_TYPE}; charset=utf-8"})
+    assert response.status_code == status_code
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+from geodense.lib import densify_geojson_object
+from geodense.models import DenseConfig
+from pyproj import CRS
+
+from benchmarks.synthetic import feature_collection
+from coordinate_transformation_api.densify import densify_geojson_object as vectorized_densify
+from coordinate_transformation_api.densify import predict_vertex_count
+from coordinate_transformation_api.geometry_arrays import GeometryArrays
+from tests.util import load_body
+
+
+def assert_identical(crs: str, max_segment_length: float, data: dict) -> None:
+    config = DenseConfig(CRS.from_user_input(crs), max_segment_length)
+    body = load_body(data)
+    expected = densify_geojson_object(config, load_body(data))
+    result = vectorized_densify(config, body)
+    assert result.model_dump_json() == expected.model_dump_json()
+    assert body.model_dump_json() == load_body(data).model_dump_json()  # input is not modified
+
+
+@pytest.mark.parametrize("max_segment_length", [20.0, 200.0, 5000.0])
+@pytest.mark.parametrize(
+    ("crs", "data"),
+    [
+        ("OGC:CRS84", feature_collection("OGC:CRS84", 2000)),
+        ("OGC:CRS84h", feature_collection("OGC:CRS84h", 2000)),
+        ("OGC:CRS84", feature_collection("OGC:CRS84", 300, geometry_types=("LineString", "MultiPoint"))),
+    ],
+)
+def test_vectorized_densify_identical_to_geodense(crs, data, max_segment_length):
+    assert_identical(crs, max_segment_length, data)
+
+
+@pytest.mark.parametrize("max_segment_length", [20.0, 200.0])
+@pytest.mark.parametrize(
+    "name", ["linestrings.json", "polygons.json", "polygons-multi.json", "feature-collection-geometry-collection.json"]
+)
+def test_vectorized_densify_identical_to_geodense_projected(name, max_segment_length):
+    with open(f"tests/data/{name}") as f:
+        data = json.load(f)
+    assert_identical("EPSG:28992", max_segment_length, data)
+
+
+def test_vectorized_densify_mixed_dimensions():
+    data = {
+        "type": "GeometryCollection",
+        "geometries": [
+            {
+                "type": "MultiLineString",
+                "coordinates": [
+                    [[5.0, 52.0, 1.0], [5.01, 52.0], [5.02, 52.01, 3.0], [5.03, 52.0, -2.123456]],
+                    [[5.2, 52.2, 0.0], [5.2, 52.21, 10.0]],
+                ],
+            },
+            {"type": "MultiPoint", "coordinates": [[5.1, 52.1, 1.23456]]},
+            {"type": "Point", "coordinates": [5.1, 52.1, 1.23456]},
+        ],
+    }
+    assert_identical("OGC:CRS84h", 100.0, data)
+
+
+@pytest.mark.parametrize("max_segment_length", [20.0, 200.0, 5000.0])
+@pytest.mark.parametrize("crs", ["OGC:CRS84", "OGC:CRS84h"])
+def test_predict_vertex_count(crs, max_segment_length):
+    config = DenseConfig(CRS.from_user_input(crs), max_segment_length)
+    body = load_body(feature_collection(crs, 2000))
+    assert predict_vertex_count(config, GeometryArrays(body)) == len(
+        GeometryArrays(densify_geojson_object(config, body))
+    )
@@ -0,0 +1,126 @@
+import json
+
+import numpy as np
+import pytest
+from geodense.geojson import CrsFeatureCollection
+from geodense.lib import check_density_geojson_object
+from geodense.models import DenseConfig, GeodenseError
+from pyproj import CRS
+
+from benchmarks.synthetic import feature_collection
+from coordinate_transformation_api.density_check import check_density_geojson_object as vectorized_check_density
+from coordinate_transformation_api.density_check import max_segment_length_bounds
+from tests.util import load_body
+
+CRS84 = CRS.from_authority("OGC", "CRS84")
+
+
+def data_files() -> list[dict]:
+    names = [
+        "linestrings.json",
+        "linestrings-multi.json",
+        "polygons.json",
+        "polygons-multi.json",
+        "feature-collection-geometry-collection.json",
+        "feature-geometry-collection.json",
+        "geometry-collection.json",
+    ]
+    result = []
+    for name in names:
+        with open(f"tests/data/{name}") as f:
+            result.append(json.load(f))
+    return result
+
+
+@pytest.mark.parametrize("max_segment_length", [1.0, 100.0, 1000.0, 10_000.0])
+@pytest.mark.parametrize(
+    "data",
+    [
+        feature_collection("OGC:CRS84", 5000),
+        feature_collection("OGC:CRS84", 1000, geometry_types=("Polygon", "MultiPoint"), holes=4),
+        feature_collection("OGC:CRS84", 20, geometry_types=("LineString",)),
+    ],
+)
+def test_vectorized_density_check_identical_to_geodense(data, max_segment_length):
+    config = DenseConfig(CRS84, max_segment_length)
+    expected = check_density_geojson_object(config, load_body(data))
+    result = vectorized_check_density(config, load_body(data))
+    assert result.model_dump_json() == expected.model_dump_json()
+
+
+@pytest.mark.parametrize("max_segment_length", [200.0, 5000.0])
+@pytest.mark.parametrize("data", data_files())
+def test_vectorized_density_check_identical_to_geodense_projected(data, max_segment_length):
+    config = DenseConfig(CRS.from_epsg(28992), max_segment_length)
+    expected = check_density_geojson_object(config, load_body(data))
+    result = vectorized_check_density(config, load_body(data))
+    assert result.model_dump_json() == expected.model_dump_json()
+
+
+def test_vectorized_density_check_only_points():
+    body = load_body({"type": "MultiPoint", "coordinates": [[5.0, 52.0], [5.1, 52.1]]})
+    with pytest.raises(GeodenseError, match="only contains"):
+        vectorized_check_density(DenseConfig(CRS84, 200.0), body)
+
+
+def test_vectorized_density_check_empty_report():
+    body = load_body({"type": "LineString", "coordinates": [[5.0, 52.0], [5.0, 52.000001]]})
+    result = vectorized_check_density(DenseConfig(CRS84, 200.0), body)
+    assert isinstance(result, CrsFeatureCollection)
+    assert result.features == []
+
+
+def parcels(crs: str, n: int, size: float) -> dict:
+    """n square parcels and every tenth parcel a long (20 * size) strip"""
+    rng = np.random.default_rng(1)
+    x0, y0, extent = (4.0, 51.0, 2.0) if crs == "OGC:CRS84" else (100_000.0, 400_000.0, 100_000.0)
+    features = []
+    for i in range(n):
+        x, y = x0 + rng.uniform(0, extent), y0 + rng.uniform(0, extent)
+        width = size * (20 if i % 10 == 0 else 1)
+        ring = [[x, y], [x + width, y], [x + width, y + size], [x, y + size], [x, y]]
+        features.append({"type": "Feature", "properties": {}, "geometry": {"type": "Polygon", "coordinates": [ring]}})
+    return {"type": "FeatureCollection", "features": features}
+
+
+@pytest.mark.parametrize(("crs", "size"), [("OGC:CRS84", 0.0003), ("EPSG:28992", 20.0)])
+def test_vectorized_density_check_bbox_prepass(crs, size):
+    config = DenseConfig(CRS.from_user_input(crs), 200.0)
+    expected = check_density_geojson_object(config, load_body(parcels(crs, 500, size)))
+    result = vectorized_check_density(config, load_body(parcels(crs, 500, size)))
+    assert len(result.features) > 0
+    assert result.model_dump_json() == expected.model_dump_json()
+
+
+@pytest.mark.parametrize(
+    ("crs", "min_x", "min_y", "max_size"),
+    [
+        ("OGC:CRS84", (-180.0, 170.0), (-90.0, 80.0), 10.0),
+        ("EPSG:28992", (0.0, 250_000.0), (300_000.0, 600_000.0), 1e5),
+    ],
+)
+def test_max_segment_length_bounds(crs, min_x, min_y, max_size):
+    config = DenseConfig(CRS.from_user_input(crs), 200.0)
+    rng = np.random.default_rng(1)
+    n = 10_000
+    x0, y0 = rng.uniform(*min_x, n), rng.uniform(*min_y, n)
+    x1, y1 = x0 + rng.uniform(0, max_size, n), y0 + rng.uniform(0, max_size, n)
+    if crs == "OGC:CRS84":
+        y1 = np.minimum(y1, 90.0)
+    bounds = max_segment_length_bounds(config, (x0, y0, x1, y1))
+    # the diagonals and an edge of the bboxes
+    for a, b in [((x0, y0), (x1, y1)), ((x0, y1), (x1, y0)), ((x0, y0), (x1, y0))]:
+        if config.transformer is not None:
+            a, b = config.transformer.transform(*a), config.transformer.transform(*b)  # noqa: PLW2901
+        _, _, lengths = config.geod.inv(*a, *b)
+        assert (lengths <= bounds).all()
+
+
+@pytest.mark.parametrize("max_failed_segments", [0, 1, 7, 5000, 100_000])
+def test_vectorized_density_check_max_failed_segments(max_failed_segments):
+    data = feature_collection("OGC:CRS84", 20_000)
+    config = DenseConfig(CRS84, 20.0)
+    expected = check_density_geojson_object(config, load_body(data))
+    result = vectorized_check_density(config, load_body(data), max_failed_segments)
+    assert len(expected.features) > 5000  # noqa: PLR2004
+    assert result.features == expected.features[:max_failed_segments]
@@ -1,10 +1,15 @@
 import json
+from functools import partial
 
+import pytest
+from geodense.geojson import CrsFeatureCollection
 from geodense.lib import traverse_geojson_geometries
 from geojson_pydantic import Feature
 from pydantic import ValidationError
 from pyproj import CRS
 
+from benchmarks.synthetic import feature_collection
+from coordinate_transformation_api.crs_transform import get_transform_crs_fun, mutate_geom_coordinates
 from coordinate_transformation_api.util import (
     crs_transform,
     update_bbox,
@@ -70,3 +75,42 @@ def test_update_bbox(geometry_collection_bbox):
 
     bbox_fc_ft1_geom = tuple(round(x, 6) for x in geometry_collection_bbox_t.features[1].geometry.bbox)
     assert bbox_fc_ft1_geom == test_bbox_fc_ft1_geom
+
+
+def with_bboxes(data: dict) -> dict:
+    """data with a placeholder bbox member on every other object"""
+    for i, feature in enumerate(data["features"]):
+        if i % 2 == 0:
+            feature["bbox"] = [-1.0, -1.0, -1.0, -1.0]
+        if i % 3 == 0:
+            feature["geometry"]["bbox"] = [-1.0, -1.0, -1.0, -1.0]
+    data["bbox"] = [-1.0, -1.0, -1.0, -1.0]
+    return data
+
+
+@pytest.mark.parametrize(
+    ("data", "source_crs", "target_crs"),
+    [
+        (with_bboxes(feature_collection("EPSG:28992", 2000)), "EPSG:28992", "EPSG:4326"),
+        (with_bboxes(feature_collection("OGC:CRS84h", 2000)), "OGC:CRS84h", "EPSG:7931"),
+        (with_bboxes(feature_collection("OGC:CRS84", 500)), "OGC:CRS84", "EPSG:28992"),
+    ],
+)
+def test_crs_transform_bbox_sweep(data, source_crs, target_crs):
+    """crs_transform sets the same bboxes as update_bbox after transforming"""
+    s_crs, t_crs = CRS.from_user_input(source_crs), CRS.from_user_input(target_crs)
+    body = CrsFeatureCollection.model_validate(data)
+    expected = traverse_geojson_geometries(
+        body, partial(mutate_geom_coordinates, get_transform_crs_fun(s_crs, t_crs)), update_bbox
+    )
+    expected.set_crs_auth_code("{}:{}".format(*t_crs.to_authority()))
+    assert crs_transform(body, s_crs, t_crs).model_dump_json() == expected.model_dump_json()
+
+
+def test_crs_transform_bbox_sweep_geometry_collection(geometry_collection_bbox):
+    s_crs, t_crs = CRS.from_epsg(28992), CRS.from_epsg(4326)
+    expected = traverse_geojson_geometries(
+        geometry_collection_bbox, partial(mutate_geom_coordinates, get_transform_crs_fun(s_crs, t_crs)), update_bbox
+    )
+    expected.set_crs_auth_code("EPSG:4326")
+    assert crs_transform(geometry_collection_bbox, s_crs, t_crs).model_dump_json() == expected.model_dump_json()
@@ -12,7 +12,9 @@ from geojson_pydantic.geometries import (
 )
 from pydantic import ValidationError
 
-from coordinate_transformation_api.crs_transform import get_transformer
+from coordinate_transformation_api.crs_transform import get_transform_crs_fun, get_transformer
+from coordinate_transformation_api.geometry_arrays import GeometryArrays
+from coordinate_transformation_api.settings import app_settings
 from coordinate_transformation_api.util import (
     crs_transform,
     str_to_crs,
@@ -200,3 +202,29 @@ def test_wm_epoch():
             )
             == dif_2024_epoch_none
         )
+
+
+@pytest.mark.parametrize("path", ["tests/data/polygons.json", "tests/data/feature-collection-geometry-collection.json"])
+def test_transform_dedup(path, monkeypatch):
+    with open(path) as f:
+        data = json.load(f)
+    s_crs, t_crs = str_to_crs("EPSG:28992"), str_to_crs("EPSG:4326")
+    expected = crs_transform(CrsFeatureCollection(**data), s_crs, t_crs)
+
+    calls = []
+
+    def get_counting_transform_crs_fun(*args, **kwargs):
+        transform_fun = get_transform_crs_fun(*args, **kwargs)
+
+        def counting_transform_fun(position):
+            calls.append(position)
+            return transform_fun(position)
+
+        return counting_transform_fun
+
+    monkeypatch.setattr(app_settings, "transform_dedup", True)
+    monkeypatch.setattr("coordinate_transformation_api.util.get_transform_crs_fun", get_counting_transform_crs_fun)
+    result = crs_transform(CrsFeatureCollection(**data), s_crs, t_crs)
+    assert result.model_dump_json() == expected.model_dump_json()
+    arrays = GeometryArrays(CrsFeatureCollection(**data))
+    assert len(calls) == len({arrays.position(i) for i in range(len(arrays))}) < len(arrays)
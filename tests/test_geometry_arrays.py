@@ -0,0 +1,110 @@
+import json
+
+import numpy as np
+import pytest
+import shapely
+from geodense.lib import transform_geojson_geometries
+from shapely.geometry import shape
+
+from benchmarks.synthetic import feature_collection
+from coordinate_transformation_api.crs_transform import get_shapely_objects
+from coordinate_transformation_api.geometry_arrays import GeometryArrays
+from tests.util import load_body
+
+
+def load_file(name: str):
+    with open(f"tests/data/{name}") as f:
+        return load_body(json.load(f))
+
+
+def geometries(body) -> list:
+    result: list = []
+    transform_geojson_geometries(body, result.append)
+    return [geometry for geometry in result if geometry is not None]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        load_file("linestrings-multi.json"),
+        load_file("polygons-multi.json"),
+        load_file("feature-collection-geometry-collection.json"),
+        load_file("geometry-collection.json"),
+        load_body(feature_collection("OGC:CRS84", 2000)),
+        load_body(feature_collection("OGC:CRS84h", 2000, geometry_types=("Polygon", "MultiPoint"), holes=3)),
+    ],
+)
+def test_geometry_arrays_to_shapely(body):
+    arrays = GeometryArrays(body)
+    expected = [shape(geometry.model_dump()) for geometry in geometries(body)]
+    result = arrays.to_shapely()
+    assert len(result) == len(expected)
+    assert all(shapely.equals_exact(r, e, tolerance=0) for r, e in zip(result, expected, strict=True))
+    assert all(r.has_z == e.has_z for r, e in zip(result, expected, strict=True))
+
+
+def test_geometry_arrays_positions():
+    body = load_body(
+        {
+            "type": "GeometryCollection",
+            "geometries": [
+                {"type": "Point", "coordinates": [5.0, 52.0]},
+                {
+                    "type": "MultiPolygon",
+                    "coordinates": [
+                        [[[0, 0, 1], [1, 0], [1, 1], [0, 0, 1]]],
+                        [[[2, 2], [3, 2], [3, 3], [2, 2]], [[2.1, 2.1], [2.2, 2.1], [2.2, 2.2], [2.1, 2.1]]],
+                    ],
+                },
+                {"type": "LineString", "coordinates": [[6.0, 53.0], [6.1, 53.1, 2.5]]},
+            ],
+        }
+    )
+    arrays = GeometryArrays(body)
+    assert len(arrays) == 1 + 12 + 2
+    assert arrays.sequence_sizes.tolist() == [1, 4, 4, 4, 2]
+    assert arrays.part_offsets.tolist() == [0, 1, 2, 4, 5]
+    assert arrays.geometry_offsets.tolist() == [0, 1, 3, 4]
+    assert arrays.first.tolist() == [True, True, *[False] * 3, True, *[False] * 3, True, *[False] * 3, True, False]
+    assert arrays.position(0) == (5.0, 52.0)
+    assert arrays.position(1) == (0.0, 0.0, 1.0)
+    assert arrays.position(2) == (1.0, 0.0)
+    assert arrays.position(14) == (6.1, 53.1, 2.5)
+    assert arrays.sequences[1] is body.geometries[1].coordinates[0][0]
+    assert np.array_equal(arrays.three_dimensional, np.isin(np.arange(15), [1, 4, 14]))
+
+
+def test_geometry_arrays_empty():
+    body = load_body({"type": "Feature", "properties": {}, "geometry": None})
+    arrays = GeometryArrays(body)
+    assert len(arrays) == 0
+    assert len(arrays.to_shapely()) == 0
+
+
+def test_geometry_arrays_get_shapely_objects():
+    body = load_file("feature-collection-geometry-collection.json")
+    arrays = GeometryArrays(body)
+    expected = [
+        shape(feature.geometry.model_dump()) if feature.geometry is not None else None for feature in body.features
+    ]
+    result = get_shapely_objects(body, arrays)
+    assert isinstance(arrays.structure, list)
+    assert len(result) == len(expected)
+    assert all(shapely.equals_exact(r, e, tolerance=0) for r, e in zip(result, expected, strict=True))
+
+
+def test_geometry_arrays_geometry_three_dimensional():
+    body = load_body(
+        {
+            "type": "GeometryCollection",
+            "geometries": [
+                {"type": "Point", "coordinates": [5.0, 52.0, 1.0]},
+                {"type": "LineString", "coordinates": [[6.0, 53.0], [6.1, 53.1, 2.5]]},
+                {"type": "LineString", "coordinates": [[6.0, 53.0, 1.0], [6.1, 53.1, 2.5]]},
+            ],
+        }
+    )
+    arrays = GeometryArrays(body)
+    assert arrays.structure == [0, 1, 2]
+    assert arrays.geometry_three_dimensional().tolist() == [True, False, True]
+    assert [geometry.has_z for geometry in arrays.to_shapely()] == [True, False, True]
@@ -0,0 +1,25 @@
+import pytest
+
+from benchmarks.memory import ENDPOINTS, check_budget, load_budgets, profile_endpoint
+from coordinate_transformation_api.models import TransformationNotPossibleError
+
+
+def test_budgets_cover_endpoints():
+    assert load_budgets().keys() == ENDPOINTS.keys()
+
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS.keys())
+def test_memory_within_budget(endpoint):
+    try:
+        result = profile_endpoint(ENDPOINTS[endpoint], 10_000)
+    except TransformationNotPossibleError as e:
+        pytest.skip(str(e))
+    assert list(result["stages"])[:2] == ["receive", "parse"]
+    assert result["peak_bytes"] > result["request_bytes"]
+    assert check_budget(result, load_budgets()) is None
+
+
+def test_check_budget_exceeded():
+    result = {"id": "transform[n=10]", "endpoint": "transform", "peak_bytes_per_vertex": 10**6}
+    assert check_budget(result, {"transform": {"peak_bytes_per_vertex": 1000}}) is not None
+    assert check_budget(result, {}) is None
@@ -0,0 +1,100 @@
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from pyproj import CRS
+
+from coordinate_transformation_api.constants import DENSITY_CHECK_RESULT_HEADER
+from coordinate_transformation_api.fastapi_rfc7807 import middleware
+from coordinate_transformation_api.metrics import (
+    MetricsMiddleware,
+    count_transformation_not_possible,
+    metrics_response,
+    observe_dedup_ratio,
+    observe_points_transformed,
+    set_crs_pair,
+)
+from coordinate_transformation_api.models import DensityCheckResult, TransformationNotPossibleError
+
+SOURCE_CRS = "EPSG:28992"
+TARGET_CRS = "EPSG:4258"
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    middleware.register(app, post_hooks=[count_transformation_not_possible])
+    app.add_middleware(MetricsMiddleware)
+
+    @app.post("/transform")
+    async def transform(request: Request) -> Response:
+        await request.body()
+        set_crs_pair(CRS.from_user_input(SOURCE_CRS), CRS.from_user_input(TARGET_CRS))
+        observe_points_transformed(10)
+        return Response(
+            content=b"{}",
+            headers={DENSITY_CHECK_RESULT_HEADER: DensityCheckResult.success.value},
+        )
+
+    @app.get("/not-possible")
+    async def not_possible() -> Response:
+        raise TransformationNotPossibleError(
+            CRS.from_user_input(SOURCE_CRS), CRS.from_user_input(TARGET_CRS), "Transformation Excluded"
+        )
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def get_sample_value(name: str, labels: dict[str, str]) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_request_metrics(client):
+    crs_labels = {"source_crs": SOURCE_CRS, "target_crs": TARGET_CRS}
+    duration_labels = {"method": "POST", "endpoint": "/transform", "status": "200", **crs_labels}
+    density_labels = {"endpoint": "/transform", "result": DensityCheckResult.success.value}
+    before_count = get_sample_value("ct_api_request_duration_seconds_count", duration_labels)
+    before_points = get_sample_value("ct_api_points_transformed_total", crs_labels)
+    before_bytes = get_sample_value("ct_api_request_body_bytes_sum", {"endpoint": "/transform"})
+    before_density = get_sample_value("ct_api_density_check_results_total", density_labels)
+
+    response = client.post("/transform", content=b"x" * 100)
+
+    assert response.status_code == 200  # noqa: PLR2004
+    assert get_sample_value("ct_api_request_duration_seconds_count", duration_labels) == before_count + 1
+    assert get_sample_value("ct_api_points_transformed_total", crs_labels) == before_points + 10
+    assert get_sample_value("ct_api_request_body_bytes_sum", {"endpoint": "/transform"}) == before_bytes + 100
+    assert get_sample_value("ct_api_density_check_results_total", density_labels) == before_density + 1
+
+
+def test_unmatched_endpoint_label(client):
+    labels = {"method": "GET", "endpoint": "unmatched", "status": "404", "source_crs": "", "target_crs": ""}
+    before = get_sample_value("ct_api_request_duration_seconds_count", labels)
+    client.get("/foo/bar")
+    assert get_sample_value("ct_api_request_duration_seconds_count", labels) == before + 1
+
+
+def test_transformation_not_possible_counted(client):
+    labels = {"reason": "Transformation Excluded"}
+    before = get_sample_value("ct_api_transformation_not_possible_total", labels)
+    response = client.get("/not-possible")
+    assert response.status_code == 400  # noqa: PLR2004
+    assert get_sample_value("ct_api_transformation_not_possible_total", labels) == before + 1
+
+
+def test_metrics_response():
+    body = metrics_response().body.decode()
+    assert "ct_api_transformer_cache_hit_ratio" in body
+    assert "ct_api_requests_in_progress" in body
+
+
+def test_observe_dedup_ratio():
+    labels = {"source_crs": "", "target_crs": "", "le": "0.5"}
+    before = get_sample_value("ct_api_transform_dedup_ratio_bucket", labels)
+    before_sum = get_sample_value("ct_api_transform_dedup_ratio_sum", {"source_crs": "", "target_crs": ""})
+    observe_dedup_ratio(10, 6)
+    observe_dedup_ratio(0, 0)  # not observed
+    assert get_sample_value("ct_api_transform_dedup_ratio_bucket", labels) == before + 1
+    assert get_sample_value("ct_api_transform_dedup_ratio_sum", {"source_crs": "", "target_crs": ""}) == pytest.approx(
+        before_sum + 0.4
+    )
@@ -1,8 +1,10 @@
 import pytest
 from geodense.geojson import CrsFeatureCollection
 from geojson_pydantic import Feature
+from pyproj import CRS
 
-from coordinate_transformation_api.util import request_body_within_valid_bbox
+from coordinate_transformation_api.models import DeviationOutOfBboxError
+from coordinate_transformation_api.util import density_check_request_body, request_body_within_valid_bbox
 
 
 @pytest.mark.parametrize(
@@ -54,3 +56,37 @@ def test_request_body_within_valid_bbox(geojson, source_crs, expectation):
     result = request_body_within_valid_bbox(geojson, source_crs)
 
     assert result == expectation
+
+
+@pytest.mark.parametrize(
+    ("coordinates", "source_crs", "expectation"),
+    [
+        ([[5.0, 52.0], [6.0, 53.0]], "OGC:CRS84", True),
+        ([[5.0, 52.0], [9.0, 53.0]], "OGC:CRS84", False),
+        ([[5.0, 52.0, 10.0], [6.0, 49.0, 10.0]], "OGC:CRS84h", False),
+        ([[156264.9063, 601302.5889], [165681.9644, 605544.3131]], "EPSG:28992", True),
+        ([[156264.9063, 601302.5889], [165681.9644, 605544.3131]], CRS.from_epsg(28992), True),
+    ],
+)
+def test_request_body_within_valid_bbox_positions(coordinates, source_crs, expectation):
+    body = Feature(
+        type="Feature",
+        properties={},
+        geometry={"type": "LineString", "coordinates": coordinates},
+        bbox=(0.0, 0.0, 1.0, 1.0),  # the bbox member is not used
+    )
+    assert request_body_within_valid_bbox(body, source_crs) == expectation
+
+
+def test_density_check_request_body_max_segment_deviation():
+    def line(end: list[float]) -> Feature:
+        return Feature(
+            type="Feature",
+            properties={},
+            geometry={"type": "LineString", "coordinates": [[156264.9063, 601302.5889], end]},
+        )
+
+    report = density_check_request_body(line([165681.9644, 605544.3131]), CRS.from_epsg(28992), 0.001, None, None)
+    assert len(report.features) == 1
+    with pytest.raises(DeviationOutOfBboxError):
+        density_check_request_body(line([365681.9644, 605544.3131]), CRS.from_epsg(28992), 0.001, None, None)
@@ -0,0 +1,88 @@
+import logging
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI, Response
+
+from coordinate_transformation_api.access_log_middleware import RequestMetadataFilter
+from coordinate_transformation_api.timing import (
+    ServerTimingMiddleware,
+    StageTimings,
+    _stage_timings,
+    mark_parsed,
+    record_counts,
+    timed,
+)
+
+
+@pytest.fixture
+def client() -> httpx.AsyncClient:
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware)
+
+    @app.post("/transform")
+    async def transform() -> Response:
+        mark_parsed()
+        with timed("transform"), timed("update_bbox"):
+            time.sleep(0.01)
+        record_counts(point_count=10, feature_count=2)
+        with timed("serialize"):
+            return Response(content=b"{}")
+
+    @app.get("/untimed")
+    async def untimed() -> Response:
+        return Response(content=b"{}")
+
+    # run app in the thread of the test, access log metadata is stored in thread-local storage
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_server_timing_header(client):
+    response = await client.post("/transform")
+    stages = [x.strip().split(";")[0] for x in response.headers["Server-Timing"].split(",")]
+    assert set(stages) == {"parse", "update_bbox", "transform", "serialize", "total"}
+
+    record = logging.LogRecord("uvicorn.access", logging.INFO, "", 0, "", None, None)
+    RequestMetadataFilter().filter(record)
+    assert record.point_count == 10  # noqa: PLR2004
+    assert record.feature_count == 2  # noqa: PLR2004
+    assert set(record.server_timing) == set(stages)
+
+
+@pytest.mark.asyncio
+async def test_no_server_timing_header_without_timed_stages(client):
+    await client.post("/transform")
+    response = await client.get("/untimed")
+    assert "Server-Timing" not in response.headers
+
+    record = logging.LogRecord("uvicorn.access", logging.INFO, "", 0, "", None, None)
+    RequestMetadataFilter().filter(record)
+    assert not hasattr(record, "server_timing")
+
+
+@pytest.mark.asyncio
+async def test_enclosing_stage_timings_reused(client):
+    timings = StageTimings()
+    token = _stage_timings.set(timings)
+    try:
+        await client.post("/transform")
+    finally:
+        _stage_timings.reset(token)
+    assert set(timings.durations) == {"parse", "update_bbox", "transform", "serialize", "total"}
+
+
+def test_nested_stage_excluded_from_enclosing_stage():
+    timings = StageTimings()
+    with timings.stage("transform"), timings.stage("update_bbox"):
+        time.sleep(0.02)
+    assert timings.durations["update_bbox"] >= 0.02  # noqa: PLR2004
+    assert timings.durations["transform"] < 0.01  # noqa: PLR2004
+
+
+def test_timed_noop_without_middleware():
+    with timed("transform"):
+        pass
+    mark_parsed()
+    record_counts(point_count=1)
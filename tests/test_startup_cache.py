@@ -0,0 +1,35 @@
+import json
+
+from coordinate_transformation_api import startup_cache
+from coordinate_transformation_api.models import Crs
+from coordinate_transformation_api.startup_cache import cache_key, load_crss, read_startup_cache
+
+
+def write_cache(path, key: str) -> str:
+    data = {
+        "key": key,
+        "oas": {"info": {"title": "cached"}},
+        "crs_config": {},
+        "crss": {"EPSG:28992": Crs.from_crs_str("EPSG:28992").model_dump()},
+    }
+    path.write_text(json.dumps(data))
+    return str(path)
+
+
+def test_read_startup_cache(tmp_path):
+    cached = read_startup_cache(write_cache(tmp_path / "cache.json", cache_key()))
+    assert cached is not None
+    assert Crs.model_validate(cached["crss"]["EPSG:28992"]) == Crs.from_crs_str("EPSG:28992")
+
+
+def test_read_startup_cache_stale_or_missing(tmp_path):
+    assert read_startup_cache(write_cache(tmp_path / "cache.json", "stale")) is None
+    assert read_startup_cache(str(tmp_path / "missing.json")) is None
+
+
+def test_load_crss_from_cache(tmp_path, monkeypatch):
+    cached = read_startup_cache(write_cache(tmp_path / "cache.json", cache_key()))
+    cached["crss"]["EPSG:28992"]["name"] = "from cache"  # type: ignore
+    monkeypatch.setattr(startup_cache, "get_startup_cache", lambda: cached)
+    crss = load_crss(["EPSG:28992", "EPSG:4258"])
+    assert [crs.name for crs in crss] == ["from cache", Crs.from_crs_str("EPSG:4258").name]
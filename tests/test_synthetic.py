@@ -0,0 +1,58 @@
+import pytest
+from geodense.geojson import CrsFeatureCollection
+
+from benchmarks.synthetic import AREAS, buildings_for_vertices, cityjson, count_vertices, feature_collection
+from coordinate_transformation_api.cityjson.models import CityjsonV113
+
+
+def test_feature_collection_deterministic():
+    assert feature_collection("EPSG:28992", 5000) == feature_collection("EPSG:28992", 5000)
+    assert feature_collection("EPSG:28992", 5000) != feature_collection("EPSG:28992", 5000, seed=1)
+
+
+@pytest.mark.parametrize("vertices", [1, 2, 7, 1000, 12345])
+def test_feature_collection_vertex_count(vertices):
+    data = feature_collection("EPSG:28992", vertices)
+    assert count_vertices(data) == vertices
+    CrsFeatureCollection.model_validate(data)
+
+
+def test_feature_collection_geometry_types():
+    data = feature_collection("EPSG:28992", 5000)
+    geometry_types = {feature["geometry"]["type"] for feature in data["features"]}
+    assert geometry_types == {"Polygon", "LineString", "MultiPoint", "GeometryCollection"}
+    polygon = next(feature["geometry"] for feature in data["features"] if feature["geometry"]["type"] == "Polygon")
+    assert len(polygon["coordinates"]) == 3  # noqa: PLR2004
+    assert all(ring[0] == ring[-1] for ring in polygon["coordinates"])
+
+
+def test_feature_collection_within_area():
+    min_x, min_y, max_x, max_y = AREAS["nl"]
+    data = feature_collection("OGC:CRS84", 5000, geometry_types=("LineString", "MultiPoint"))
+    for feature in data["features"]:
+        for x, y in feature["geometry"]["coordinates"]:
+            assert min_x <= x <= max_x
+            assert min_y <= y <= max_y
+
+
+@pytest.mark.parametrize(
+    ("crs", "heights", "dimensions"), [("EPSG:28992", None, 2), ("EPSG:7415", None, 3), ("EPSG:28992", True, 3)]
+)
+def test_feature_collection_heights(crs, heights, dimensions):
+    data = feature_collection(crs, 10, geometry_types=("LineString",), heights=heights)
+    assert len(data["features"][0]["geometry"]["coordinates"][0]) == dimensions
+
+
+def test_cityjson_shared_vertices():
+    data = cityjson("EPSG:7415", 25)
+    assert data == cityjson("EPSG:7415", 25)
+    assert len(data["CityObjects"]) == 25  # noqa: PLR2004
+    # 3 rows of 10, 10 and 5 terraced houses, houses in a row share the vertices of their party walls
+    assert len(data["vertices"]) == 4 * (11 + 11 + 6)
+    cj = CityjsonV113.model_validate(data)
+    assert cj.remove_duplicate_vertices() == 0
+
+
+def test_buildings_for_vertices():
+    vertices = len(cityjson("EPSG:7415", buildings_for_vertices(10_000))["vertices"])
+    assert abs(vertices - 10_000) < 50  # noqa: PLR2004
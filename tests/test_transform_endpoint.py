@@ -1,7 +1,11 @@
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 
+from coordinate_transformation_api.constants import MAX_VALIDATION_ERRORS
 from coordinate_transformation_api.main import app
+from coordinate_transformation_api.settings import AppSettings, app_settings
 
 client = TestClient(app)
 
@@ -341,3 +345,167 @@ def test_transform_densify_check_post(request_body, expectation, source_crs, tar
     api_version_headers_vals = response.headers.get_list("api-version")
     assert len(api_version_headers_vals) == 1
     assert api_version_headers_vals[0].startswith("2")
+
+
+def test_transform_post_cityjson_seq():
+    with open("tests/data/house_1.city.json") as f:
+        data = json.load(f)
+    header = {**data, "CityObjects": {}, "vertices": []}
+    feature = {
+        "type": "CityJSONFeature",
+        "id": "house_1",
+        "CityObjects": data["CityObjects"],
+        "vertices": data["vertices"],
+    }
+    body = "\n".join(json.dumps(x) for x in [header, feature, feature]) + "\n"
+
+    response = client.post(
+        "/transform?target-crs=EPSG:9286",
+        content=body,
+        headers={"content-type": "application/city+json-seq"},
+    )
+    assert response.status_code == 200  # noqa: PLR2004
+    assert response.headers["content-type"] == "application/city+json-seq"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 3  # noqa: PLR2004
+    assert lines[0]["metadata"]["referenceSystem"] == "https://www.opengis.net/def/crs/EPSG/0/9286"
+    assert lines[0]["transform"]["scale"] == [1e-8, 1e-8, 1e-8]
+    assert [line["type"] for line in lines[1:]] == ["CityJSONFeature", "CityJSONFeature"]
+    assert lines[1] == lines[2]
+
+
+def test_transform_post_cityjson_seq_malformed_header():
+    response = client.post(
+        "/transform?source-crs=EPSG:7415&target-crs=EPSG:7931",
+        content=b'{not json\n{"type": "CityJSONFeature"}\n',
+        headers={"content-type": "application/city+json-seq"},
+    )
+    assert response.status_code == 400  # noqa: PLR2004
+    errors = response.json()["errors"]
+    assert [(error["type"], error["loc"]) for error in errors] == [("json_invalid", ["body", 0])]
+
+
+@pytest.mark.parametrize(
+    ("request_body", "error_type"),
+    [
+        ({"type": "Foo"}, "union_tag_invalid"),
+        ({"coordinates": [1, 2]}, "union_tag_not_found"),
+    ],
+)
+def test_transform_post_body_type_dispatch_errors(request_body, error_type):
+    response = client.post("/transform?source-crs=EPSG:28992&target-crs=EPSG:4326", json=request_body)
+    assert response.status_code == 400  # noqa: PLR2004
+    assert [error["type"] for error in response.json()["errors"]] == [error_type]
+
+
+def test_transform_post_cityjson_content_type_validates_cityjson_only():
+    feature = {"type": "Feature", "properties": {}, "geometry": {"type": "Point", "coordinates": [155000, 463000]}}
+    response = client.post(
+        "/transform?source-crs=EPSG:28992&target-crs=EPSG:4326",
+        content=json.dumps(feature),
+        headers={"content-type": "application/city+json"},
+    )
+    assert response.status_code == 400  # noqa: PLR2004
+    assert response.json()["errors"][0]["loc"] == ["body", "type"]
+
+
+def test_transform_post_cityjson_malformed_json():
+    response = client.post(
+        "/transform?source-crs=EPSG:7415&target-crs=EPSG:7931",
+        content=b"{not json",
+        headers={"content-type": "application/city+json"},
+    )
+    assert response.status_code == 400  # noqa: PLR2004
+    errors = response.json()["errors"]
+    assert [(error["type"], error["loc"]) for error in errors] == [("json_invalid", ["body"])]
+    assert "input" not in errors[0]
+
+
+def test_transform_post_validation_errors_capped():
+    feature = {"type": "Feature", "properties": {}, "geometry": {"type": "Point", "coordinates": ["x", 1]}}
+    body = {"type": "FeatureCollection", "features": [feature] * 500}
+    response = client.post("/transform?source-crs=EPSG:28992&target-crs=EPSG:4326", json=body)
+    assert response.status_code == 400  # noqa: PLR2004
+    response_body = response.json()
+    assert len(response_body["errors"]) == MAX_VALIDATION_ERRORS
+    assert response_body["errors-omitted"] > 0
+    assert all(not isinstance(error.get("input"), dict | list) for error in response_body["errors"])
+
+
+@pytest.mark.parametrize(("density_check_report", "expected_segments"), [("capped", 100), ("full", 150)])
+def test_transform_post_density_check_report(density_check_report, expected_segments):
+    coordinates = [[100_000.0 + i * 1000.0, 450_000.0] for i in range(151)]  # 150 segments of 1000 m
+    with TestClient(app) as lifespan_client:  # the density check failed handler logs with the logger set in lifespan
+        response = lifespan_client.post(
+            f"/transform?source-crs=EPSG:28992&target-crs=EPSG:4258&density-check-report={density_check_report}",
+            json={"type": "LineString", "coordinates": coordinates},
+        )
+    assert response.status_code == 400  # noqa: PLR2004
+    response_object = response.json()
+    assert len(response_object["report"]["failedLineSegments"]["features"]) == expected_segments
+    assert response_object.get("report-capped", False) == (density_check_report == "capped")
+
+
+@pytest.mark.parametrize(
+    ("source_crs", "target_crs"),
+    [("EPSG:28992", "EPSG:4258"), ("EPSG:28992", "OGC:CRS84"), ("OGC:CRS84", "EPSG:28992")],
+)
+def test_densify_target_crs(source_crs, target_crs):
+    coordinates = {
+        "EPSG:28992": [[156264.9063, 601302.5889], [165681.9644, 605544.3131]],
+        "OGC:CRS84": [[5.0, 52.0], [5.1, 52.05]],
+    }[source_crs]
+    body = {"type": "LineString", "coordinates": coordinates}
+    response = client.post(f"/densify?source-crs={source_crs}&target-crs={target_crs}", json=body)
+    assert response.status_code == 200  # noqa: PLR2004
+    assert response.headers["content-crs"].endswith(target_crs.replace(":", "/0/"))
+    densified = client.post(f"/densify?source-crs={source_crs}", json=body).json()
+    expected = client.post(
+        f"/transform?source-crs={source_crs}&target-crs={target_crs}&density-check=false", json=densified
+    ).json()
+    result = response.json()
+    assert len(result["coordinates"]) == len(expected["coordinates"])
+    tolerance = 1e-3 if target_crs == "EPSG:28992" else 1e-7  # the two requests round in between
+    for position, expected_position in zip(result["coordinates"], expected["coordinates"], strict=True):
+        assert position == pytest.approx(expected_position, abs=tolerance)
+
+
+@pytest.mark.parametrize(
+    ("parameter", "loc"), [("target-crs", ["query", "target-crs"]), ("accept-crs", ["header", "accept-crs"])]
+)
+def test_densify_incompatible_target_crs(parameter, loc):
+    body = {"type": "LineString", "coordinates": [[156264.9063, 601302.5889], [165681.9644, 605544.3131]]}
+    if parameter == "target-crs":
+        response = client.post("/densify?source-crs=EPSG:28992&target-crs=EPSG:7931", json=body)
+    else:
+        response = client.post(
+            "/densify?source-crs=EPSG:28992",
+            json=body,
+            headers={"accept-crs": "http://www.opengis.net/def/crs/EPSG/0/7931"},
+        )
+    assert response.status_code == 400  # noqa: PLR2004
+    errors = response.json()["errors"]
+    assert errors[0]["loc"] == loc
+    assert "EPSG:7931" in errors[0]["msg"]
+
+
+def test_densify_vertex_budget_exceeded(monkeypatch):
+    monkeypatch.setattr(app_settings, "densify_max_output_vertices", 100)
+    body = {"type": "LineString", "coordinates": [[100_000.0, 450_000.0], [200_000.0, 450_000.0]]}  # 100 km
+    # the problem middleware reraises the exception after sending the problem response
+    problem_client = TestClient(app, raise_server_exceptions=False)
+    response = problem_client.post("/densify?source-crs=EPSG:28992&max-segment-length=200", json=body)
+    assert response.status_code == 400  # noqa: PLR2004
+    response_object = response.json()
+    assert response_object["type"] == "nsgi.nl/densify-vertex-budget-exceeded"
+    assert response_object["predicted-vertices"] > 500  # noqa: PLR2004
+    assert response_object["vertex-budget"] == 100  # noqa: PLR2004
+
+
+def test_densify_vertex_budget_disabled(monkeypatch):
+    monkeypatch.setenv("DENSIFY_MAX_OUTPUT_VERTICES", "0")
+    monkeypatch.setattr(app_settings, "densify_max_output_vertices", AppSettings().densify_max_output_vertices)
+    body = {"type": "LineString", "coordinates": [[100_000.0, 450_000.0], [200_000.0, 450_000.0]]}  # 100 km
+    response = client.post("/densify?source-crs=EPSG:28992&max-segment-length=200", json=body)
+    assert response.status_code == 200  # noqa: PLR2004
+    assert len(response.json()["coordinates"]) > 500  # noqa: PLR2004
@@ -6,8 +6,11 @@ from importlib import resources as impresources
 
 import pytest
 import yaml
+from geodense.lib import GeojsonObject
+from pydantic import TypeAdapter
 
 from coordinate_transformation_api import assets
+from coordinate_transformation_api.util import GeojsonBody
 
 assets_resources = impresources.files(assets)
 crs_conf = assets_resources.joinpath("crs-config.yaml")
@@ -27,6 +30,11 @@ def not_raises(exception, message: str | None = ""):
             raise pytest.fail(message.format(exc=exception))  # noqa: B904
 
 
+def load_body(data: dict) -> GeojsonObject:
+    """Validate data as the GeoJSON request body of /densify and /check-density"""
+    return TypeAdapter(GeojsonBody).validate_python(data)
+
+
 def make_entry(line):
     crs = line[0]
     coords = tuple(float(num) for num in line[1].strip("()").split(" "))